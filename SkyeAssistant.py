@@ -1,20 +1,20 @@
 """Skye Assistant - single clean implementation
 Features: TTS (pyttsx3), speech recognition (SpeechRecognition), reminders (SQLite),
-music playback (pygame/pywhatkit), wiki/jokes, safe math eval, basic GPT integration (optional),
+music playback (pygame/YouTube), wiki/jokes, safe math eval, basic GPT integration (optional),
 and a background reminder scheduler.
 
 This file is a single canonical implementation intended to replace duplicated fragments.
 """
 """Skye Assistant - single clean implementation
 Features: TTS (pyttsx3), speech recognition (SpeechRecognition), reminders (SQLite),
-music playback (pygame/pywhatkit), wiki/jokes, safe math eval, basic GPT integration (optional),
+music playback (pygame/YouTube), wiki/jokes, safe math eval, basic GPT integration (optional),
 and a background reminder scheduler.
 
 This file is a single canonical implementation intended to replace duplicated fragments.
 """
 """Skye Assistant - single clean implementation
 Features: TTS (pyttsx3), speech recognition (SpeechRecognition), reminders (SQLite),
-music playback (pygame/pywhatkit), wiki/jokes, safe math eval, basic GPT integration (optional),
+music playback (pygame/YouTube), wiki/jokes, safe math eval, basic GPT integration (optional),
 and a background reminder scheduler.
 
 This file is a single canonical implementation intended to replace duplicated fragments.
@@ -30,6 +30,7 @@ import random
 import traceback
 import re
 from datetime import datetime, timedelta
+from concurrent.futures import Future
 
 try:
     import speech_recognition as sr
@@ -41,11 +42,6 @@ try:
 except Exception:
     pyttsx3 = None
 
-try:
-    import pywhatkit
-except Exception:
-    pywhatkit = None
-
 try:
     import pyjokes
 except Exception:
@@ -56,13 +52,6 @@ try:
 except Exception:
     wikipedia = None
 
-try:
-    import wolframalpha
-    WOLFRAM_AVAILABLE = True
-except Exception:
-    wolframalpha = None
-    WOLFRAM_AVAILABLE = False
-
 try:
     import openai
     OPENAI_AVAILABLE = True
@@ -81,6 +70,28 @@ try:
 except Exception:
     pass
 
+from skye_cache import get_wiki_cache, WikiSummaryCache, get_singleflight, singleflight_stats
+from skye_llm import ChatClient
+from skye_db import WriteBehindQueue, Database, get_database
+from skye_memory import ConversationMemory
+from skye_scheduler import TimerHeap
+from skye_reminders import ReminderStore, describe
+from skye_alarms import AlarmEngine, AlarmSound
+from skye_timeparse import parse_when
+from skye_notes import NoteStore, ShoppingList, is_notes_request, handle_command as handle_notes_command
+from skye_habits import HabitTracker, is_habit_request, handle_command as handle_habit_command
+from skye_calc import is_local_expression
+from skye_bulk import bulk_calculate, is_bulk_request
+from skye_wolfram import WolframClient, MathAnswerer
+from skye_http import get_session
+from skye_music import MusicLibrary, describe_track
+from skye_player import Player, handle_command as handle_player_command
+from skye_media import MediaResolver
+from skye_health import AudioHealthMonitor, MetricsServer, pcm_rms
+from skye_trace import get_tracer, span, traced
+from skye_profiler import get_profiler, handle_command as handle_profiler_command
+from skye_events import EventLoop
+
 
 # ========== Config ==========
 class Config:
@@ -93,51 +104,23 @@ class Config:
     VOICE_RATE = int(os.getenv('VOICE_RATE', 170))
     VOICE_VOLUME = float(os.getenv('VOICE_VOLUME', 1.0))
     DEFAULT_REMINDER_LEAD_MINUTES = 5
-
-
-# ========== Safe eval for math ==========
-import ast, operator as op
-
-SAFE_OPERATORS = {
-    ast.Add: op.add,
-    ast.Sub: op.sub,
-    ast.Mult: op.mul,
-    ast.Div: op.truediv,
-    ast.Pow: op.pow,
-    ast.USub: op.neg,
-    ast.Mod: op.mod,
-}
-
-def safe_eval(expr: str):
-    try:
-        node = ast.parse(expr, mode='eval')
-        def _eval(n):
-            if isinstance(n, ast.Expression):
-                return _eval(n.body)
-            if isinstance(n, ast.Constant):
-                return n.value
-            if isinstance(n, ast.Num):
-                return n.n
-            if isinstance(n, ast.BinOp):
-                left = _eval(n.left)
-                right = _eval(n.right)
-                op_type = type(n.op)
-                if op_type in SAFE_OPERATORS:
-                    return SAFE_OPERATORS[op_type](left, right)
-            if isinstance(n, ast.UnaryOp):
-                operand = _eval(n.operand)
-                op_type = type(n.op)
-                if op_type in SAFE_OPERATORS:
-                    return SAFE_OPERATORS[op_type](operand)
-            raise ValueError('Unsupported expression')
-        return _eval(node)
-    except Exception:
-        raise
+    # opt-in localhost metrics endpoint (GET /metrics, /health); 0 disables it
+    METRICS_PORT = int(os.getenv('SKYE_METRICS_PORT', 0))
+    # set to 0.0.0.0 (or an interface address) to let a fleet scraper reach it
+    METRICS_HOST = os.getenv('SKYE_METRICS_HOST', '127.0.0.1')
 
 
 # ========== Simple TTS wrapper ==========
 class SimpleTTS:
-    def __init__(self):
+    def __init__(self, health: AudioHealthMonitor = None):
+        self.health = health
+        self.engine = None
+        # set whenever nothing is being spoken; the listener waits on it
+        self.done = threading.Event()
+        self.done.set()
+        self.reinit()
+
+    def reinit(self):
         self.engine = None
         if pyttsx3:
             try:
@@ -153,53 +136,77 @@ class SimpleTTS:
             except Exception:
                 self.engine = None
 
+    @traced('speak.tts')
     def speak(self, text: str):
         if not text:
             return
+        self.done.clear()
+        try:
+            self._speak(text)
+        finally:
+            self.done.set()
+
+    def _speak(self, text: str):
         if self.engine:
+            start = time.perf_counter()
             try:
                 self.engine.say(text)
                 self.engine.runAndWait()
+                if self.health:
+                    self.health.record_tts(time.perf_counter() - start)
                 return
             except Exception:
-                pass
+                if self.health:
+                    self.health.record_tts(time.perf_counter() - start, ok=False)
         # fallback to print
         print('[TTS]', text)
 
 
 # ========== Reminder scheduler ==========
 class ReminderScheduler:
-    def __init__(self, db_conn, tts: SimpleTTS):
-        self.conn = db_conn
-        self.tts = tts
-        self._stop = threading.Event()
-        self.thread = threading.Thread(target=self._loop, daemon=True)
-        self.thread.start()
-
-    def _loop(self):
-        while not self._stop.is_set():
-            try:
-                cur = self.conn.cursor()
-                cur.execute("SELECT id, reminder, reminder_time FROM reminders WHERE is_completed=0")
-                rows = cur.fetchall()
-                for rid, text, when in rows:
-                    try:
-                        due = datetime.fromisoformat(when)
-                    except Exception:
-                        continue
-                    if due <= datetime.now():
-                        self.tts.speak(f'Reminder: {text}')
-                        cur.execute('UPDATE reminders SET is_completed=1 WHERE id=?', (rid,))
-                        self.conn.commit()
-                time.sleep(5)
-            except Exception as e:
-                print('Reminder loop error', e)
-                time.sleep(2)
+    """Fires pending reminders from a timer heap.
+
+    Pending rows are read once at start-up; new reminders are pushed with
+    add(), which wakes the worker if the new reminder is the earliest one.
+    The DB is only touched when a reminder actually fires; the text goes to
+    ``announce``, which queues it for the main loop rather than speaking
+    from the timer thread.
+    """
+
+    def __init__(self, db: Database, writer: WriteBehindQueue, announce):
+        self.db = db
+        self.writer = writer
+        self.announce = announce
+        self.timers = TimerHeap(name='skye-reminders')
+        self._load_pending()
+
+    def _load_pending(self):
+        rows = ReminderStore(self.db).pending()
+        self.timers.load((due, self._fire, (rid, text)) for rid, text, due in rows)
+
+    def add(self, rid, text: str, due: float):
+        # rid may be a Future from the write-behind queue
+        self.timers.schedule(due, self._fire, rid, text)
+
+    def _fire(self, rid, text):
+        self.announce(f'Reminder: {text}')
+        if isinstance(rid, Future):
+            # the INSERT may still be queued; complete the row once it lands
+            # rather than holding up the shared timer thread
+            rid.add_done_callback(self._complete)
+        else:
+            self._complete(rid)
+
+    def _complete(self, rid):
+        try:
+            if isinstance(rid, Future):
+                rid = rid.result()
+            self.writer.submit('UPDATE reminders SET is_completed=1 WHERE id=?', (rid,))
+        except Exception as e:
+            print('Reminder update error', e)
 
     def stop(self):
-        self._stop.set()
-        if self.thread.is_alive():
-            self.thread.join(timeout=1)
+        self.timers.stop()
 
 
 # ========== Skye Assistant ==========
@@ -209,7 +216,8 @@ class SkyeAssistant:
         print('🚀 INITIALIZING SKYE ASSISTANT')
         print('='*60)
 
-        self.tts = SimpleTTS()
+        self.health = AudioHealthMonitor()
+        self.tts = SimpleTTS(self.health)
         # alias for older code
         self.voice = self.tts
 
@@ -220,72 +228,177 @@ class SkyeAssistant:
             except Exception:
                 pass
 
-        # DB
-        self.db_conn = sqlite3.connect('skye_assistant.db', check_same_thread=False)
-        self._init_db()
+        # DB: shared per-process store, one connection per thread (WAL)
+        self.db = get_database()
+        self.db_writer = WriteBehindQueue(self.db)
+        self.memory = ConversationMemory(self.db_writer, self.db)
+        self._spoken = []
 
         # APIs
         self.wolfram_client = None
         self.openai_enabled = False
-        if WOLFRAM_AVAILABLE and Config.WOLFRAM_APP_ID:
-            try:
-                self.wolfram_client = wolframalpha.Client(Config.WOLFRAM_APP_ID)
-            except Exception:
-                self.wolfram_client = None
+        self.chat_client = None
+        if Config.WOLFRAM_APP_ID:
+            # Short Answers API over the shared HTTP session, cached in skye_cache.db
+            self.wolfram_client = WolframClient(Config.WOLFRAM_APP_ID)
+        self.math = MathAnswerer(self.wolfram_client)
         if OPENAI_AVAILABLE and Config.OPENAI_API_KEY:
             try:
-                openai.api_key = Config.OPENAI_API_KEY
+                self.chat_client = ChatClient(Config.OPENAI_API_KEY)
                 self.openai_enabled = True
             except Exception:
                 self.openai_enabled = False
 
-        # recognizer
+        # recognizer; only the capturing thread replaces it (see _reinit_recognizer)
         self.recognizer = sr.Recognizer() if sr else None
+        self._recognizer_stale = threading.Event()
+
+        # turns are driven by events: utterance ready, speech finished, announcement due
+        self.loop = EventLoop(self._capture, self._handle_utterance, self._say, speech_done=self.tts.done)
 
         # scheduler
-        self.reminder_scheduler = ReminderScheduler(self.db_conn, self.tts)
+        self.reminder_scheduler = ReminderScheduler(self.db, self.db_writer, self.loop.announce)
+        self.notes = NoteStore(self.db)
+        self.shopping = ShoppingList(self.db)
+        # daily streak rollover runs on the reminder timer heap
+        self.habits = HabitTracker(self.db, self.reminder_scheduler.timers)
+        # local music index, rescanned in the background on the timer heap
+        self.music_library = MusicLibrary(self.db, [Config.MUSIC_DIR])
+        self.music_library.schedule_rescans(self.reminder_scheduler.timers)
+        # gapless queue; its worker thread is the only user of pygame.mixer.music
+        self.player = Player()
+        self._chime = None
+        self.media = MediaResolver()
+        # alarms share the reminder timer heap
+        self.alarms = AlarmEngine(self.db, self.db_writer, self.reminder_scheduler.timers,
+                                  AlarmSound(Config.CHIME_PATH), announce=self.loop.announce)
+
+        # reinitialise a dead microphone, TTS engine or mixer in the background
+        if self.recognizer:
+            self.health.watch('microphone', self.health.microphone_check, self._reinit_recognizer)
+        if pyttsx3:
+            self.health.watch('tts', self.health.tts_check, self._reinit_tts)
+        if pygame:
+            self.health.watch('mixer', lambda: self.health.mixer_check(pygame), self._reinit_mixer)
+        self.health.start()
+        # sampling profiler: off unless SKYE_PROFILE is set or "start profiling" is said
+        self.profiler = get_profiler()
+        self.metrics_server = None
+        if Config.METRICS_PORT:
+            try:
+                self.metrics_server = MetricsServer(self.metrics, self.health.healthy, Config.METRICS_PORT,
+                                                    Config.METRICS_HOST)
+            except OSError as e:
+                print('Metrics endpoint unavailable', e)
 
         self.last_command_time = time.time()
         print('✅ Skye initialized')
 
-    def _init_db(self):
-        cur = self.db_conn.cursor()
-        cur.execute('''CREATE TABLE IF NOT EXISTS reminders (
-            id INTEGER PRIMARY KEY, reminder TEXT, reminder_time TEXT, created_at TEXT, is_completed INTEGER DEFAULT 0
-        )''')
-        self.db_conn.commit()
+    def _reinit_recognizer(self):
+        # called on the health thread while a capture may be using the
+        # recognizer; the next listen() swaps it on the capturing thread
+        self._recognizer_stale.set()
+
+    def _reinit_tts(self):
+        # the engine belongs to the main thread; it is rebuilt there between turns
+        self.loop.call_soon(self.tts.reinit)
+
+    def _reinit_mixer(self):
+        # the player thread owns the mixer and restarts it between its own commands
+        self.player.reinit_mixer(after=self._mixer_restarted)
 
+    def _mixer_restarted(self):
+        self.alarms.sound.reset()
+        self._chime = None
+
+    @traced('speak.chime')
     def _play_chime(self):
+        # a preloaded Sound on a free channel; mixer.music belongs to the player
         if pygame and os.path.exists(Config.CHIME_PATH):
             try:
-                pygame.mixer.music.load(Config.CHIME_PATH)
-                pygame.mixer.music.play()
+                if self._chime is None:
+                    self._chime = pygame.mixer.Sound(Config.CHIME_PATH)
+                self._chime.play()
             except Exception:
                 pass
 
+    @traced('listen')
     def listen(self, timeout=5, phrase_time_limit=6):
         if not self.recognizer:
             raise RuntimeError('SpeechRecognition not available')
-        with sr.Microphone() as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+        if self._recognizer_stale.is_set():
+            self._recognizer_stale.clear()
+            # PyAudio re-enumerates devices on the next Microphone()
+            self.recognizer = sr.Recognizer()
+        recognizer = self.recognizer
         try:
-            text = self.recognizer.recognize_google(audio)
+            with sr.Microphone() as source:
+                with span('listen.calibrate'):
+                    recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                with span('listen.capture'):
+                    audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+        except sr.WaitTimeoutError:
+            self.health.record_recognition('timeout')
+            raise
+        except Exception:
+            self.health.record_recognition('error')
+            raise
+        self.health.record_capture(pcm_rms(audio.get_raw_data(), audio.sample_width))
+        try:
+            with span('listen.recognize'):
+                text = recognizer.recognize_google(audio)
+            self.health.record_recognition('ok')
             self.last_command_time = time.time()
             return text.lower()
         except sr.UnknownValueError:
+            self.health.record_recognition('unrecognised')
             return ''
         except Exception as e:
+            self.health.record_recognition('service_error')
             print('listen error', e)
             return ''
 
+    def _say(self, text: str):
+        # remember what was said this turn for the conversation log
+        self._spoken.append(text)
+        self.tts.speak(text)
+
+    @traced('speak')
     def speak_response(self, text: str):
         self._play_chime()
-        self.tts.speak(text)
+        self._say(text)
 
     def wait_for_speech_completion(self, timeout=5):
-        # simple wait; pyttsx3 runAndWait is blocking so extra wait not required
-        time.sleep(0.3)
+        return self.tts.done.wait(timeout)
+
+    def ask(self, prompt: str, **listen_args) -> str:
+        """Speak ``prompt`` and listen for the answer ('' if nothing was heard).
+
+        speak_response returns once the prompt has been spoken, so the
+        microphone opens straight away.
+        """
+        self.speak_response(prompt)
+        try:
+            return self.listen(**listen_args)
+        except Exception:
+            return ''
+
+    def metrics(self) -> dict:
+        return {
+            'singleflight': singleflight_stats(),
+            'wiki_cache': get_wiki_cache().stats.snapshot(),
+            'db_writer': self.db_writer.stats(),
+            'wolfram_cache': self.wolfram_client.cache.stats.snapshot() if self.wolfram_client else None,
+            'audio': self.health.snapshot(),
+            'player': self.player.status(),
+            'profiler': self.profiler.stats(),
+            'turns': self.loop.stats(),
+        }
+
+    def _get_json(self, integration: str, url: str, timeout=6):
+        # identical concurrent requests (e.g. several web clients) share one upstream call
+        with span('http', integration=integration):
+            return get_singleflight(integration).do(url, lambda: get_session().get(url, timeout=timeout).json())
 
     # --- Core features ---
     def tell_joke(self):
@@ -303,58 +416,45 @@ class SkyeAssistant:
         today = datetime.now().strftime('%B %d, %Y')
         self.speak_response(f'Today is {today}')
 
-    def play_music(self):
-        self.speak_response('What would you like to play? Say local or say a song name for YouTube.')
-        time.sleep(1)
-        try:
-            q = self.listen(timeout=8)
-        except Exception:
-            q = ''
+    @traced('handler.play_music')
+    def play_music(self, request: str = ''):
+        q = request.split('play', 1)[1].strip() if 'play' in request else ''
+        if q in ('', 'music', 'some music', 'a song', 'something'):
+            q = self.ask('What would you like to play? Say local or say a song name.', timeout=8)
         if not q:
             self.speak_response('No input detected.')
             return
-        if 'local' in q and pygame:
-            files = [f for f in os.listdir(Config.MUSIC_DIR) if f.lower().endswith(('.mp3', '.wav'))]
-            if files:
-                path = os.path.join(Config.MUSIC_DIR, random.choice(files))
-                try:
-                    pygame.mixer.music.load(path)
-                    pygame.mixer.music.play()
-                    self.speak_response('Playing local music')
-                except Exception as e:
-                    print('play error', e)
-                    self.speak_response('Cannot play local music right now')
-            else:
-                self.speak_response('No music files found')
+        # indexed library lookup instead of listing the music folder
+        q = q.replace('play', '').strip()
+        if 'local' in q:
+            tracks = self.music_library.random_tracks(50)
+        else:
+            tracks = self.music_library.find(q, limit=25)
+        if tracks and self.player.available:
+            self.player.set_shuffle('local' in q)
+            self.player.play(tracks)
+            self.speak_response(f'Playing {describe_track(tracks[0])}')
+        elif 'local' in q:
+            self.speak_response('No music files found')
         else:
             song = q.replace('play', '').strip()
-            if song and pywhatkit:
-                try:
-                    self.speak_response(f'Playing {song} on YouTube')
-                    pywhatkit.playonyt(song)
-                except Exception:
-                    webbrowser.open(f'https://www.youtube.com/results?search_query={song}')
+            if song:
+                # resolves (or reuses the cached URL) while the confirmation is spoken
+                self.media.play(song)
+                self.speak_response(f'Playing {song} on YouTube')
 
+    @traced('handler.search_web')
     def search_web(self, query=None):
         if not query:
-            self.speak_response('What would you like to search for?')
-            time.sleep(1)
-            try:
-                query = self.listen()
-            except Exception:
-                query = ''
+            query = self.ask('What would you like to search for?')
         if query:
             webbrowser.open(f'https://www.google.com/search?q={query}')
             self.speak_response(f'Searching for {query}')
 
+    @traced('handler.weather')
     def get_weather(self, location=None):
         if not location:
-            self.speak_response('Which city?')
-            time.sleep(1)
-            try:
-                location = self.listen()
-            except Exception:
-                location = ''
+            location = self.ask('Which city?')
         if not location:
             return
         # simple lookup using open-meteo for a few cities
@@ -363,8 +463,7 @@ class SkyeAssistant:
         if key in cities:
             lat, lon = cities[key]
             try:
-                r = requests.get(f'https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current_weather=true', timeout=6)
-                data = r.json()
+                data = self._get_json('weather', f'https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current_weather=true')
                 cw = data.get('current_weather', {})
                 temp = cw.get('temperature')
                 wind = cw.get('windspeed')
@@ -375,56 +474,83 @@ class SkyeAssistant:
         else:
             self.speak_response(f'I don\'t have data for {location}')
 
+    @traced('handler.wikipedia')
     def wikipedia_search(self, query=None):
         if not query:
-            self.speak_response('What should I look up?')
-            try:
-                query = self.listen()
-            except Exception:
-                query = ''
+            query = self.ask('What should I look up?')
         if query and wikipedia:
             try:
-                summary = wikipedia.summary(query, sentences=2)
-                self.speak_response(summary)
+                status, summary = get_wiki_cache().summary(query, sentences=2)
+                if status == WikiSummaryCache.STATUS_OK:
+                    self.speak_response(summary)
+                else:
+                    self.speak_response('Could not find that on Wikipedia')
             except Exception as e:
                 print('wiki err', e)
                 self.speak_response('Could not find that on Wikipedia')
 
+    @traced('handler.set_reminder')
     def set_reminder(self):
-        self.speak_response('What should I remind you about?')
-        time.sleep(1)
-        try:
-            text = self.listen()
-        except Exception:
-            text = ''
+        text = self.ask('What should I remind you about?')
         if not text:
             return
-        self.speak_response('When should I remind you? say in X minutes or a time')
-        time.sleep(1)
+        when = self.ask('When should I remind you? for example in 10 minutes, at 7 pm or tomorrow morning')
+        reminder_time = parse_when(when) if when else None
+        if reminder_time is None:
+            reminder_time = datetime.now().astimezone() + timedelta(minutes=Config.DEFAULT_REMINDER_LEAD_MINUTES)
+        due_at = int(reminder_time.timestamp())
+        rid = self.db_writer.submit('INSERT INTO reminders (reminder, reminder_time, created_at, due_at) VALUES (?, ?, ?, ?)', (text, reminder_time.isoformat(), datetime.now().isoformat(), due_at))
+        self.reminder_scheduler.add(rid, text, due_at)
+        day = '' if reminder_time.date() == datetime.now().date() else reminder_time.strftime('%A ')
+        self.speak_response(f'Reminder set for {day}{reminder_time.strftime("%I:%M %p")}')
+
+    @traced('handler.set_alarm')
+    def set_alarm(self, request: str):
+        m = re.search(r'(\d{1,2})(?::(\d{2}))?\s*(a\.?m\.?|p\.?m\.?)?', request)
+        if not m:
+            self.speak_response('Please say a time, for example set alarm for 7:30 am every weekday')
+            return
+        hour, minute = int(m.group(1)), int(m.group(2) or 0)
+        ampm = (m.group(3) or '').replace('.', '')
+        if ampm == 'pm' and hour < 12:
+            hour += 12
+        elif ampm == 'am' and hour == 12:
+            hour = 0
+        days = ''
+        if 'every day' in request or 'daily' in request:
+            days = 'daily'
+        elif 'weekday' in request:
+            days = 'weekdays'
+        elif 'weekend' in request:
+            days = 'weekends'
+        else:
+            names = [d for d in ['monday','tuesday','wednesday','thursday','friday','saturday','sunday'] if d in request]
+            days = ','.join(n[:3] for n in names)
         try:
-            when = self.listen()
-        except Exception:
-            when = ''
-        reminder_time = datetime.now() + timedelta(minutes=Config.DEFAULT_REMINDER_LEAD_MINUTES)
-        if when:
-            nums = re.findall(r'\d+', when)
-            if nums:
-                reminder_time = datetime.now() + timedelta(minutes=int(nums[0]))
-        cur = self.db_conn.cursor()
-        cur.execute('INSERT INTO reminders (reminder, reminder_time, created_at) VALUES (?, ?, ?)', (text, reminder_time.isoformat(), datetime.now().isoformat()))
-        self.db_conn.commit()
-        self.speak_response(f'Reminder set for {reminder_time.strftime("%I:%M %p")}')
+            when = self.alarms.add(f'{hour:02d}:{minute:02d}', days)
+        except ValueError:
+            self.speak_response('That does not look like a valid time')
+            return
+        repeat = f' repeating {days}' if days else ''
+        self.speak_response(f'Alarm set for {when.strftime("%A %I:%M %p")}{repeat}')
+
+    def list_reminders(self, request: str = ''):
+        store = ReminderStore(self.db)
+        rows = store.for_day() if 'today' in request else store.upcoming(5)
+        if rows:
+            self.speak_response('Your reminders: ' + describe(rows))
+        else:
+            self.speak_response('You have no upcoming reminders')
 
+    @traced('handler.news')
     def get_news(self):
         if Config.NEWS_API_KEY:
             try:
-                r = requests.get(f'https://newsapi.org/v2/top-headlines?country=us&pageSize=3&apiKey={Config.NEWS_API_KEY}', timeout=6)
-                data = r.json()
+                data = self._get_json('news', f'https://newsapi.org/v2/top-headlines?country=us&pageSize=3&apiKey={Config.NEWS_API_KEY}')
                 arts = data.get('articles', [])
                 for i,a in enumerate(arts[:3],1):
                     title = a.get('title')
                     self.speak_response(f'Headline {i}: {title}')
-                    time.sleep(0.5)
                 return
             except Exception:
                 pass
@@ -432,25 +558,37 @@ class SkyeAssistant:
         for i, h in enumerate(['AI advances','Climate talks','Space milestones'],1):
             self.speak_response(f'Headline {i}: {h}')
 
+    @traced('handler.math')
     def solve_math(self, problem: str):
-        try:
-            expr = problem
-            for word,sym in [('plus','+'),('minus','-'),('times','*'),('divided by','/')]:
-                expr = expr.replace(word, sym)
-            expr = re.sub(r'[^0-9+\-*/().\s]', '', expr)
-            res = safe_eval(expr)
-            self.speak_response(f'The result is {res}')
-        except Exception:
+        # local engine first; Wolfram only for what it cannot parse
+        reply, pending = self.math.answer(problem)
+        if reply:
+            self.speak_response(reply)
+        elif pending is not None:
+            self.speak_response('Still working on that, one moment')
+            pending.add_done_callback(self._late_answer)
+        else:
             self.speak_response('Could not evaluate that')
 
+    def _late_answer(self, future: Future):
+        try:
+            answer = future.result()
+        except Exception as e:
+            print('Wolfram error', e)
+            answer = None
+        # spoken by the main loop between turns, not from the worker thread
+        self.loop.announce(answer or 'Sorry, I could not find an answer to that')
+
+    @traced('handler.chat_gpt')
     def chat_gpt(self, query: str):
         if not self.openai_enabled:
             self.speak_response('OpenAI not configured')
             return
         try:
-            resp = openai.ChatCompletion.create(model='gpt-3.5-turbo', messages=[{'role':'user','content':query}], max_tokens=150)
-            reply = resp.choices[0].message.content
-            self.speak_response(reply)
+            # stream sentence by sentence so speech starts before the completion ends
+            self._play_chime()
+            # the memory window always goes along; the cache keys on the prompt and its summary
+            self.chat_client.ask(query, on_sentence=self._say, history=self.memory.messages())
         except Exception as e:
             print('gpt err', e)
             self.speak_response('GPT request failed')
@@ -499,46 +637,70 @@ class SkyeAssistant:
         self.speak_response(random.choice(tips))
 
     # Command processing
+    @traced('process_command')
     def process_command(self, cmd: str):
         if not cmd: return
         c = cmd.lower()
+        if 'profil' in c:
+            reply = handle_profiler_command(c, self.profiler)
+            if reply: return self.speak_response(reply)
+        if is_notes_request(c):
+            reply = handle_notes_command(c, self.notes, self.shopping)
+            if reply: return self.speak_response(reply)
+        if is_habit_request(c):
+            reply = handle_habit_command(c, self.habits)
+            if reply: return self.speak_response(reply)
+        if is_bulk_request(c):
+            reply = bulk_calculate(c)
+            if reply: return self.speak_response(reply)
+        if is_local_expression(c) or (self.wolfram_client and any(w in c for w in ['calculate', 'solve', 'how many', 'how much', 'integral', 'derivative', 'convert'])):
+            return self.solve_math(c)
         if 'time' in c: return self.get_time()
         if 'date' in c: return self.get_date()
         if 'joke' in c: return self.tell_joke()
         if 'weather' in c: return self.get_weather(c.replace('weather','').strip())
-        if 'play' in c: return self.play_music()
+        reply = handle_player_command(c, self.player)
+        if reply: return self.speak_response(reply)
+        if 'play' in c: return self.play_music(c)
         if 'search' in c: return self.search_web(c.replace('search','').strip())
+        if 'reminders' in c and any(w in c for w in ['show','list','next','today']): return self.list_reminders(c)
         if 'remind' in c: return self.set_reminder()
+        if 'alarm' in c: return self.set_alarm(c)
         if 'quiz' in c: return self.mini_quiz()
         if 'rps' in c or 'rock' in c or 'paper' in c or 'scissors' in c: return self.rock_paper_scissors()
         if self.openai_enabled and len(c)>3: return self.chat_gpt(c)
         return self.speak_response("I didn't understand that.")
 
+    def _capture(self) -> str:
+        # runs on the listener thread: prefer voice, fall back to typed input on error
+        try:
+            return self.listen(timeout=6)
+        except Exception as e:
+            print('Voice recognition error:', e)
+            with span('typed_input'):
+                return input('\n📝 Voice not detected. Type your command:\n> ')
+
+    def _handle_utterance(self, cmd: str) -> bool:
+        # runs inside the loop's 'turn' span
+        if Config.ASSISTANT_NAME.lower() in cmd.lower():
+            # strip name triggers
+            cmd = cmd.lower().replace(Config.ASSISTANT_NAME.lower(), '').strip()
+        if any(x in cmd.lower() for x in ['exit','quit','stop']) and not any(
+                w in cmd.lower() for w in ['music', 'song', 'track', 'playback', 'profil']):
+            self.speak_response('Goodbye!')
+            return False
+        self._spoken = []
+        self.process_command(cmd)
+        self.memory.add_turn(cmd, ' '.join(self._spoken))
+        return True
+
     def run(self):
         welcome = f'Hello! I am {Config.ASSISTANT_NAME}, your AI assistant. Say "Skye" then your command.'
         self.speak_response(welcome)
-        while True:
-            try:
-                # prefer voice, fall back to typed input on error
-                try:
-                    cmd = self.listen(timeout=6)
-                except Exception as e:
-                    print('Voice recognition error:', e)
-                    cmd = input('\n📝 Voice not detected. Type your command:\n> ')
-                if not cmd:
-                    time.sleep(1); continue
-                if Config.ASSISTANT_NAME.lower() in cmd.lower():
-                    # strip name triggers
-                    cmd = cmd.lower().replace(Config.ASSISTANT_NAME.lower(), '').strip()
-                if any(x in cmd.lower() for x in ['exit','quit','stop']):
-                    self.speak_response('Goodbye!')
-                    break
-                self.process_command(cmd)
-            except KeyboardInterrupt:
-                break
-            except Exception as e:
-                print('Run loop error', e)
-                traceback.print_exc()
+        try:
+            self.loop.run()
+        except KeyboardInterrupt:
+            pass
         self.cleanup()
 
     def cleanup(self):
@@ -546,8 +708,27 @@ class SkyeAssistant:
             self.reminder_scheduler.stop()
         except Exception:
             pass
+        if self.wolfram_client:
+            self.wolfram_client.close()
+        self.player.close()
+        self.media.close()
+        self.health.stop()
+        if self.metrics_server:
+            self.metrics_server.close()
+        tracer = get_tracer()
+        if tracer.enabled:
+            tracer.flush()
+            print(tracer.format_summary())
+        path = self.profiler.stop()
+        if path:
+            print('Profile written to', path)
         try:
-            self.db_conn.close()
+            # flush queued writes before the connections go away
+            self.db_writer.close()
+        except Exception:
+            pass
+        try:
+            self.db.close()
         except Exception:
             pass
 
@@ -581,7 +762,6 @@ def check_and_install_packages():
     """Check and install required packages"""
     required_packages = [
         "pyttsx3",
-        "pywhatkit", 
         "pyjokes",
         "wikipedia",
         "requests",
@@ -610,12 +790,27 @@ check_and_install_packages()
 
 # ==================== IMPORTS ====================
 import pyttsx3
-import pywhatkit
 import pyjokes
 import wikipedia
 import requests
 import speech_recognition as sr
 
+from skye_db import Database, get_database
+from skye_reminders import ReminderStore, describe
+from skye_scheduler import TimerHeap
+from skye_timeparse import split_when
+from skye_calc import evaluate, format_result, CalcError, is_local_expression
+from skye_bulk import bulk_calculate, is_bulk_request
+from skye_notes import NoteStore, ShoppingList, is_notes_request, handle_command as handle_notes_command
+from skye_habits import HabitTracker, is_habit_request, handle_command as handle_habit_command
+from skye_music import MusicLibrary, describe_track
+from skye_player import Player, handle_command as handle_player_command
+from skye_media import MediaResolver
+from skye_health import AudioHealthMonitor, MetricsServer, pcm_rms
+from skye_trace import get_tracer, span, traced
+from skye_profiler import get_profiler, handle_command as handle_profiler_command
+from skye_events import EventLoop
+
 # ==================== CONFIGURATION ====================
 class Config:
     # Assistant Settings
@@ -629,6 +824,11 @@ class Config:
     MUSIC_DIR = os.path.join(os.path.expanduser('~'), 'Music')
     NOTES_FILE = "skye_notes.txt"
     
+    # Opt-in localhost metrics endpoint (GET /metrics, /health); 0 disables it
+    METRICS_PORT = int(os.getenv('SKYE_METRICS_PORT', 0))
+    # Set to 0.0.0.0 (or an interface address) to let a fleet scraper reach it
+    METRICS_HOST = os.getenv('SKYE_METRICS_HOST', '127.0.0.1')
+    
     # Colors for console output
     COLORS = {
         'HEADER': '\033[95m',
@@ -646,7 +846,17 @@ class Config:
 class TTSManager:
     """Text-to-Speech Manager"""
     
-    def __init__(self):
+    def __init__(self, health: AudioHealthMonitor = None):
+        self.health = health
+        # set whenever nothing is being spoken; the listener waits on it
+        self.done = threading.Event()
+        self.done.set()
+        self.reinit()
+    
+    def reinit(self):
+        """(Re)create the speech engine"""
+        # drop the old engine first, pyttsx3.init() hands back a live cached one
+        self.engine = None
         self.engine = pyttsx3.init()
         
         # Get available voices
@@ -664,6 +874,7 @@ class TTSManager:
         self.engine.setProperty('rate', Config.VOICE_RATE)
         self.engine.setProperty('volume', Config.VOICE_VOLUME)
     
+    @traced('speak.tts')
     def speak(self, text: str):
         """Speak text"""
         if not text:
@@ -672,11 +883,19 @@ class TTSManager:
         # Print with color
         print(f"{Config.COLORS['CYAN']}🗣️ {text}{Config.COLORS['END']}")
         
+        start = time.perf_counter()
+        self.done.clear()
         try:
             self.engine.say(text)
             self.engine.runAndWait()
+            if self.health:
+                self.health.record_tts(time.perf_counter() - start)
         except Exception as e:
+            if self.health:
+                self.health.record_tts(time.perf_counter() - start, ok=False)
             print(f"{Config.COLORS['RED']}❌ Speech Error: {e}{Config.COLORS['END']}")
+        finally:
+            self.done.set()
     
     def stop(self):
         """Stop TTS"""
@@ -689,42 +908,67 @@ class TTSManager:
 class VoiceRecognizer:
     """Voice Recognition with multiple fallbacks"""
     
-    def __init__(self):
+    def __init__(self, health: AudioHealthMonitor = None):
+        self.health = health or AudioHealthMonitor()
+        self._stale = threading.Event()
+        self._build()
+    
+    def reinit(self):
+        """Ask for a fresh recognizer; the next listen() builds it on the capturing thread"""
+        self._stale.set()
+    
+    def _build(self):
+        # PyAudio re-enumerates devices on the next Microphone()
         self.recognizer = sr.Recognizer()
         self.recognizer.energy_threshold = 300
         self.recognizer.dynamic_energy_threshold = True
         self.recognizer.pause_threshold = 0.8
     
+    @traced('listen')
     def listen(self) -> str:
         """Listen for voice command with multiple fallback methods"""
+        if self._stale.is_set():
+            # a reinit requested by the health thread; never swapped mid-capture
+            self._stale.clear()
+            self._build()
+        recognizer = self.recognizer
         try:
             with sr.Microphone() as source:
                 print(f"{Config.COLORS['YELLOW']}\n🎤 Adjusting for ambient noise...{Config.COLORS['END']}")
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+                with span('listen.calibrate'):
+                    recognizer.adjust_for_ambient_noise(source, duration=1)
                 
                 print(f"{Config.COLORS['GREEN']}🎤 Listening... Speak now!{Config.COLORS['END']}")
                 
                 # Listen with timeout
-                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=8)
+                with span('listen.capture'):
+                    audio = recognizer.listen(source, timeout=5, phrase_time_limit=8)
+                self.health.record_capture(pcm_rms(audio.get_raw_data(), audio.sample_width))
                 
                 print(f"{Config.COLORS['BLUE']}🎤 Processing your speech...{Config.COLORS['END']}")
                 
                 # Try Google Speech Recognition
                 try:
-                    text = self.recognizer.recognize_google(audio)
+                    with span('listen.recognize'):
+                        text = recognizer.recognize_google(audio)
+                    self.health.record_recognition('ok')
                     print(f"{Config.COLORS['GREEN']}👤 You said: {text}{Config.COLORS['END']}")
                     return text.lower()
                 except sr.UnknownValueError:
+                    self.health.record_recognition('unrecognised')
                     print(f"{Config.COLORS['RED']}⚠ Could not understand audio{Config.COLORS['END']}")
                     return ""
                 except sr.RequestError:
+                    self.health.record_recognition('service_error')
                     print(f"{Config.COLORS['RED']}⚠ Speech service unavailable{Config.COLORS['END']}")
                     return ""
                     
         except sr.WaitTimeoutError:
+            self.health.record_recognition('timeout')
             print(f"{Config.COLORS['YELLOW']}⚠ No speech detected within timeout{Config.COLORS['END']}")
             return ""
         except Exception as e:
+            self.health.record_recognition('error')
             print(f"{Config.COLORS['RED']}❌ Voice recognition error: {e}{Config.COLORS['END']}")
             return ""
     
@@ -734,7 +978,8 @@ class VoiceRecognizer:
         
         if not voice_input:
             print(f"{Config.COLORS['YELLOW']}\n📝 Voice not detected. Type your command:{Config.COLORS['END']}")
-            text_input = input(f"{Config.COLORS['BLUE']}> {Config.COLORS['END']}")
+            with span('typed_input'):
+                text_input = input(f"{Config.COLORS['BLUE']}> {Config.COLORS['END']}")
             return text_input.lower()
         
         return voice_input
@@ -793,15 +1038,16 @@ class WikipediaService:
     """Wikipedia search service"""
     
     @staticmethod
+    @traced('handler.wikipedia')
     def search(query: str) -> str:
-        """Search Wikipedia"""
+        """Search Wikipedia (served from the persistent summary cache when possible)"""
         try:
-            summary = wikipedia.summary(query, sentences=2)
+            status, summary = get_wiki_cache().summary(query, sentences=2)
+            if status == WikiSummaryCache.STATUS_DISAMBIGUATION:
+                return f"Multiple results found for '{query}'. Please be more specific."
+            if status == WikiSummaryCache.STATUS_MISSING:
+                return f"Sorry, no information found about '{query}' on Wikipedia."
             return summary
-        except wikipedia.exceptions.DisambiguationError:
-            return f"Multiple results found for '{query}'. Please be more specific."
-        except wikipedia.exceptions.PageError:
-            return f"Sorry, no information found about '{query}' on Wikipedia."
         except:
             return f"According to general knowledge, '{query}' is an interesting topic worth exploring."
 
@@ -809,50 +1055,40 @@ class CalculationService:
     """Mathematical calculations"""
     
     @staticmethod
+    @traced('handler.calculate')
     def calculate(expression: str) -> str:
         """Calculate mathematical expression"""
+        # lists and ranges ("average of 3, 9, 12", "sum of 1 to 100")
+        bulk = bulk_calculate(expression)
+        if bulk:
+            return bulk
+        # compiled once per distinct expression and cached (see skye_calc)
         try:
-            # Clean the expression
-            expr = expression.lower()
-            replacements = {
-                'plus': '+', 'minus': '-', 'times': '*', 'multiplied by': '*',
-                'divided by': '/', 'over': '/', 'to the power of': '**',
-                'squared': '**2', 'cubed': '**3', 'square root of': 'math.sqrt(',
-                'percent': '%', 'modulus': '%', 'mod': '%'
-            }
-            
-            for word, symbol in replacements.items():
-                expr = expr.replace(word, symbol)
-            
-            # Close parentheses for square root
-            if 'math.sqrt(' in expr:
-                expr += ')'
-            
-            # Extract numbers and operators
-            expr = re.sub(r'[^0-9+\-*/().\s]', '', expr)
-            
-            # Safe evaluation
-            if expr:
-                result = eval(expr, {"__builtins__": None}, {"math": math})
-                return f"The result is {result}"
-            else:
-                return "Could not calculate that."
-                
-        except Exception as e:
+            return f"The result is {format_result(evaluate(expression))}"
+        except CalcError as e:
             return f"Calculation error: {str(e)}"
 
 class MusicPlayer:
-    """Music playback service"""
+    """Music playback service: local library through the gapless player, YouTube otherwise"""
     
-    @staticmethod
-    def play_song(song_name: str):
-        """Play song on YouTube"""
-        try:
-            pywhatkit.playonyt(song_name)
-            return f"🎵 Playing '{song_name}' on YouTube"
-        except Exception as e:
-            webbrowser.open(f"https://www.youtube.com/results?search_query={song_name}")
-            return f"🔍 Searching for '{song_name}' on YouTube"
+    def __init__(self, library: MusicLibrary = None, player: Player = None, media: MediaResolver = None):
+        self.library = library
+        self.player = player or Player()
+        self.media = media or MediaResolver()
+    
+    @traced('handler.play_song')
+    def play_song(self, song_name: str):
+        """Queue matching local tracks, or play the song on YouTube"""
+        if self.library is not None and self.player.available:
+            local = song_name.strip() == 'local'
+            tracks = self.library.random_tracks(50) if local else self.library.find(song_name, limit=25)
+            if tracks:
+                self.player.set_shuffle(local)
+                self.player.play(tracks)
+                return f"🎵 Playing '{describe_track(tracks[0])}'"
+        # the browser opens once the URL is resolved (instantly when cached)
+        self.media.play(song_name)
+        return f"🎵 Playing '{song_name}' on YouTube"
 
 class FileManager:
     """File and folder operations"""
@@ -993,32 +1229,82 @@ class Learning:
         return random.choice(facts)
 
 class ReminderService:
-    """Reminder and notes service"""
+    """Reminder service backed by the shared SQLite reminder store.
+
+    start() loads the pending dated reminders into a timer heap; each one is
+    handed to ``announce`` when it falls due and then marked completed.
+    """
     
-    def __init__(self):
-        self.reminders_file = "skye_reminders.txt"
+    PAGE_SIZE = 5
+    
+    def __init__(self, db: Database = None):
+        self.store = ReminderStore(db or get_database())
+        self._last_page_end = None
+        self.timers = None
+        self.announce = None
+        # one-time import of the old flat-file reminders
+        legacy_file = "skye_reminders.txt"
+        try:
+            imported = self.store.import_text_file(legacy_file)
+            if imported:
+                print(f"{Config.COLORS['GREEN']}✅ Imported {imported} reminders from {legacy_file}{Config.COLORS['END']}")
+        except Exception as e:
+            print(f"{Config.COLORS['RED']}❌ Reminder import failed: {e}{Config.COLORS['END']}")
+    
+    def start(self, announce):
+        """Fire reminders through ``announce``, which queues them for the main loop"""
+        self.announce = announce
+        self.timers = TimerHeap(name='skye-reminders')
+        self.timers.load((due, self._fire, (rid, text)) for rid, text, due in self.store.pending())
+    
+    def stop(self):
+        if self.timers:
+            self.timers.stop()
+    
+    def _fire(self, rid, text):
+        self.announce(f"Reminder: {text}")
+        try:
+            self.store.complete(rid)
+        except Exception as e:
+            print(f"{Config.COLORS['RED']}❌ Reminder update error: {e}{Config.COLORS['END']}")
     
     def add_reminder(self, reminder: str):
-        """Add a reminder"""
+        """Add a reminder; a trailing time such as 'tomorrow at 6' sets its due time"""
         try:
-            with open(self.reminders_file, 'a', encoding='utf-8') as f:
-                f.write(f"{datetime.datetime.now()}: {reminder}\n")
+            text, due = split_when(reminder)
+            rid = self.store.add(text or reminder, due)
+            if due and self.timers:
+                self.timers.schedule(due.timestamp(), self._fire, rid, text or reminder)
+            if due:
+                return f"📝 Reminder added: {text} ({due.strftime('%A %I:%M %p')})"
             return f"📝 Reminder added: {reminder}"
         except:
             return "❌ Could not save reminder"
     
-    def show_reminders(self):
-        """Show all reminders"""
+    def show_reminders(self, request: str = ""):
+        """Show reminders: 'next N reminders', 'reminders for today', 'more reminders'"""
         try:
-            if os.path.exists(self.reminders_file):
-                with open(self.reminders_file, 'r', encoding='utf-8') as f:
-                    reminders = f.read()
-                if reminders:
-                    return f"📝 Your reminders:\n{reminders}"
-                else:
-                    return "📝 No reminders found"
-            else:
-                return "📝 No reminders file found"
+            request = request.lower()
+            if 'today' in request:
+                rows = self.store.for_day()
+                if not rows:
+                    return "📝 No reminders for today"
+                return f"📝 Today's reminders: {describe(rows)}"
+            
+            m = re.search(r'\b(\d+)\b', request)
+            limit = min(int(m.group(1)), 20) if m else self.PAGE_SIZE
+            after = self._last_page_end if ('more' in request or 'next page' in request) else None
+            rows = self.store.upcoming(limit, after=after)
+            if rows:
+                rid, _, due = rows[-1]
+                self._last_page_end = (int(due.timestamp()), rid)
+                return f"📝 Your reminders: {describe(rows)}"
+            
+            self._last_page_end = None
+            undated = self.store.undated(limit)
+            if undated and after is None:
+                return f"📝 Your reminders: {describe(undated)}"
+            return "📝 No more reminders" if after else "📝 No reminders found"
         except:
             return "❌ Could not read reminders"
 
@@ -1032,15 +1318,17 @@ class SkyeAssistant:
         print(f"{Config.COLORS['HEADER']}{'='*70}{Config.COLORS['END']}")
         
         # Initialize services
-        self.tts = TTSManager()
-        self.voice_recognizer = VoiceRecognizer()
+        self.health = AudioHealthMonitor()
+        self.tts = TTSManager(self.health)
+        self.voice_recognizer = VoiceRecognizer(self.health)
         
         # Initialize feature managers
         self.weather = WeatherService()
         self.jokes = JokeService()
         self.wikipedia = WikipediaService()
         self.calculator = CalculationService()
-        self.music = MusicPlayer()
+        self.music = MusicPlayer(MusicLibrary(get_database(), [Config.MUSIC_DIR]))
+        self.music.library.scan_in_background()
         self.files = FileManager()
         self.web = WebServices()
         self.system = SystemControl()
@@ -1048,6 +1336,35 @@ class SkyeAssistant:
         self.stories = Stories()
         self.learning = Learning()
         self.reminders = ReminderService()
+        self.notes = NoteStore(get_database())
+        self.shopping = ShoppingList(get_database())
+        self.habits = HabitTracker(get_database())
+        try:
+            imported = self.notes.import_text_file(Config.NOTES_FILE)
+            if imported:
+                print(f"{Config.COLORS['GREEN']}✅ Imported {imported} notes from {Config.NOTES_FILE}{Config.COLORS['END']}")
+        except Exception as e:
+            print(f"{Config.COLORS['RED']}❌ Notes import failed: {e}{Config.COLORS['END']}")
+        
+        # Reinitialise a dead microphone or TTS engine in the background
+        self.health.watch('microphone', self.health.microphone_check, self.voice_recognizer.reinit)
+        self.health.watch('tts', self.health.tts_check, lambda: self.loop.call_soon(self.tts.reinit))
+        self.health.start()
+        # Listen -> process -> speak turns driven by events instead of fixed sleeps
+        self.loop = EventLoop(self._capture, self._handle_command, self.tts.speak, speech_done=self.tts.done)
+        # due reminders are spoken by the main loop between turns
+        self.reminders.start(self.loop.announce)
+        # Sampling profiler: off unless SKYE_PROFILE is set or "start profiling" is said
+        self.profiler = get_profiler()
+        self.metrics_server = None
+        if Config.METRICS_PORT:
+            try:
+                self.metrics_server = MetricsServer(
+                    lambda: {'audio': self.health.snapshot(), 'player': self.music.player.status(),
+                             'profiler': self.profiler.stats(), 'turns': self.loop.stats()},
+                    self.health.healthy, Config.METRICS_PORT, Config.METRICS_HOST)
+            except OSError as e:
+                print(f"{Config.COLORS['RED']}❌ Metrics endpoint unavailable: {e}{Config.COLORS['END']}")
         
         # Create projects directory
         os.makedirs(Config.PROJECTS_DIR, exist_ok=True)
@@ -1095,7 +1412,11 @@ class SkyeAssistant:
         • tell me a joke           - Hear a joke
         • tell me a story          - Hear a story
         • give me a fact           - Interesting fact
-        • play music [song name]   - Play on YouTube
+        • play music [song name]   - Play from your library or YouTube
+        • next/previous song       - Skip within the queue
+        • pause/resume music       - Pause or resume playback
+        • shuffle on/off           - Shuffle the queue
+        • repeat one/all/off       - Repeat mode
         • play rock paper scissors - Play game
         • play guess number        - Play game
         
@@ -1104,6 +1425,8 @@ class SkyeAssistant:
         • search [query]           - Search Google
         • what is [topic]          - Wikipedia search
         • calculate [expression]   - Math calculation
+        • average of 3, 9, 12      - Statistics over lists and ranges
+        • convert 3, 5 miles to km - Convert a list of values
         
         {Config.COLORS['GREEN']}🔹 SYSTEM CONTROL:{Config.COLORS['END']}
         • open [app]               - Open application
@@ -1111,7 +1434,16 @@ class SkyeAssistant:
         • create folder [name]     - Create folder
         • create file [name]       - Create file
         • add reminder [text]      - Add reminder
-        • show reminders           - Show all reminders
+        • show reminders           - Show upcoming reminders
+        • next 5 reminders         - Show the next few reminders
+        • reminders for today      - Show today's reminders
+        • take a note [text]       - Save a note
+        • find my note about [x]   - Search your notes
+        • add [item] to shopping list / what's on my shopping list
+        • add habit [name]         - Track a daily habit
+        • i did [habit]            - Check in a habit
+        • how are my habits        - Habit streak summary
+        • start/stop profiling     - Sample CPU stacks to a flamegraph file
         
         {Config.COLORS['GREEN']}🔹 EXAMPLES:{Config.COLORS['END']}
         • Skye what time is it?
@@ -1126,6 +1458,7 @@ class SkyeAssistant:
         print(help_text)
         self.tts.speak("Here are all the commands I understand. You can ask me about time, weather, play music, open apps, and much more!")
     
+    @traced('process_command')
     def process_command(self, command: str) -> bool:
         """Process user command"""
         cmd = command.lower().strip()
@@ -1134,8 +1467,11 @@ class SkyeAssistant:
         if Config.WAKE_WORD not in cmd and Config.NAME.lower() not in cmd:
             # Check if it's a direct command (without wake word)
             direct_commands = ['time', 'date', 'joke', 'weather', 'open', 'play', 'search', 
-                             'calculate', 'create', 'help', 'exit', 'quit', 'goodbye', 'add', 'show']
-            if not any(word in cmd for word in direct_commands):
+                             'calculate', 'create', 'help', 'exit', 'quit', 'goodbye', 'add', 'show', 'reminders',
+                             'note', 'shopping', 'bought', 'habit', 'check in', 'i did',
+                             'song', 'track', 'pause', 'resume', 'shuffle',
+                             'profil']
+            if not any(word in cmd for word in direct_commands) and not is_bulk_request(cmd):
                 return True  # Not a command for us
         
         # Remove leading wake words only (avoid stripping words occurring inside the command)
@@ -1148,6 +1484,40 @@ class SkyeAssistant:
         
         print(f"{Config.COLORS['YELLOW']}🔍 Processing: {cmd}{Config.COLORS['END']}")
         
+        # ========== NOTES & SHOPPING LIST ==========
+        if is_notes_request(cmd):
+            reply = handle_notes_command(cmd, self.notes, self.shopping)
+            if reply:
+                self.tts.speak(reply)
+                return True
+        
+        # ========== HABITS ==========
+        if is_habit_request(cmd):
+            reply = handle_habit_command(cmd, self.habits)
+            if reply:
+                self.tts.speak(reply)
+                return True
+        
+        # ========== PROFILER ==========
+        if 'profil' in cmd:
+            reply = handle_profiler_command(cmd, self.profiler)
+            if reply:
+                self.tts.speak(reply)
+                return True
+        
+        # ========== PLAYBACK CONTROLS ==========
+        reply = handle_player_command(cmd, self.music.player)
+        if reply:
+            self.tts.speak(reply)
+            return True
+        
+        # ========== BULK CALCULATIONS ==========
+        if is_bulk_request(cmd):
+            reply = bulk_calculate(cmd)
+            if reply:
+                self.tts.speak(reply)
+                return True
+        
         # ========== GREETINGS ==========
         if any(word in cmd for word in ['hello', 'hi', 'hey']):
             responses = [
@@ -1194,14 +1564,14 @@ class SkyeAssistant:
                 self.tts.speak("What song would you like to play?")
         
         # ========== WIKIPEDIA ==========
-        elif 'what is' in cmd or 'who is' in cmd:
+        elif ('what is' in cmd or 'who is' in cmd) and not is_local_expression(cmd):
             query = cmd.replace('what is', '').replace('who is', '').strip()
             if query:
                 info = self.wikipedia.search(query)
                 self.tts.speak(info[:200])  # Limit length
         
         # ========== CALCULATIONS ==========
-        elif 'calculate' in cmd or ('what is' in cmd and any(op in cmd for op in ['+', '-', '*', '/', 'plus', 'minus'])):
+        elif 'calculate' in cmd or is_local_expression(cmd):
             # Extract calculation part
             calc_part = cmd.replace('calculate', '').replace('what is', '').strip()
             if calc_part:
@@ -1268,8 +1638,8 @@ class SkyeAssistant:
                 result = self.reminders.add_reminder(reminder)
                 self.tts.speak(result)
         
-        elif 'show reminders' in cmd:
-            result = self.reminders.show_reminders()
+        elif 'reminders' in cmd and any(w in cmd for w in ['show', 'list', 'next', 'today', 'more']):
+            result = self.reminders.show_reminders(cmd)
             self.tts.speak(result)
         
         # ========== GAMES ==========
@@ -1376,35 +1746,52 @@ class SkyeAssistant:
         
         return True
     
+    def _capture(self) -> str:
+        """Get user input via voice with fallback (runs on the listener thread)"""
+        print(f"\n{Config.COLORS['HEADER']}{'='*70}{Config.COLORS['END']}")
+        print(f"{Config.COLORS['YELLOW']}💬 Speak your command (say '{Config.NAME}' first){Config.COLORS['END']}")
+        print(f"{Config.COLORS['HEADER']}{'='*70}{Config.COLORS['END']}")
+        command = self.voice_recognizer.listen_with_fallback()
+        if not command:
+            print(f"{Config.COLORS['RED']}⚠ No command received. Try again.{Config.COLORS['END']}")
+        return command
+    
+    def _handle_command(self, command: str) -> bool:
+        # runs inside the loop's 'turn' span
+        return self.process_command(command)
+    
     def run(self):
         """Main assistant loop"""
         self.display_banner()
         self.tts.speak(f"Hello! I am {Config.NAME}, your AI assistant. Ready to help!")
         
         try:
-            while True:
-                print(f"\n{Config.COLORS['HEADER']}{'='*70}{Config.COLORS['END']}")
-                print(f"{Config.COLORS['YELLOW']}💬 Speak your command (say '{Config.NAME}' first){Config.COLORS['END']}")
-                print(f"{Config.COLORS['HEADER']}{'='*70}{Config.COLORS['END']}")
-                
-                # Get user input via voice with fallback
-                command = self.voice_recognizer.listen_with_fallback()
-                
-                if command:
-                    should_continue = self.process_command(command)
-                    if not should_continue:
-                        break
-                else:
-                    print(f"{Config.COLORS['RED']}⚠ No command received. Try again.{Config.COLORS['END']}")
-                
-                time.sleep(1)
+            # the microphone reopens as soon as each reply has been spoken
+            self.loop.run()
                 
         except KeyboardInterrupt:
             print(f"\n{Config.COLORS['RED']}👋 Shutting down...{Config.COLORS['END']}")
             self.tts.speak("Goodbye!")
         
         finally:
+            self.reminders.stop()
+            self.music.player.close()
+            self.music.media.close()
+            self.health.stop()
+            if self.metrics_server:
+                self.metrics_server.close()
+            tracer = get_tracer()
+            if tracer.enabled:
+                tracer.flush()
+                print(tracer.format_summary())
+            path = self.profiler.stop()
+            if path:
+                print(f"{Config.COLORS['GREEN']}✅ Profile written to {path}{Config.COLORS['END']}")
             self.tts.stop()
+            try:
+                get_database().close()
+            except Exception:
+                pass
             print(f"\n{Config.COLORS['GREEN']}✅ Assistant stopped successfully!{Config.COLORS['END']}")
 
 # ==================== DEMO MODE ====================
@@ -1436,8 +1823,8 @@ def run_demo():
     for cmd, desc in demo_commands:
         print(f"\n{Config.COLORS['BLUE']}➡️ DEMO: {desc}{Config.COLORS['END']}")
         print(f"{Config.COLORS['YELLOW']}Command: {cmd}{Config.COLORS['END']}")
+        # the reply is spoken before process_command returns
         assistant.process_command(cmd)
-        time.sleep(2)
     
     print(f"\n{Config.COLORS['GREEN']}🎉 Demo completed! All features working perfectly!{Config.COLORS['END']}")
 
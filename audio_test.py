@@ -3,12 +3,29 @@ Skye Assistant Audio Diagnostics Tool
 =====================================
 Comprehensive audio testing for Skye AI Assistant.
 Tests TTS, speech recognition, and audio playback systems.
+
+Usage:
+    python audio_test.py              interactive tests, one after another
+    python audio_test.py --quick      essential interactive tests only
+    python audio_test.py --parallel   independent probes run concurrently
+    python audio_test.py --json       the same probes, JSON report on stdout
+
+--parallel and --json accept --silent (no audible output) and
+--fixture PATH (WAV file for the recognizer probe; a generated tone is
+used otherwise). With --json the exit status is 1 when any probe fails.
 """
 
 import os
 import sys
+import json
+import math
+import platform
+import struct
+import tempfile
 import time
 import traceback
+import wave
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 def print_header(text):
@@ -394,6 +411,194 @@ def run_comprehensive_test():
     print("3. All required packages are installed")
     print("4. Run as administrator if having permission issues")
 
+# ==================== PARALLEL PROBES ====================
+# Each probe returns (status, detail, data) and never prompts for input, so
+# they can run side by side and unattended.
+
+TEST_PHRASE = "Skye Assistant audio check."
+
+
+def write_tone_fixture(path, seconds=1.0, rate=16000, freq=440.0):
+    """Write a mono 16-bit sine tone WAV used when no fixture is given"""
+    frames = b''.join(struct.pack('<h', int(12000 * math.sin(2 * math.pi * freq * i / rate)))
+                      for i in range(int(seconds * rate)))
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(frames)
+    return path
+
+
+def _rms(raw, sample_width):
+    """Root mean square level of little-endian PCM samples"""
+    if sample_width != 2 or len(raw) < 2:
+        return 0
+    count = len(raw) // 2
+    samples = struct.unpack(f'<{count}h', raw[:count * 2])
+    return int(math.sqrt(sum(v * v for v in samples) / count))
+
+
+def probe_devices(silent=True):
+    """Enumerate capture devices and open the default microphone"""
+    import speech_recognition as sr
+    names = sr.Microphone.list_microphone_names()
+    if not names:
+        return "FAIL", "No microphones found", {'microphones': []}
+    with sr.Microphone() as source:
+        rate = source.SAMPLE_RATE
+    return "PASS", f"Found {len(names)} microphone(s)", {'microphones': names, 'default_rate': rate}
+
+
+def probe_mixer(silent=True):
+    """Initialise the pygame mixer and load (or play) the chime"""
+    import pygame
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    data = {'init': list(pygame.mixer.get_init() or ()), 'channels': pygame.mixer.get_num_channels()}
+    chime_path = "chime.wav"
+    if not os.path.exists(chime_path):
+        return "WARN", "Mixer ready, chime.wav not found", data
+    sound = pygame.mixer.Sound(chime_path)
+    data['chime_seconds'] = round(sound.get_length(), 3)
+    if silent:
+        return "PASS", "Mixer ready, chime decoded", data
+    channel = sound.play()
+    if channel is None:
+        return "WARN", "Mixer ready, no free channel for the chime", data
+    time.sleep(sound.get_length())
+    return "PASS", "Mixer ready, chime played", data
+
+
+def probe_tts(silent=True):
+    """Initialise pyttsx3 and render a phrase (to a file when silent)"""
+    import pyttsx3
+    started = time.perf_counter()
+    engine = pyttsx3.init()
+    data = {'init_seconds': round(time.perf_counter() - started, 3),
+            'voices': len(engine.getProperty('voices') or [])}
+    started = time.perf_counter()
+    if silent:
+        fd, out = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        try:
+            engine.save_to_file(TEST_PHRASE, out)
+            engine.runAndWait()
+            data['rendered_bytes'] = os.path.getsize(out)
+        finally:
+            try:
+                os.unlink(out)
+            except OSError:
+                pass
+    else:
+        engine.say(TEST_PHRASE)
+        engine.runAndWait()
+    data['speak_seconds'] = round(time.perf_counter() - started, 3)
+    if silent and not data['rendered_bytes']:
+        return "WARN", "Engine initialised but rendered no audio", data
+    return "PASS", f"Engine ready with {data['voices']} voice(s)", data
+
+
+def probe_recognizer(silent=True, fixture=None):
+    """Run the recognizer's capture pipeline on a WAV fixture"""
+    import speech_recognition as sr
+    generated = fixture is None
+    if generated:
+        fd, fixture = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        write_tone_fixture(fixture)
+    try:
+        recognizer = sr.Recognizer()
+        with sr.AudioFile(fixture) as source:
+            recognizer.adjust_for_ambient_noise(source, duration=0.2)
+            audio = recognizer.record(source)
+        raw = audio.get_raw_data()
+        data = {'fixture': None if generated else fixture, 'bytes': len(raw),
+                'sample_rate': audio.sample_rate, 'rms': _rms(raw, audio.sample_width),
+                'energy_threshold': round(recognizer.energy_threshold, 1)}
+    finally:
+        if generated:
+            try:
+                os.unlink(fixture)
+            except OSError:
+                pass
+    if not raw:
+        return "FAIL", "Fixture produced no audio frames", data
+    if not data['rms']:
+        return "WARN", "Fixture decoded but is silent", data
+    return "PASS", f"Captured {len(raw)} bytes from fixture", data
+
+
+PROBES = {
+    "devices": probe_devices,
+    "mixer": probe_mixer,
+    "tts": probe_tts,
+    "recognizer": probe_recognizer,
+}
+
+
+def _run_probe(name, func, **kwargs):
+    started = time.perf_counter()
+    try:
+        status, detail, data = func(**kwargs)
+    except ImportError as e:
+        status, detail, data = "FAIL", f"Package not installed: {e.name or e}", {}
+    except Exception as e:
+        status, detail, data = "FAIL", f"{type(e).__name__}: {e}", {}
+    return {'name': name, 'status': status, 'detail': detail,
+            'seconds': round(time.perf_counter() - started, 3), 'data': data}
+
+
+def run_parallel_diagnostics(silent=True, fixture=None, timeout=60.0):
+    """Run all probes concurrently and return a JSON-serialisable report.
+
+    The TTS probe runs on the calling thread because speech engines (SAPI on
+    Windows, NSSpeechSynthesizer on macOS) are bound to the thread that
+    created them; the other probes run on a thread pool meanwhile.
+    """
+    started = time.perf_counter()
+    pooled = [name for name in PROBES if name != "tts"]
+    with ThreadPoolExecutor(max_workers=len(pooled), thread_name_prefix='audio-probe') as pool:
+        futures = {name: pool.submit(_run_probe, name, PROBES[name], silent=silent,
+                                     **({'fixture': fixture} if name == "recognizer" else {}))
+                   for name in pooled}
+        results = {"tts": _run_probe("tts", probe_tts, silent=silent)}
+        deadline = started + timeout
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+            except Exception:
+                results[name] = {'name': name, 'status': "FAIL", 'detail': f"Timed out after {timeout:.0f}s",
+                                 'seconds': round(time.perf_counter() - started, 3), 'data': {}}
+        pool.shutdown(wait=False, cancel_futures=True)
+    probes = [results[name] for name in PROBES]
+    total = round(time.perf_counter() - started, 3)
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'host': platform.node(),
+        'platform': sys.platform,
+        'python': sys.version.split()[0],
+        'silent': silent,
+        'total_seconds': total,
+        'sequential_seconds': round(sum(p['seconds'] for p in probes), 3),
+        'passed': sum(1 for p in probes if p['status'] == "PASS"),
+        'failed': sum(1 for p in probes if p['status'] == "FAIL"),
+        'probes': probes,
+    }
+
+
+def parallel_test(silent=False, fixture=None):
+    """Human-readable run of the parallel probes"""
+    print_header("PARALLEL SKYE AUDIO PROBES")
+    report = run_parallel_diagnostics(silent=silent, fixture=fixture)
+    for probe in report['probes']:
+        print_result(probe['name'], probe['status'], f"({probe['seconds']:.2f}s) {probe['detail']}")
+    print(f"\nCompleted in {report['total_seconds']:.2f}s "
+          f"(probes took {report['sequential_seconds']:.2f}s in total)")
+    print(f"Passed: {report['passed']}/{len(report['probes'])} probes")
+    return report
+
+
 def quick_test():
     """Quick essential tests only"""
     print_header("QUICK SKYE AUDIO TEST")
@@ -417,9 +622,24 @@ def quick_test():
     
     print("\nQuick test complete!")
 
+def _option(name):
+    """Value following ``name`` on the command line, or None"""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return None
+
+
 if __name__ == "__main__":
     # Check command line arguments
-    if len(sys.argv) > 1 and sys.argv[1] == "--quick":
+    if "--json" in sys.argv:
+        report = run_parallel_diagnostics(silent="--silent" in sys.argv, fixture=_option("--fixture"))
+        print(json.dumps(report, indent=2))
+        sys.exit(1 if report['failed'] else 0)
+    elif "--parallel" in sys.argv:
+        parallel_test(silent="--silent" in sys.argv, fixture=_option("--fixture"))
+    elif len(sys.argv) > 1 and sys.argv[1] == "--quick":
         quick_test()
     else:
         try:
@@ -5,7 +5,6 @@ import sys
 packages = [
     "SpeechRecognition==3.10.0",
     "pyttsx3==2.90",
-    "pywhatkit==5.4",
     "pyjokes==0.6.0",
     "wikipedia==1.4.0",
     "requests==2.31.0"
@@ -0,0 +1,212 @@
+"""Recurring alarms for Skye Assistant.
+
+Alarms come from the ``alarms(alarm_time, days, is_active, sound_file)``
+table. Each active alarm has exactly one pending entry in the shared
+TimerHeap: its next occurrence. When it fires, the following occurrence is
+computed from its rule and pushed back, so a firing costs O(log n) however
+many alarms exist.
+
+``days`` accepts:
+  '' / 'once'                 one-shot, deactivated after it fires
+  'daily'                     every day
+  'weekdays' / 'weekends'
+  'mon,wed,fri'               day names (any prefix of 3+ letters)
+  'dom:1,15'                  days of the month
+"""
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+
+try:
+    import pygame
+except Exception:
+    pygame = None
+
+from skye_db import Database, WriteBehindQueue
+from skye_scheduler import TimerHeap
+
+_DAY_NAMES = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+_TIME_RE = re.compile(r'^\s*(\d{1,2}):(\d{2})(?::(\d{2}))?\s*$')
+
+
+def parse_rule(days: str):
+    """Return (weekdays, monthdays) sets; both None means one-shot"""
+    text = (days or '').strip().lower()
+    if text in ('', 'once'):
+        return None, None
+    if text in ('daily', 'everyday', 'every day'):
+        return set(range(7)), None
+    if text == 'weekdays':
+        return set(range(5)), None
+    if text == 'weekends':
+        return {5, 6}, None
+    if text.startswith('dom:'):
+        monthdays = {int(d) for d in text[4:].split(',') if d.strip().isdigit() and 1 <= int(d) <= 31}
+        if not monthdays:
+            raise ValueError(f'invalid day-of-month rule: {days!r}')
+        return None, monthdays
+    weekdays = set()
+    for part in re.split(r'[,\s]+', text):
+        if not part:
+            continue
+        idx = next((i for i, n in enumerate(_DAY_NAMES) if part[:3] == n), None)
+        if idx is None:
+            raise ValueError(f'invalid alarm days: {days!r}')
+        weekdays.add(idx)
+    return weekdays, None
+
+
+def parse_alarm_time(alarm_time: str):
+    m = _TIME_RE.match(alarm_time or '')
+    if not m:
+        raise ValueError(f'invalid alarm time: {alarm_time!r}')
+    h, mi, sec = int(m.group(1)), int(m.group(2)), int(m.group(3) or 0)
+    if h > 23 or mi > 59 or sec > 59:
+        raise ValueError(f'invalid alarm time: {alarm_time!r}')
+    return h, mi, sec
+
+
+def next_occurrence(alarm_time: str, days: str, after: datetime):
+    """First occurrence strictly after ``after``; None if the rule matches no day within a year"""
+    h, mi, sec = parse_alarm_time(alarm_time)
+    weekdays, monthdays = parse_rule(days)
+    candidate = after.replace(hour=h, minute=mi, second=sec, microsecond=0)
+    if weekdays is None and monthdays is None:
+        return candidate if candidate > after else candidate + timedelta(days=1)
+    if candidate <= after:
+        candidate += timedelta(days=1)
+    # bounded lazy search: at most one year of days, independent of alarm count
+    for _ in range(366):
+        if weekdays is not None and candidate.weekday() in weekdays:
+            return candidate
+        if monthdays is not None and candidate.day in monthdays:
+            return candidate
+        candidate += timedelta(days=1)
+    return None
+
+
+class AlarmSound:
+    """Sounds preloaded into memory and played on a reserved mixer channel"""
+
+    def __init__(self, default_path: str = ''):
+        self.default_path = default_path
+        self._sounds = {}
+        self._lock = threading.Lock()
+        self.channel = None
+        self._reserve()
+
+    def _reserve(self):
+        self.channel = None
+        if pygame:
+            try:
+                if not pygame.mixer.get_init():
+                    pygame.mixer.init()
+                # keep channel 0 for alarms so chimes/music never steal it
+                pygame.mixer.set_reserved(1)
+                self.channel = pygame.mixer.Channel(0)
+            except Exception:
+                self.channel = None
+
+    def reset(self):
+        """Reserve the channel and reload the Sounds again after the mixer was restarted"""
+        with self._lock:
+            paths = list(self._sounds)
+            self._sounds.clear()
+            self._reserve()
+        for path in paths:
+            self.preload(path)
+
+    def preload(self, path: str):
+        path = path or self.default_path
+        if not self.channel or not path or not os.path.exists(path):
+            return None
+        with self._lock:
+            sound = self._sounds.get(path)
+            if sound is None:
+                try:
+                    sound = self._sounds[path] = pygame.mixer.Sound(path)
+                except Exception as e:
+                    print('Alarm sound load error', e)
+                    return None
+            return sound
+
+    def play(self, path: str = '') -> bool:
+        sound = self.preload(path)
+        if sound is None:
+            return False
+        self.channel.play(sound)
+        return True
+
+
+class AlarmEngine:
+    """Schedules active alarms on a shared TimerHeap, one pending occurrence per alarm"""
+
+    def __init__(self, db: Database, writer: WriteBehindQueue, timers: TimerHeap,
+                 sound: AlarmSound, announce=None):
+        self.db = db
+        self.writer = writer
+        self.timers = timers
+        self.sound = sound
+        self.announce = announce
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        now = datetime.now()
+        jobs = []
+        rows = self.db.query('SELECT id, alarm_time, days, sound_file FROM alarms WHERE is_active=1')
+        for aid, alarm_time, days, sound_file in rows:
+            try:
+                when = next_occurrence(alarm_time, days, now)
+            except ValueError as e:
+                print('Skipping alarm', aid, e)
+                continue
+            if when is None:
+                continue
+            self.sound.preload(sound_file)
+            jobs.append((when.timestamp(), self._fire, (aid, alarm_time, days, sound_file)))
+        ids = self.timers.load(jobs)
+        with self._lock:
+            self._jobs.update((job[2][0], job_id) for job, job_id in zip(jobs, ids))
+
+    def add(self, alarm_time: str, days: str = '', sound_file: str = '') -> datetime:
+        """Persist and schedule a new alarm; returns its first occurrence"""
+        when = next_occurrence(alarm_time, days, datetime.now())
+        # synchronous insert: the id is needed to reschedule and disable the alarm
+        aid = self.db.execute(
+            'INSERT INTO alarms (alarm_time, days, is_active, sound_file) VALUES (?, ?, 1, ?)',
+            (alarm_time, days, sound_file)).lastrowid
+        self.sound.preload(sound_file)
+        self._schedule(aid, alarm_time, days, sound_file, when)
+        return when
+
+    def _schedule(self, aid, alarm_time, days, sound_file, when: datetime):
+        with self._lock:
+            self._jobs[aid] = self.timers.schedule(
+                when.timestamp(), self._fire, aid, alarm_time, days, sound_file)
+
+    def _fire(self, aid, alarm_time, days, sound_file):
+        with self._lock:
+            self._jobs.pop(aid, None)
+        if not self.sound.play(sound_file) and self.announce:
+            self.announce(f'Alarm for {alarm_time}')
+        weekdays, monthdays = parse_rule(days)
+        if weekdays is None and monthdays is None:
+            self.writer.submit('UPDATE alarms SET is_active=0 WHERE id=?', (aid,))
+            return
+        when = next_occurrence(alarm_time, days, datetime.now())
+        if when is not None:
+            self._schedule(aid, alarm_time, days, sound_file, when)
+
+    def disable(self, aid: int):
+        with self._lock:
+            job = self._jobs.pop(aid, None)
+        if job is not None:
+            self.timers.cancel(job)
+        self.writer.submit('UPDATE alarms SET is_active=0 WHERE id=?', (aid,))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._jobs)
@@ -0,0 +1,260 @@
+"""Bulk calculations over number lists and ranges for Skye Assistant.
+
+Handles requests such as "average of 3, 9, 12", "sum of 1 to 1 million",
+"standard deviation of 2, 4, 4, 4, 5, 5, 7, 9" and
+"convert 3, 5 and 10 miles to km".
+
+Ranges ("1 to 1 million", "from 0 to 100 by 5") stay arithmetic
+progressions and every statistic is computed in closed form, so their cost
+does not depend on their length; a unit conversion maps a progression to
+another progression. Explicit lists use NumPy when it is installed and
+the list is long enough to benefit, and the standard library otherwise.
+"""
+import math
+import re
+import statistics
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+from skye_calc import format_result
+
+NUMPY_MIN_LENGTH = 256      # below this, array setup costs more than it saves
+MAX_SPOKEN_VALUES = 10
+
+
+@dataclass(frozen=True)
+class Progression:
+    """start, start + step, ... (count terms); never materialised"""
+    start: float
+    step: float
+    count: int
+
+    @property
+    def last(self):
+        return self.start + self.step * (self.count - 1)
+
+    def values(self, limit: int):
+        return [self.start + self.step * i for i in range(min(self.count, limit))]
+
+
+# ---- units: name -> (dimension, scale to base unit, offset) ----
+_UNITS = {}
+for _names, _dim, _scale, _offset in [
+    (('m', 'meter', 'meters', 'metre', 'metres'), 'length', 1.0, 0.0),
+    (('km', 'kilometer', 'kilometers', 'kilometre', 'kilometres'), 'length', 1000.0, 0.0),
+    (('cm', 'centimeter', 'centimeters', 'centimetre', 'centimetres'), 'length', 0.01, 0.0),
+    (('mm', 'millimeter', 'millimeters'), 'length', 0.001, 0.0),
+    (('mi', 'mile', 'miles'), 'length', 1609.344, 0.0),
+    (('ft', 'foot', 'feet'), 'length', 0.3048, 0.0),
+    (('in', 'inch', 'inches'), 'length', 0.0254, 0.0),
+    (('yd', 'yard', 'yards'), 'length', 0.9144, 0.0),
+    (('kg', 'kilogram', 'kilograms', 'kilo', 'kilos'), 'mass', 1.0, 0.0),
+    (('g', 'gram', 'grams'), 'mass', 0.001, 0.0),
+    (('lb', 'lbs', 'pound', 'pounds'), 'mass', 0.45359237, 0.0),
+    (('oz', 'ounce', 'ounces'), 'mass', 0.028349523125, 0.0),
+    (('l', 'liter', 'liters', 'litre', 'litres'), 'volume', 1.0, 0.0),
+    (('ml', 'milliliter', 'milliliters', 'millilitre', 'millilitres'), 'volume', 0.001, 0.0),
+    (('gal', 'gallon', 'gallons'), 'volume', 3.785411784, 0.0),
+    (('c', 'celsius', 'centigrade'), 'temperature', 1.0, 0.0),
+    (('f', 'fahrenheit'), 'temperature', 5 / 9, -160 / 9),
+    (('k', 'kelvin'), 'temperature', 1.0, -273.15),
+]:
+    for _name in _names:
+        _UNITS[_name] = (_dim, _scale, _offset)
+_UNITS.update({'degrees ' + n: u for n, u in list(_UNITS.items()) if u[0] == 'temperature'})
+
+_MULTIPLIERS = {'thousand': 1e3, 'million': 1e6, 'billion': 1e9}
+_NUMBER = r'-?\d+(?:\.\d+)?(?:\s*(?:thousand|million|billion))?'
+_NUMBER_RE = re.compile(r'(-?\d+(?:\.\d+)?)(?:\s*(thousand|million|billion))?')
+_UNIT_ALT = '|'.join(sorted((re.escape(u) for u in _UNITS), key=len, reverse=True))
+_RANGE_RE = re.compile(
+    rf'^(?:the\s+)?(?:numbers\s+)?(?:from\s+)?(?P<a>{_NUMBER})\s+(?:to|through|thru|until)\s+(?P<b>{_NUMBER})'
+    rf'(?:\s+(?:by|step|in steps of|every)\s+(?P<d>{_NUMBER}))?$')
+_STAT_RE = re.compile(
+    r'^(?:what(?:\s+is|\'s)\s+|calculate\s+|compute\s+|give me\s+)?(?:the\s+)?'
+    r'(?P<op>sum of (?:the )?squares|sum|total|average|mean|median|minimum|min|maximum|max|smallest|largest|'
+    r'standard deviation|std|variance|count|how many numbers are there)\s+(?:of|in|from)\s+(?P<rest>.+?)'
+    rf'(?:\s+(?P<from>{_UNIT_ALT})\s+(?:in|to|into)\s+(?P<to>{_UNIT_ALT}))?\??$')
+_CONVERT_RE = re.compile(
+    rf'^convert\s+(?P<rest>.+?)\s+(?P<from>{_UNIT_ALT})\s+(?:to|into|in)\s+(?P<to>{_UNIT_ALT})\??$')
+_SPLIT_RE = re.compile(r'\s*(?:,|\band\b|\s)\s*')
+_DIGIT_RE = re.compile(r'\d')
+# relative slack when deciding whether a float step lands exactly on the end of a range
+_STEP_TOLERANCE = 1e-9
+
+_OP_ALIASES = {'total': 'sum', 'mean': 'average', 'min': 'minimum', 'smallest': 'minimum',
+               'max': 'maximum', 'largest': 'maximum', 'std': 'standard deviation',
+               'how many numbers are there': 'count', 'sum of the squares': 'sum of squares'}
+
+
+def _number(text: str):
+    m = _NUMBER_RE.fullmatch(text.strip())
+    if not m:
+        raise ValueError(f'not a number: {text!r}')
+    value = float(m.group(1)) * _MULTIPLIERS.get(m.group(2), 1)
+    return int(value) if value.is_integer() else value
+
+
+def _steps(a, b, d) -> int:
+    """Whole steps of ``d`` from ``a`` that stay within ``b``"""
+    if all(isinstance(v, int) for v in (a, b, d)):
+        return (b - a) // d
+    # 1 // 0.1 == 9.0, so divide and round instead, and only fall back to
+    # flooring when the quotient is clearly short of a whole number
+    q = (b - a) / d
+    n = round(q)
+    return n if abs(q - n) <= _STEP_TOLERANCE * max(1.0, abs(q)) else math.floor(q)
+
+
+def parse_values(text: str):
+    """A Progression for "1 to 100 [by 2]", otherwise a list of numbers"""
+    text = ' '.join(text.lower().replace('minus ', '-').split())
+    m = _RANGE_RE.match(text)
+    if m:
+        a, b = _number(m.group('a')), _number(m.group('b'))
+        d = abs(_number(m.group('d'))) if m.group('d') else 1
+        if d == 0:
+            raise ValueError('step must not be zero')
+        if b < a:
+            d = -d
+        return Progression(a, d, _steps(a, b, d) + 1)
+    # keep "1 million" together before splitting on spaces
+    text = re.sub(r'(\d)\s+(thousand|million|billion)\b', r'\1\2', text)
+    parts = [p for p in _SPLIT_RE.split(text) if p]
+    values = [_number(re.sub(r'(thousand|million|billion)$', r' \1', p)) for p in parts]
+    if not values:
+        raise ValueError('no numbers given')
+    return values
+
+
+def convert(values, from_unit: str, to_unit: str):
+    """Convert a Progression or list between units of the same dimension"""
+    dim_a, scale_a, off_a = _UNITS[from_unit]
+    dim_b, scale_b, off_b = _UNITS[to_unit]
+    if dim_a != dim_b:
+        raise ValueError(f'cannot convert {from_unit} to {to_unit}')
+    scale = scale_a / scale_b
+    offset = (off_a - off_b) / scale_b
+    if isinstance(values, Progression):
+        # an affine map of a progression is again a progression
+        return Progression(values.start * scale + offset, values.step * scale, values.count)
+    if np is not None and len(values) >= NUMPY_MIN_LENGTH:
+        return np.asarray(values, dtype=float) * scale + offset
+    return [v * scale + offset for v in values]
+
+
+def _progression_stat(op: str, p: Progression):
+    n, a, d = p.count, p.start, p.step
+    if n <= 0:
+        raise ValueError('the range is empty')
+    if op == 'count':
+        return n
+    if op == 'sum':
+        return n * (a + p.last) / 2 if not (isinstance(a, int) and isinstance(d, int)) else n * (a + p.last) // 2
+    if op in ('average', 'median'):
+        return (a + p.last) / 2
+    if op == 'minimum':
+        return min(a, p.last)
+    if op == 'maximum':
+        return max(a, p.last)
+    if op == 'variance':
+        return d * d * (n * n - 1) / 12
+    if op == 'standard deviation':
+        return abs(d) * math.sqrt((n * n - 1) / 12)
+    if op == 'sum of squares':
+        # sum (a + k d)^2 for k < n, with sum k = n(n-1)/2 and sum k^2 = (n-1)n(2n-1)/6
+        s1, s2 = n * (n - 1) // 2, (n - 1) * n * (2 * n - 1) // 6
+        return n * a * a + 2 * a * d * s1 + d * d * s2
+    raise ValueError(f'unsupported operation {op!r}')
+
+
+def _list_stat(op: str, values):
+    if len(values) == 0:
+        raise ValueError('no numbers given')
+    if np is not None and (len(values) >= NUMPY_MIN_LENGTH or not isinstance(values, list)):
+        arr = np.asarray(values, dtype=float)
+        fn = {
+            'count': lambda: arr.size, 'sum': arr.sum, 'average': arr.mean, 'median': lambda: np.median(arr),
+            'minimum': arr.min, 'maximum': arr.max, 'variance': arr.var, 'standard deviation': arr.std,
+            'sum of squares': lambda: np.dot(arr, arr),
+        }.get(op)
+        if fn is None:
+            raise ValueError(f'unsupported operation {op!r}')
+        result = fn()
+        return result.item() if hasattr(result, 'item') else result
+    if op == 'count':
+        return len(values)
+    if op == 'sum':
+        return sum(values) if all(isinstance(v, int) for v in values) else math.fsum(values)
+    if op == 'average':
+        return statistics.fmean(values)
+    if op == 'median':
+        return statistics.median(values)
+    if op == 'minimum':
+        return min(values)
+    if op == 'maximum':
+        return max(values)
+    if op == 'variance':
+        return statistics.pvariance(values)
+    if op == 'standard deviation':
+        return statistics.pstdev(values)
+    if op == 'sum of squares':
+        return math.fsum(v * v for v in values)
+    raise ValueError(f'unsupported operation {op!r}')
+
+
+def reduce(op: str, values):
+    """Apply a statistic (sum, average, median, minimum, maximum, variance,
+    standard deviation, sum of squares, count) to a Progression or list"""
+    op = _OP_ALIASES.get(op, op)
+    if isinstance(values, Progression):
+        return _progression_stat(op, values)
+    return _list_stat(op, values)
+
+
+def _speak_values(values) -> str:
+    if isinstance(values, Progression):
+        shown, total = values.values(MAX_SPOKEN_VALUES), values.count
+    else:
+        shown, total = list(values[:MAX_SPOKEN_VALUES]), len(values)
+    text = ', '.join(format_result(round(float(v), 6)) for v in shown)
+    return text + (f' and {total - len(shown)} more' if total > len(shown) else '')
+
+
+def is_bulk_request(text: str) -> bool:
+    """True if ``text`` is a list/range statistic or a column conversion with numbers in it"""
+    t = ' '.join((text or '').lower().split())
+    m = _CONVERT_RE.match(t) or _STAT_RE.match(t)
+    return bool(m and _DIGIT_RE.search(m.group('rest')))
+
+
+def bulk_calculate(text: str):
+    """Answer a list/range statistic or a column conversion; None if ``text`` is not one"""
+    t = ' '.join((text or '').lower().split())
+    m = _CONVERT_RE.match(t)
+    if m and _DIGIT_RE.search(m.group('rest')):
+        try:
+            values = convert(parse_values(m.group('rest')), m.group('from'), m.group('to'))
+        except ValueError as e:
+            return f'Calculation error: {e}'
+        return f"In {m.group('to')}: {_speak_values(values)}"
+    m = _STAT_RE.match(t)
+    # "the sum of all fears" is a question for the wiki or chat, not a calculation
+    if not m or not _DIGIT_RE.search(m.group('rest')):
+        return None
+    op = _OP_ALIASES.get(m.group('op'), m.group('op'))
+    try:
+        values = parse_values(m.group('rest'))
+        if m.group('from'):
+            values = convert(values, m.group('from'), m.group('to'))
+        result = reduce(op, values)
+    except ValueError as e:
+        return f'Calculation error: {e}'
+    if isinstance(result, float):
+        result = round(result, 6)
+    unit = f" {m.group('to')}" if m.group('to') and op not in ('count', 'variance', 'sum of squares') else ''
+    return f'The {op} is {format_result(result)}{unit}'
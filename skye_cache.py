@@ -0,0 +1,392 @@
+"""Persistent lookup caches for Skye Assistant.
+
+Provides a Wikipedia summary cache, a generic TTL response cache and a
+single-flight helper that lets concurrent identical calls share one
+upstream request. Wikipedia summaries are keyed by normalised query and
+sentence count; an FTS5 index over the stored queries lets near-duplicate
+questions ("who is albert einstein" vs "albert einstein") reuse the same
+entry. Disambiguation and missing-page results are cached too (negative
+caching) so repeated bad questions do not hit the network. When a live
+lookup fails, any stale entry is served as an offline fallback.
+"""
+import os
+import re
+import time
+import sqlite3
+import json
+import threading
+from concurrent.futures import Future
+
+try:
+    import wikipedia
+except Exception:
+    wikipedia = None
+
+
+CACHE_DB_PATH = os.getenv(
+    'SKYE_CACHE_DB',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skye_cache.db'),
+)
+
+# filler phrases spoken before the actual topic
+_FILLER_RE = re.compile(
+    r"^(?:(?:please|hey|ok|okay)\s+)*"
+    r"(?:what|who|where|when)\s+(?:is|are|was|were)\s+|"
+    r"^(?:tell\s+me\s+(?:about|what)\s+|look\s+up\s+|search\s+(?:for\s+)?|define\s+)"
+)
+_STOPWORDS = {'a', 'an', 'the', 'of', 'about', 'please'}
+# words keep symbols that change their meaning: "c++", "c#", "at&t", "node.js"
+_TOKEN_RE = re.compile(r"[a-z0-9](?:[a-z0-9+#&]|\.(?=[a-z0-9]))*")
+
+
+def normalise_query(query: str) -> str:
+    """Lower-case, strip filler words/punctuation and collapse whitespace"""
+    q = (query or '').lower().strip()
+    q = _FILLER_RE.sub('', q)
+    tokens = [t for t in _TOKEN_RE.findall(q) if t not in _STOPWORDS]
+    return ' '.join(tokens)
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters with cache-hit latency tracking"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.stale_served = 0
+        self.evictions = 0
+        self._hit_time = 0.0
+
+    def record_hit(self, elapsed: float, kind: str = 'hits'):
+        with self._lock:
+            setattr(self, kind, getattr(self, kind) + 1)
+            self._hit_time += elapsed
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            served = self.hits + self.fuzzy_hits + self.negative_hits
+            total = served + self.misses
+            return {
+                'hits': self.hits,
+                'fuzzy_hits': self.fuzzy_hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'stale_served': self.stale_served,
+                'evictions': self.evictions,
+                'hit_rate': (served / total) if total else 0.0,
+                'avg_hit_latency_ms': (self._hit_time / served * 1000) if served else 0.0,
+            }
+
+
+class WikiSummaryCache:
+    """SQLite-backed Wikipedia summary cache with FTS lookup and LRU eviction"""
+
+    STATUS_OK = 'ok'
+    STATUS_DISAMBIGUATION = 'disambiguation'
+    STATUS_MISSING = 'missing'
+
+    def __init__(self, path: str = CACHE_DB_PATH, max_entries: int = 5000,
+                 max_bytes: int = 5 * 1024 * 1024, ttl: float = 30 * 86400,
+                 negative_ttl: float = 86400):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._init_db()
+
+    def _init_db(self):
+        with self._lock, self.conn:
+            self.conn.executescript('''
+                CREATE TABLE IF NOT EXISTS wiki_summaries (
+                    id INTEGER PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    sentences INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    summary TEXT,
+                    size INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    UNIQUE (query, sentences)
+                );
+                CREATE INDEX IF NOT EXISTS idx_wiki_last_access ON wiki_summaries(last_access);
+                CREATE VIRTUAL TABLE IF NOT EXISTS wiki_summaries_fts USING fts5(
+                    query, content='wiki_summaries', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS wiki_summaries_ai AFTER INSERT ON wiki_summaries BEGIN
+                    INSERT INTO wiki_summaries_fts(rowid, query) VALUES (new.id, new.query);
+                END;
+                CREATE TRIGGER IF NOT EXISTS wiki_summaries_ad AFTER DELETE ON wiki_summaries BEGIN
+                    INSERT INTO wiki_summaries_fts(wiki_summaries_fts, rowid, query)
+                    VALUES ('delete', old.id, old.query);
+                END;
+            ''')
+
+    # --- lookup ---
+    def _exact(self, key: str, sentences: int):
+        return self.conn.execute(
+            'SELECT id, status, summary, created_at FROM wiki_summaries WHERE query=? AND sentences=?',
+            (key, sentences)).fetchone()
+
+    def _fuzzy(self, key: str, sentences: int):
+        """Find a cached query with the same set of words via the FTS index"""
+        tokens = set(key.split())
+        if not tokens:
+            return None
+        match = ' AND '.join(f'"{t}"' for t in sorted(tokens))
+        rows = self.conn.execute(
+            '''SELECT w.id, w.status, w.summary, w.created_at, w.query
+               FROM wiki_summaries_fts f JOIN wiki_summaries w ON w.id = f.rowid
+               WHERE wiki_summaries_fts MATCH ? AND w.sentences = ?
+               ORDER BY bm25(wiki_summaries_fts) LIMIT 5''',
+            (match, sentences)).fetchall()
+        for rid, status, summary, created_at, query in rows:
+            if set(query.split()) == tokens:
+                return rid, status, summary, created_at
+        return None
+
+    def _is_fresh(self, status: str, created_at: float) -> bool:
+        ttl = self.ttl if status == self.STATUS_OK else self.negative_ttl
+        return time.time() - created_at < ttl
+
+    def get(self, query: str, sentences: int = 2, allow_stale: bool = False):
+        """Return (status, summary) from the cache, or None on a miss"""
+        key = normalise_query(query)
+        if not key:
+            return None
+        start = time.perf_counter()
+        with self._lock:
+            row = self._exact(key, sentences)
+            kind = 'hits'
+            if row is None:
+                row = self._fuzzy(key, sentences)
+                kind = 'fuzzy_hits'
+            if row is None:
+                return None
+            rid, status, summary, created_at = row
+            if not allow_stale and not self._is_fresh(status, created_at):
+                return None
+            with self.conn:
+                self.conn.execute('UPDATE wiki_summaries SET last_access=? WHERE id=?', (time.time(), rid))
+        if status != self.STATUS_OK:
+            kind = 'negative_hits'
+        self.stats.record_hit(time.perf_counter() - start, kind)
+        return status, summary
+
+    def put(self, query: str, sentences: int, status: str, summary: str = ''):
+        key = normalise_query(query)
+        if not key:
+            return
+        now = time.time()
+        size = len((summary or '').encode('utf-8'))
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM wiki_summaries WHERE query=? AND sentences=?', (key, sentences))
+            self.conn.execute(
+                'INSERT INTO wiki_summaries (query, sentences, status, summary, size, created_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, sentences, status, summary, size, now, now))
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until both bounds are respected"""
+        count, total = self.conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM wiki_summaries').fetchone()
+        evicted = 0
+        while count > self.max_entries or total > self.max_bytes:
+            batch = max(1, count - self.max_entries, count // 20)
+            rows = self.conn.execute(
+                'SELECT id, size FROM wiki_summaries ORDER BY last_access LIMIT ?', (batch,)).fetchall()
+            if not rows:
+                break
+            self.conn.executemany('DELETE FROM wiki_summaries WHERE id=?', [(r[0],) for r in rows])
+            count -= len(rows)
+            total -= sum(r[1] for r in rows)
+            evicted += len(rows)
+        if evicted:
+            self.stats.incr('evictions', evicted)
+
+    # --- live fetch ---
+    def summary(self, query: str, sentences: int = 2):
+        """Return (status, summary), fetching from Wikipedia on a cache miss.
+
+        Raises the underlying error only when the network lookup fails and no
+        cached entry (fresh or stale) exists.
+        """
+        cached = self.get(query, sentences)
+        if cached is not None:
+            return cached
+        self.stats.incr('misses')
+        if wikipedia is None:
+            raise RuntimeError('wikipedia package not available')
+        try:
+            key = (normalise_query(query), sentences)
+            text = get_singleflight('wikipedia').do(key, wikipedia.summary, query, sentences=sentences)
+            result = (self.STATUS_OK, text)
+        except wikipedia.exceptions.DisambiguationError:
+            result = (self.STATUS_DISAMBIGUATION, '')
+        except wikipedia.exceptions.PageError:
+            result = (self.STATUS_MISSING, '')
+        except Exception:
+            stale = self.get(query, sentences, allow_stale=True)
+            if stale is None:
+                raise
+            self.stats.incr('stale_served')
+            return stale
+        self.put(query, sentences, *result)
+        return result
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class ResponseCache:
+    """Generic persistent key/value cache with TTL and LRU eviction.
+
+    Values are stored as JSON in their own table (namespace) of the cache DB,
+    so several integrations can share one file.
+    """
+
+    def __init__(self, namespace: str, path: str = CACHE_DB_PATH, ttl: float = 86400,
+                 max_entries: int = 2000):
+        if not re.fullmatch(r'[a-z_]+', namespace):
+            raise ValueError(f'invalid cache namespace: {namespace!r}')
+        self.table = f'cache_{namespace}'
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute(f'''CREATE TABLE IF NOT EXISTS {self.table} (
+                key TEXT PRIMARY KEY, value TEXT, expires_at REAL, last_access REAL
+            )''')
+            self.conn.execute(
+                f'CREATE INDEX IF NOT EXISTS idx_{self.table}_last_access ON {self.table}(last_access)')
+
+    def get(self, key: str):
+        """Return the cached value, or None when missing or expired"""
+        start = time.perf_counter()
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                f'SELECT value, expires_at FROM {self.table} WHERE key=?', (key,)).fetchone()
+            if row is None or row[1] < now:
+                self.stats.incr('misses')
+                return None
+            with self.conn:
+                self.conn.execute(f'UPDATE {self.table} SET last_access=? WHERE key=?', (now, key))
+        self.stats.record_hit(time.perf_counter() - start)
+        return json.loads(row[0])
+
+    def put(self, key: str, value, ttl: float = None):
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        with self._lock, self.conn:
+            self.conn.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), expires, now))
+            count = self.conn.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+            excess = count - self.max_entries
+            if excess > 0:
+                self.conn.execute(
+                    f'DELETE FROM {self.table} WHERE key IN '
+                    f'(SELECT key FROM {self.table} ORDER BY last_access LIMIT ?)', (excess,))
+                self.stats.incr('evictions', excess)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one in-flight call.
+
+    The first caller (the leader) runs the function; callers arriving while
+    it is running wait on the same future and receive its result or error.
+    """
+
+    def __init__(self, name: str = ''):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.executed = 0
+        self.deduplicated = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            self.calls += 1
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                self.executed += 1
+                fut = Future()
+                self._calls[key] = fut
+            else:
+                self.deduplicated += 1
+        if not leader:
+            return fut.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'executed': self.executed,
+                'deduplicated': self.deduplicated,
+                'in_flight': len(self._calls),
+            }
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def get_singleflight(name: str) -> SingleFlight:
+    """Shared single-flight group for one external integration (weather, news, ...)"""
+    with _flights_lock:
+        flight = _flights.get(name)
+        if flight is None:
+            flight = _flights[name] = SingleFlight(name)
+        return flight
+
+
+def singleflight_stats() -> dict:
+    """Per-integration call/deduplication counters"""
+    with _flights_lock:
+        flights = list(_flights.values())
+    return {f.name: f.stats() for f in flights}
+
+
+_wiki_cache = None
+_wiki_cache_lock = threading.Lock()
+
+
+def get_wiki_cache() -> WikiSummaryCache:
+    """Process-wide Wikipedia summary cache"""
+    global _wiki_cache
+    with _wiki_cache_lock:
+        if _wiki_cache is None:
+            _wiki_cache = WikiSummaryCache()
+        return _wiki_cache
@@ -0,0 +1,385 @@
+"""Expression engine for Skye Assistant calculations.
+
+Spoken math ("square root of 16 plus 2 to the power of 3") is rewritten to
+symbols, tokenised with one precompiled regex and parsed by a small
+precedence-climbing parser into a tree of closures, with constant
+sub-expressions folded at compile time. Compiled expressions are kept in an
+LRU cache, so repeating a calculation skips tokenising and parsing.
+
+Evaluation is bounded: exponents, factorials and intermediate magnitudes are
+checked before they are computed, so "9 to the power of 9 to the power of 9"
+fails fast with CalcError instead of hanging the process.
+
+Run ``python skye_calc.py --bench`` for an evaluations-per-second benchmark.
+"""
+import math
+import operator
+import re
+import sys
+import time
+from functools import lru_cache
+
+MAX_EXPONENT = 10_000        # largest allowed exponent
+MAX_DIGITS = 1_000           # largest allowed magnitude, in decimal digits
+MAX_FACTORIAL = 500
+CACHE_SIZE = 1024
+
+
+class CalcError(ValueError):
+    """The expression is invalid or exceeds the evaluation limits"""
+
+
+# ---- spoken form -> symbols ----
+_PHRASES = [
+    ('to the power of', '^'), ('raised to', '^'), ('multiplied by', '*'), ('divided by', '/'),
+    ('square root of', ' sqrt '), ('cube root of', ' cbrt '), ('percent of', '/100*'),
+    ('squared', '^2'), ('cubed', '^3'), ('percent', '/100'), ('modulus', '%'), ('modulo', '%'), ('mod', '%'),
+    ('plus', '+'), ('minus', '-'), ('times', '*'), ('over', '/'), ('factorial of', ' factorial '),
+    ('natural log of', ' ln '), ('log of', ' log '), ('sine of', ' sin '), ('cosine of', ' cos '),
+    ('tangent of', ' tan '), ('degrees', '°'), ('degree', '°'), ('×', '*'), ('÷', '/'), ('**', '^'),
+]
+_PHRASE_RE = re.compile('|'.join(r'\b' + re.escape(p) + r'\b' if p[0].isalpha() else re.escape(p)
+                                  for p, _ in _PHRASES))
+_PHRASE_MAP = dict(_PHRASES)
+# "5 factorial" is the postfix operator; "factorial of 5" and "factorial(5)" stay the function
+_POSTFIX_FACTORIAL_RE = re.compile(r'(?<=[\d)])\s*factorial\b(?!\s*(?:\(|of\b))')
+_TIMES_X_RE = re.compile(r'(?<=\d)\s*x\s*(?=[\d(])')
+_THOUSANDS_RE = re.compile(r'(?<=\d),(?=\d{3}\b)')
+
+_TOKEN_RE = re.compile(r'\s*(?:(\d+\.?\d*(?:e[+-]?\d+)?|\.\d+)|([a-z_][a-z_0-9]*)|(//|[-+*/%^!°(),]))')
+
+
+def _check_magnitude(value):
+    if isinstance(value, int):
+        if value.bit_length() > MAX_DIGITS * 3.33:
+            raise CalcError('result is too large')
+    elif isinstance(value, float) and not math.isfinite(value):
+        raise CalcError('result is too large')
+    return value
+
+
+def _pow(base, exp):
+    if isinstance(exp, float) and exp.is_integer() and abs(exp) <= MAX_EXPONENT:
+        exp = int(exp)
+    if abs(exp) > MAX_EXPONENT:
+        raise CalcError('exponent is too large')
+    if base == 0 and exp < 0:
+        raise CalcError('division by zero')
+    if base not in (0, 1, -1) and abs(exp) > 1 and abs(exp * math.log10(abs(base))) > MAX_DIGITS:
+        raise CalcError('result is too large')
+    try:
+        result = base ** exp
+    except OverflowError:
+        raise CalcError('result is too large')
+    if isinstance(result, complex):
+        raise CalcError('result is not a real number')
+    return result
+
+
+def _factorial(n):
+    if n != int(n) or n < 0:
+        raise CalcError('factorial needs a whole number')
+    if n > MAX_FACTORIAL:
+        raise CalcError('factorial is too large')
+    return math.factorial(int(n))
+
+
+def _div(a, b):
+    if b == 0:
+        raise CalcError('division by zero')
+    result = a / b
+    return int(result) if isinstance(a, int) and isinstance(b, int) and a % b == 0 else result
+
+
+def _real(fn):
+    def wrapper(*args):
+        try:
+            return fn(*args)
+        except (ValueError, ZeroDivisionError):
+            raise CalcError(f'{fn.__name__} is undefined there')
+        except OverflowError:
+            raise CalcError('result is too large')
+    wrapper.__name__ = fn.__name__
+    return wrapper
+
+
+FUNCTIONS = {
+    'sqrt': _real(math.sqrt), 'cbrt': lambda x: math.copysign(abs(x) ** (1 / 3), x),
+    'sin': math.sin, 'cos': math.cos, 'tan': _real(math.tan),
+    'asin': _real(math.asin), 'acos': _real(math.acos), 'atan': math.atan,
+    'log': _real(math.log), 'ln': _real(math.log), 'log10': _real(math.log10), 'log2': _real(math.log2),
+    'exp': _real(math.exp), 'abs': abs, 'round': round, 'floor': math.floor, 'ceil': math.ceil,
+    'factorial': _factorial,
+}
+CONSTANTS = {'pi': math.pi, 'e': math.e, 'tau': math.tau}
+
+_BINARY = {
+    '+': (10, operator.add), '-': (10, operator.sub),
+    '*': (20, operator.mul), '/': (20, _div), '//': (20, operator.floordiv), '%': (20, operator.mod),
+    '^': (30, _pow),
+}
+_RIGHT_ASSOC = {'^'}
+_UNARY_PRECEDENCE = 25   # -2^2 == -(2^2)
+
+
+def spoken_to_expr(text: str) -> str:
+    """Rewrite spoken operators ("plus", "squared", "square root of") as symbols"""
+    t = _THOUSANDS_RE.sub('', (text or '').lower())
+    t = _POSTFIX_FACTORIAL_RE.sub('!', t)
+    t = _PHRASE_RE.sub(lambda m: _PHRASE_MAP[m.group(0)], t)
+    return _TIMES_X_RE.sub('*', t)
+
+
+def _tokenise(expr: str, names, dropped: list = None) -> list:
+    tokens, pos, expr = [], 0, expr.rstrip()
+    while pos < len(expr):
+        m = _TOKEN_RE.match(expr, pos)
+        if not m or m.end() == pos:
+            raise CalcError(f'unexpected character {expr[pos:].strip()[:1]!r}')
+        pos = m.end()
+        number, name, symbol = m.groups()
+        if number is not None:
+            tokens.append(('num', float(number) if ('.' in number or 'e' in number) else int(number)))
+        elif name is not None:
+            if name in FUNCTIONS or name in CONSTANTS or name in names:
+                tokens.append(('name', name))
+            elif dropped is not None:
+                dropped.append(name)
+            # any other word ("what", "is", "of") is filler from speech
+        else:
+            tokens.append(('op', symbol))
+    return tokens
+
+
+class _Parser:
+    """Precedence climbing over the token list; produces (is_constant, closure) pairs"""
+
+    def __init__(self, tokens, names):
+        self.tokens = tokens
+        self.pos = 0
+        self.names = names
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        tok = self.peek()
+        self.pos += 1
+        return tok
+
+    def expect(self, symbol):
+        kind, value = self.take()
+        if kind != 'op' or value != symbol:
+            raise CalcError(f'expected {symbol!r}')
+
+    def parse(self):
+        if not self.tokens:
+            raise CalcError('empty expression')
+        node = self.expression(0)
+        if self.pos != len(self.tokens):
+            raise CalcError(f'unexpected {self.peek()[1]!r}')
+        return node
+
+    def expression(self, min_prec):
+        left = self.unary()
+        while True:
+            kind, symbol = self.peek()
+            if kind != 'op' or symbol not in _BINARY:
+                return left
+            prec, fn = _BINARY[symbol]
+            if prec < min_prec:
+                return left
+            self.take()
+            right = self.expression(prec if symbol in _RIGHT_ASSOC else prec + 1)
+            left = _binary(fn, left, right)
+
+    def unary(self):
+        kind, symbol = self.peek()
+        if kind == 'op' and symbol in ('-', '+'):
+            self.take()
+            operand = self.expression(_UNARY_PRECEDENCE)
+            return operand if symbol == '+' else _apply(operator.neg, operand)
+        return self.postfix(self.primary())
+
+    def postfix(self, node):
+        while self.peek() in (('op', '!'), ('op', '°')):
+            _, symbol = self.take()
+            node = _apply(_factorial if symbol == '!' else math.radians, node)
+        return node
+
+    def primary(self):
+        kind, value = self.take()
+        if kind == 'num':
+            return _constant(value)
+        if kind == 'op' and value == '(':
+            node = self.expression(0)
+            self.expect(')')
+            return node
+        if kind == 'name':
+            if value in FUNCTIONS:
+                return self.call(value)
+            if value in CONSTANTS:
+                return _constant(CONSTANTS[value])
+            return False, lambda env, name=value: env[name]
+        raise CalcError('incomplete expression' if kind is None else f'unexpected {value!r}')
+
+    def call(self, name):
+        fn = FUNCTIONS[name]
+        if self.peek() == ('op', '('):
+            self.take()
+            args = [self.expression(0)]
+            while self.peek() == ('op', ','):
+                self.take()
+                args.append(self.expression(0))
+            self.expect(')')
+        else:
+            # spoken form without parentheses: "sqrt 16 + 2" == sqrt(16) + 2
+            args = [self.postfix(self.unary_operand())]
+        return _apply(fn, *args)
+
+    def unary_operand(self):
+        kind, symbol = self.peek()
+        if kind == 'op' and symbol == '-':
+            self.take()
+            return _apply(operator.neg, self.unary_operand())
+        return self.primary()
+
+
+def _constant(value):
+    return True, lambda env: value
+
+
+def _run(fn, args):
+    try:
+        return _check_magnitude(fn(*args))
+    except CalcError:
+        raise
+    except ZeroDivisionError:
+        # "5 mod 0" would otherwise say "integer modulo by zero"
+        raise CalcError('division by zero')
+    except (ArithmeticError, ValueError, TypeError) as e:
+        raise CalcError(str(e))
+
+
+def _apply(fn, *nodes):
+    if all(const for const, _ in nodes):
+        value = _run(fn, [f(None) for _, f in nodes])
+        return _constant(value)
+    funcs = [f for _, f in nodes]
+    if len(funcs) == 1:
+        (f,) = funcs
+        return False, lambda env: _run(fn, (f(env),))
+    return False, lambda env: _run(fn, [f(env) for f in funcs])
+
+
+def _binary(fn, left, right):
+    if left[0] and right[0]:
+        return _constant(_run(fn, (left[1](None), right[1](None))))
+    lf, rf = left[1], right[1]
+    return False, lambda env: _run(fn, (lf(env), rf(env)))
+
+
+class Expression:
+    """A compiled expression; call it with values for its variables"""
+
+    __slots__ = ('source', 'names', '_fn', 'constant')
+
+    def __init__(self, source: str, names=()):
+        self.source = source
+        self.names = frozenset(names)
+        self.constant, self._fn = _Parser(_tokenise(source, self.names), self.names).parse()
+
+    def __call__(self, **env):
+        missing = self.names.difference(env) if not self.constant else ()
+        if missing:
+            raise CalcError(f'missing value for {", ".join(sorted(missing))}')
+        return self._fn(env)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expr(text: str, names: frozenset = frozenset()) -> Expression:
+    """Compile (and cache) a spoken or symbolic expression"""
+    return Expression(spoken_to_expr(text), names)
+
+
+def evaluate(text: str, **env):
+    """Evaluate a spoken or symbolic expression, e.g. ``evaluate('2 plus 3 squared')``"""
+    return compile_expr(text, frozenset(env))(**env)
+
+
+# words that may surround a locally computable expression
+_FILLER_WORDS = frozenset('what whats is the of calculate compute solve equals equal to how much please and'.split())
+
+
+def is_local_expression(text: str) -> bool:
+    """True when ``text`` is plain arithmetic the local engine can answer on its own
+    (numbers, operators, known functions and filler words only)"""
+    dropped = []
+    try:
+        tokens = _tokenise(spoken_to_expr(text).replace("'", ''), frozenset(), dropped)
+    except CalcError:
+        return False
+    if any(word not in _FILLER_WORDS for word in dropped):
+        return False
+    return any(kind == 'num' for kind, _ in tokens)
+
+
+def format_result(value) -> str:
+    """Speakable number: integers as-is, floats to 10 significant digits"""
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f'{value:.10g}'
+    return str(value)
+
+
+# ---- benchmark ----
+BENCH_EXPRESSIONS = [
+    '2 + 3 * 4', '12 divided by 4 plus 7', 'square root of 144 plus 2 squared', '(1 + 2) * (3 + 4) / 5',
+    '2 to the power of 10', 'sin(pi / 6) + cos(0)', 'log(100, 10) * 3', '15 percent of 80',
+    '5! - 3^3', '-2^2 + 17 % 5', '10 x 12 - 7', 'abs(-3.5) * floor(2.7)',
+]
+
+
+def benchmark(rounds: int = 20000):
+    import ast
+    for text in BENCH_EXPRESSIONS:
+        print(f'  {text!r:40} -> {format_result(evaluate(text))}')
+    n = rounds * len(BENCH_EXPRESSIONS)
+
+    def timed(label, fn):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for text in BENCH_EXPRESSIONS:
+                fn(text)
+        elapsed = time.perf_counter() - start
+        print(f'{label:24} {n / elapsed:12,.0f} evals/s  {elapsed / n * 1e6:6.2f} us each')
+
+    timed('cached', evaluate)
+    timed('compile every time', lambda t: Expression(spoken_to_expr(t))())
+    poly = compile_expr('3*x^2 - 2*x + 1', frozenset({'x'}))
+    start = time.perf_counter()
+    for i in range(n):
+        poly(x=i)
+    elapsed = time.perf_counter() - start
+    print(f'{"with a variable":24} {n / elapsed:12,.0f} evals/s  {elapsed / n * 1e6:6.2f} us each')
+    simple = ['2 + 3 * 4', '(1 + 2) * (3 + 4) / 5', '2 ** 10']
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in simple:
+            compile(ast.parse(text, mode='eval'), '<expr>', 'eval')
+    elapsed = time.perf_counter() - start
+    print(f'{"ast.parse only (ref)":24} {rounds * len(simple) / elapsed:12,.0f} parses/s')
+    for text in ['9 to the power of 9 to the power of 9', '1000 factorial', '10^400 * 10^700']:
+        start = time.perf_counter()
+        try:
+            evaluate(text)
+        except CalcError as e:
+            print(f'  {text!r:40} -> rejected ({e}) in {(time.perf_counter() - start) * 1e6:.0f} us')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench':
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 20000)
+    else:
+        print(format_result(evaluate(' '.join(sys.argv[1:]))))
@@ -0,0 +1,579 @@
+"""SQLite helpers for the Skye Assistant database.
+
+Database gives every thread its own connection to the same file, opened in
+WAL mode with ``synchronous=NORMAL`` and a busy timeout, so the main loop,
+the reminder scheduler and web handlers can read and write concurrently
+without sharing a connection. Each connection keeps a statement cache, so
+repeated queries reuse their prepared statements. A thread's connection is
+closed when the thread exits (or when it calls release()), so short-lived
+workers such as music rescans do not leak file handles.
+
+Schema changes are applied by numbered migrations tracked in
+``PRAGMA user_version``; ``migrate()`` runs whatever is missing, so older
+database files are upgraded in place the first time they are opened.
+``python skye_db.py migrate [FILE ...]`` upgrades files explicitly.
+
+get_database() opens the single assistant database for the process. Its
+location is ``SKYE_DB_PATH`` (or skye_assistant.db next to this module),
+resolved to an absolute path so it does not depend on the working directory.
+On first open, rows from the legacy skye_full.db / alexa_*.db files are
+merged in once, skipping duplicates.
+
+WriteBehindQueue owns a background thread that groups queued statements into
+one transaction per batch, so high-frequency writes (conversation logging,
+reminder updates and the like) do not pay one commit each.
+"""
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# ========== Migrations ==========
+def _columns(conn, table: str) -> set:
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def _iso_to_epoch(text):
+    try:
+        return int(datetime.fromisoformat(text).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backfill_due_at(conn):
+    """Fill in the epoch column of reminders that only carry ISO text"""
+    rows = conn.execute(
+        'SELECT id, reminder_time FROM reminders WHERE due_at IS NULL AND reminder_time IS NOT NULL').fetchall()
+    conn.executemany('UPDATE reminders SET due_at=? WHERE id=?',
+                     [(_iso_to_epoch(when), rid) for rid, when in rows])
+
+
+def _normalise_habits(conn):
+    # last_done holds a plain YYYY-MM-DD date so streak checks are string compares
+    conn.execute('UPDATE habits SET last_done = substr(last_done, 1, 10) WHERE length(last_done) > 10')
+    conn.execute('UPDATE habits SET best_streak = streak WHERE best_streak < streak')
+
+
+def _m001_reminders_due_at(conn):
+    """Store reminder due times as epoch seconds with a partial index on pending rows"""
+    conn.execute('''CREATE TABLE IF NOT EXISTS reminders (
+        id INTEGER PRIMARY KEY, reminder TEXT, reminder_time TEXT, created_at TEXT, is_completed INTEGER DEFAULT 0
+    )''')
+    if 'due_at' not in _columns(conn, 'reminders'):
+        conn.execute('ALTER TABLE reminders ADD COLUMN due_at INTEGER')
+    _backfill_due_at(conn)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_reminders_pending_due ON reminders(due_at) WHERE is_completed=0')
+
+
+# canonical shape of every table the assistant uses (skye_assistant.db layout)
+SHARED_SCHEMA = {
+    'habits': '''CREATE TABLE IF NOT EXISTS habits (
+        id INTEGER PRIMARY KEY, name TEXT, streak INTEGER DEFAULT 0, last_done TEXT
+    )''',
+    'gratitude': '''CREATE TABLE IF NOT EXISTS gratitude (
+        id INTEGER PRIMARY KEY, entry TEXT, created_at TEXT
+    )''',
+    'alarms': '''CREATE TABLE IF NOT EXISTS alarms (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, alarm_time TIME NOT NULL, days TEXT,
+        is_active BOOLEAN DEFAULT 1, sound_file TEXT, created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )''',
+    'notes': '''CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, content TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP, category TEXT
+    )''',
+    'shopping_items': '''CREATE TABLE IF NOT EXISTS shopping_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, item TEXT NOT NULL, quantity INTEGER DEFAULT 1,
+        is_purchased BOOLEAN DEFAULT 0, created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )''',
+    'preferences': '''CREATE TABLE IF NOT EXISTS preferences (
+        key TEXT PRIMARY KEY, value TEXT
+    )''',
+    'conversation_history': '''CREATE TABLE IF NOT EXISTS conversation_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, user_input TEXT, assistant_response TEXT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )''',
+    'conversation_summaries': '''CREATE TABLE IF NOT EXISTS conversation_summaries (
+        session_id TEXT PRIMARY KEY, summary TEXT, turns INTEGER, updated_at REAL
+    )''',
+    'legacy_imports': '''CREATE TABLE IF NOT EXISTS legacy_imports (
+        path TEXT PRIMARY KEY, rows INTEGER, imported_at TEXT
+    )''',
+}
+
+# columns older files lack, added with a constant (or no) default
+_MISSING_COLUMNS = {
+    'notes': [('title', 'TEXT'), ('content', 'TEXT'), ('category', 'TEXT'), ('created_at', 'TEXT')],
+    'alarms': [('days', 'TEXT'), ('sound_file', 'TEXT'), ('created_at', 'TEXT')],
+}
+
+
+def _m002_shared_schema(conn):
+    """Bring every file to the shared schema used by skye_assistant.db"""
+    for ddl in SHARED_SCHEMA.values():
+        conn.execute(ddl)
+    for table, cols in _MISSING_COLUMNS.items():
+        existing = _columns(conn, table)
+        for name, decl in cols:
+            if name not in existing:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {decl}')
+    # alexa_data.db kept note text in a 'note' column
+    if 'note' in _columns(conn, 'notes'):
+        conn.execute('UPDATE notes SET content = note WHERE content IS NULL')
+
+
+def fts5_available(conn) -> bool:
+    try:
+        conn.execute('CREATE VIRTUAL TABLE IF NOT EXISTS temp._fts5_probe USING fts5(x)')
+        conn.execute('DROP TABLE temp._fts5_probe')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _m003_notes_fts(conn):
+    """Full-text index over notes (kept in sync by triggers) and an index for the open shopping list"""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_shopping_open_item ON shopping_items(item) WHERE is_purchased=0')
+    if not fts5_available(conn):
+        return  # NoteStore falls back to LIKE scans
+    conn.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        title, content, category, content='notes', content_rowid='id', tokenize='porter unicode61'
+    )''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts(rowid, title, content, category) VALUES (new.id, new.title, new.content, new.category);
+    END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, title, content, category)
+        VALUES ('delete', old.id, old.title, old.content, old.category);
+    END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, title, content, category)
+        VALUES ('delete', old.id, old.title, old.content, old.category);
+        INSERT INTO notes_fts(rowid, title, content, category) VALUES (new.id, new.title, new.content, new.category);
+    END''')
+    conn.execute("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+
+
+def _m004_habit_streaks(conn):
+    """Habit counters updated in place by check-ins, and the materialised habit summary"""
+    existing = _columns(conn, 'habits')
+    for name in ('best_streak', 'total'):
+        if name not in existing:
+            conn.execute(f'ALTER TABLE habits ADD COLUMN {name} INTEGER DEFAULT 0')
+    _normalise_habits(conn)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_habits_name ON habits(name)')
+    conn.execute('''CREATE TABLE IF NOT EXISTS habit_summary (
+        id INTEGER PRIMARY KEY CHECK (id = 1), day TEXT, habits INTEGER, done_today INTEGER,
+        active INTEGER, best_name TEXT, best_streak INTEGER
+    )''')
+
+
+def _m005_music_library(conn):
+    """Local music index: one row per audio file plus a name index for "play <song>" lookups"""
+    conn.execute('''CREATE TABLE IF NOT EXISTS music_tracks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT NOT NULL UNIQUE, mtime REAL, size INTEGER,
+        title TEXT, artist TEXT, album TEXT, scanned_at REAL
+    )''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_music_tracks_artist ON music_tracks(artist)')
+    if not fts5_available(conn):
+        return  # MusicLibrary falls back to LIKE scans
+    conn.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS music_fts USING fts5(
+        title, artist, album, content='music_tracks', content_rowid='id', prefix='2 3'
+    )''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS music_fts_ai AFTER INSERT ON music_tracks BEGIN
+        INSERT INTO music_fts(rowid, title, artist, album) VALUES (new.id, new.title, new.artist, new.album);
+    END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS music_fts_ad AFTER DELETE ON music_tracks BEGIN
+        INSERT INTO music_fts(music_fts, rowid, title, artist, album)
+        VALUES ('delete', old.id, old.title, old.artist, old.album);
+    END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS music_fts_au AFTER UPDATE OF title, artist, album ON music_tracks BEGIN
+        INSERT INTO music_fts(music_fts, rowid, title, artist, album)
+        VALUES ('delete', old.id, old.title, old.artist, old.album);
+        INSERT INTO music_fts(rowid, title, artist, album) VALUES (new.id, new.title, new.artist, new.album);
+    END''')
+
+
+# (version, function) pairs; append only, never renumber. sqlite3 runs DDL
+# outside the implicit transaction, so every migration must be idempotent.
+MIGRATIONS = [
+    (1, _m001_reminders_due_at),
+    (2, _m002_shared_schema),
+    (3, _m003_notes_fts),
+    (4, _m004_habit_streaks),
+    (5, _m005_music_library),
+]
+
+
+def schema_version(conn) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn) -> int:
+    """Apply pending migrations, each in its own transaction; returns the new version"""
+    current = schema_version(conn)
+    for version, fn in MIGRATIONS:
+        if version <= current:
+            continue
+        with conn:
+            fn(conn)
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+        current = version
+    return current
+
+
+def migrate_file(path: str) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return migrate(conn)
+    finally:
+        conn.close()
+
+
+# ========== Connection layer ==========
+class _ThreadConnection:
+    """One thread's connection; closed when the thread's locals are dropped at thread exit"""
+    __slots__ = ('db', 'conn')
+
+    def __init__(self, db, conn: sqlite3.Connection):
+        self.db = db
+        self.conn = conn
+
+    def close(self):
+        conn, self.conn = self.conn, None
+        if conn is not None:
+            self.db._discard(conn)
+
+    def __del__(self):
+        self.close()
+
+
+class Database:
+    """Per-thread SQLite connections with WAL and tuned pragmas"""
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000, cached_statements: int = 256,
+                 migrate_schema: bool = True):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conns = []
+        if migrate_schema:
+            migrate(self.connection())
+
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use"""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None or holder.conn is None:
+            # check_same_thread=False only so close() can run from another thread
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000,
+                                   cached_statements=self.cached_statements,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+            with self._lock:
+                self._conns.append(conn)
+            holder = self._local.holder = _ThreadConnection(self, conn)
+        return holder.conn
+
+    def release(self):
+        """Close the calling thread's connection now; the next call on this thread opens a new one"""
+        holder = self._local.__dict__.pop('holder', None)
+        if holder is not None:
+            holder.close()
+
+    def _discard(self, conn: sqlite3.Connection):
+        with self._lock:
+            if conn in self._conns:
+                self._conns.remove(conn)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        """Run one statement in its own transaction"""
+        conn = self.connection()
+        with conn:
+            return conn.execute(sql, params)
+
+    def executemany(self, sql: str, seq_of_params) -> sqlite3.Cursor:
+        conn = self.connection()
+        with conn:
+            return conn.executemany(sql, seq_of_params)
+
+    def query(self, sql: str, params=()) -> list:
+        return self.connection().execute(sql, params).fetchall()
+
+    def query_one(self, sql: str, params=()):
+        return self.connection().execute(sql, params).fetchone()
+
+    @contextmanager
+    def transaction(self):
+        """Group several statements into one commit"""
+        conn = self.connection()
+        with conn:
+            yield conn
+
+    def close(self):
+        with self._lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+
+# ========== Store manager ==========
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# every database file older versions of the assistant created, relative to
+# the directory they were started from
+LEGACY_DB_FILES = ('skye_assistant.db', 'skye_full.db', 'alexa_data.db', 'alexa_full.db')
+
+# natural keys used to skip rows that already exist when merging legacy files
+MERGE_KEYS = {
+    'reminders': ('reminder', 'reminder_time'),
+    'notes': ('content', 'created_at'),
+    'alarms': ('alarm_time', 'days'),
+    'habits': ('name',),
+    'gratitude': ('entry', 'created_at'),
+    'shopping_items': ('item', 'created_at'),
+    'preferences': ('key',),
+    'conversation_history': ('user_input', 'timestamp'),
+}
+
+
+def resolve_db_path() -> str:
+    """Absolute path of the assistant DB (``SKYE_DB_PATH`` or next to this module)"""
+    path = os.getenv('SKYE_DB_PATH') or os.path.join(_MODULE_DIR, 'skye_assistant.db')
+    return os.path.abspath(os.path.expanduser(path))
+
+
+def legacy_db_paths(main_path: str) -> list:
+    """Existing legacy files in the module dir and the current directory, excluding the main DB"""
+    found = []
+    for directory in (_MODULE_DIR, os.getcwd()):
+        for name in LEGACY_DB_FILES:
+            path = os.path.abspath(os.path.join(directory, name))
+            if path == main_path or path in found or not os.path.isfile(path):
+                continue
+            if os.path.exists(main_path) and os.path.samefile(path, main_path):
+                continue
+            found.append(path)
+    return found
+
+
+def _merge_table(conn, table: str) -> int:
+    legacy_cols = {row[1] for row in conn.execute(f'PRAGMA legacy.table_info({table})')}
+    if not legacy_cols:
+        return 0
+    main_cols = [c for c in conn.execute(f'PRAGMA main.table_info({table})')]
+    pk = [c[1] for c in main_cols if c[5]]
+    targets, exprs = [], {}
+    for c in main_cols:
+        name = c[1]
+        if table != 'preferences' and name in pk:
+            continue  # let the main DB assign new ids
+        if name in legacy_cols:
+            exprs[name] = f'src.{name}'
+        elif table == 'notes' and name == 'content' and 'note' in legacy_cols:
+            exprs[name] = 'src.note'
+        else:
+            continue
+        targets.append(name)
+    if not targets:
+        return 0
+    keys = [k for k in MERGE_KEYS.get(table, ()) if k in exprs]
+    dedup = ''
+    if keys:
+        cond = ' AND '.join(f'm.{k} IS {exprs[k]}' for k in keys)
+        dedup = f' WHERE NOT EXISTS (SELECT 1 FROM main.{table} m WHERE {cond})'
+    cur = conn.execute(
+        f'INSERT INTO main.{table} ({", ".join(targets)}) '
+        f'SELECT {", ".join(exprs[t] for t in targets)} FROM legacy.{table} src{dedup}')
+    return cur.rowcount
+
+
+def merge_legacy(db: Database, paths=None) -> dict:
+    """Import rows from legacy DB files into ``db`` once per file, skipping duplicates"""
+    conn = db.connection()
+    paths = legacy_db_paths(db.path) if paths is None else paths
+    done = {row[0] for row in conn.execute('SELECT path FROM legacy_imports')}
+    imported = {}
+    for path in paths:
+        path = os.path.abspath(path)
+        if path in done or not os.path.isfile(path):
+            continue
+        conn.execute('ATTACH DATABASE ? AS legacy', (path,))
+        try:
+            with conn:
+                total = sum(_merge_table(conn, table) for table in MERGE_KEYS)
+                # merged rows arrive after the migrations ran; give them the same normalisation
+                _backfill_due_at(conn)
+                _normalise_habits(conn)
+                conn.execute('INSERT INTO legacy_imports (path, rows, imported_at) VALUES (?, ?, ?)',
+                             (path, total, datetime.now().isoformat()))
+        finally:
+            conn.execute('DETACH DATABASE legacy')
+        imported[path] = total
+    return imported
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_database() -> Database:
+    """The process-wide assistant database, opened (and legacy files merged) once"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = Database(resolve_db_path())
+            try:
+                for path, rows in merge_legacy(_store).items():
+                    print(f'Imported {rows} rows from {path}')
+            except Exception as e:
+                print('Legacy DB import error', e)
+        return _store
+
+
+# ========== Write-behind queue ==========
+class WriteBehindQueue:
+    """Queue INSERT/UPDATE statements and commit them in batched transactions.
+
+    A batch is committed once ``max_batch`` statements are queued or
+    ``max_delay`` seconds have passed since its first statement, whichever
+    comes first. submit() returns a Future resolved with the statement's
+    ``lastrowid`` after its batch commits.
+    """
+
+    def __init__(self, db: Database, max_batch: int = 100, max_delay: float = 0.5):
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.statements = 0
+        self.failed = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._flush_total = 0.0
+        self.thread = threading.Thread(target=self._loop, name='skye-db-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, sql: str, params=()) -> Future:
+        """Queue a statement; it is committed with the next batch"""
+        if self._stop.is_set():
+            raise RuntimeError('writer is closed')
+        fut = Future()
+        self._queue.put((sql, params, fut))
+        return fut
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far has been committed"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _collect(self):
+        """Wait for a first item, then gather more until the batch is full or the window closes"""
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch and not isinstance(batch[-1], threading.Event):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit(self, conn, statements):
+        start = time.perf_counter()
+        try:
+            with conn:
+                rowids = [conn.execute(sql, params).lastrowid for sql, params, _ in statements]
+        except Exception as e:
+            print('DB writer error', e)
+            # retry one by one so a single bad statement does not drop the whole batch
+            for sql, params, fut in statements:
+                try:
+                    with conn:
+                        fut.set_result(conn.execute(sql, params).lastrowid)
+                except Exception as err:
+                    fut.set_exception(err)
+                    with self._stats_lock:
+                        self.failed += 1
+        else:
+            for (_, _, fut), rowid in zip(statements, rowids):
+                fut.set_result(rowid)
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            self.batches += 1
+            self.statements += len(statements)
+            self.last_flush_ms = elapsed
+            self.max_flush_ms = max(self.max_flush_ms, elapsed)
+            self._flush_total += elapsed
+
+    def _loop(self):
+        conn = self.db.connection()
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if not batch:
+                continue
+            statements = [b for b in batch if not isinstance(b, threading.Event)]
+            if statements:
+                self._commit(conn, statements)
+            for b in batch:
+                if isinstance(b, threading.Event):
+                    b.set()
+        self.db.release()
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                'queue_depth': self.depth(),
+                'batches': self.batches,
+                'statements': self.statements,
+                'failed': self.failed,
+                'last_flush_ms': self.last_flush_ms,
+                'max_flush_ms': self.max_flush_ms,
+                'avg_flush_ms': (self._flush_total / self.batches) if self.batches else 0.0,
+            }
+
+    def close(self, timeout: float = 5.0):
+        """Flush pending writes and stop the writer thread"""
+        if self._stop.is_set():
+            return
+        self.flush(timeout)
+        self._stop.set()
+        if self.thread.is_alive():
+            self.thread.join(timeout=timeout)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'migrate':
+        for path in sys.argv[2:] or ['skye_assistant.db']:
+            print(f'{path}: schema version {migrate_file(path)}')
+    else:
+        print('usage: python skye_db.py migrate [FILE ...]')
@@ -0,0 +1,253 @@
+"""Event-driven turn loop for Skye Assistant.
+
+EventLoop replaces the fixed sleeps that used to pace the assistant (a
+second after every command or empty capture, another before each follow-up
+question). The main thread waits on one queue of events:
+
+* ``utterance`` - the listener thread finished a capture (the text may be '')
+* ``say``       - a timer or worker thread has something to announce
+  (a reminder or alarm is due, a slow answer arrived)
+* ``call``      - a function that must run on the main thread, such as
+  rebuilding the TTS engine, which is bound to the thread that created it
+* ``quit``
+
+The listener thread only opens the microphone when the main thread hands it
+the turn, i.e. once the previous command has been handled and its reply has
+been spoken (``speech_done`` is set), so the next capture starts the moment
+the reply ends. Announcements are spoken by the main thread between turns,
+so the TTS engine is only ever driven from one thread; a capture that was
+open while an announcement played is dropped, as the microphone heard the
+assistant rather than the user.
+
+Each turn is one ``turn`` span, opened on the main thread when the listener
+is handed the turn and closed once the utterance has been handled; the
+listener attaches its ``capture`` span (which holds the assistant's own
+``listen`` span) to it, so a trace still reads listen -> process_command ->
+speak. Turns where nothing usable was heard are relabelled ``turn.idle`` to
+keep them out of the command latencies.
+
+The gap between the end of a reply and the microphone opening again is kept
+in a sliding window and reported by stats(). ``python skye_events.py
+--bench`` compares the old sleep-paced loop with this one on a simulated
+session.
+"""
+import queue
+import sys
+import threading
+import time
+import traceback
+
+from skye_health import SlidingWindow
+from skye_trace import get_tracer, span
+
+UTTERANCE = 'utterance'
+SAY = 'say'
+CALL = 'call'
+QUIT = 'quit'
+
+
+class EventLoop:
+    """Listen -> handle -> speak turns driven by events instead of sleeps"""
+
+    def __init__(self, listen, handle, say, speech_done: threading.Event = None, window: float = 300.0):
+        self.listen = listen            # () -> str, blocking; runs on the listener thread
+        self.handle = handle            # (text) -> bool; False ends the loop
+        self.say = say                  # (text) -> None; runs on the main thread
+        self.speech_done = speech_done or threading.Event()
+        if speech_done is None:
+            self.speech_done.set()
+        self.gap = SlidingWindow(window)            # reply finished -> microphone open (ms)
+        self.turnaround = SlidingWindow(window)     # command recognised -> microphone open (ms)
+        self.dropped = 0
+        self._events = queue.Queue()
+        self._turn = threading.Event()
+        self._stop = threading.Event()
+        self._received_at = None
+        self._replied_at = None
+        self._said_at = 0.0
+        self._turn_span = None
+        self._thread = None
+
+    def post(self, kind: str, payload=None):
+        """Queue an event for the main thread; safe from any thread"""
+        self._events.put((kind, payload))
+
+    def announce(self, text: str):
+        """Speak ``text`` on the main thread at the next opportunity"""
+        self.post(SAY, text)
+
+    def call_soon(self, fn):
+        """Run ``fn()`` on the main thread between turns"""
+        self.post(CALL, fn)
+
+    def stop(self):
+        self.post(QUIT)
+
+    # ---- listener thread ----
+    def _listener(self):
+        while True:
+            self._turn.wait()
+            self._turn.clear()
+            if self._stop.is_set():
+                return
+            turn = self._turn_span
+            # never open the microphone over our own voice
+            self.speech_done.wait()
+            opened = time.perf_counter()
+            if self._replied_at is not None:
+                self.gap.add((opened - self._replied_at) * 1000)
+                if self._received_at is not None:
+                    self.turnaround.add((opened - self._received_at) * 1000)
+            self._received_at = self._replied_at = None
+            try:
+                with get_tracer().attach(turn), span('capture'):
+                    text = self.listen()
+            except Exception as e:
+                print('Listener error', e)
+                text = ''
+            self.post(UTTERANCE, (text, opened))
+
+    # ---- main thread ----
+    def _speak(self, text: str):
+        try:
+            self.say(text)
+        except Exception as e:
+            print('Announcement error', e)
+        self._said_at = time.perf_counter()
+
+    def _call(self, fn):
+        try:
+            fn()
+        except Exception as e:
+            print('Main loop call error', e)
+
+    def _hand_over(self):
+        """Speak and run what queued up during the turn, then let the listener open the microphone"""
+        held = []
+        while True:
+            try:
+                kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == SAY:
+                self._speak(payload)
+            elif kind == CALL:
+                self._call(payload)
+            else:
+                held.append((kind, payload))
+        for event in held:
+            self._events.put(event)
+        # the turn span stays open on this thread until the utterance is handled
+        self._turn_span = span('turn')
+        self._turn_span.__enter__()
+        self._replied_at = time.perf_counter()
+        self._turn.set()
+
+    def _close_turn(self, idle: bool = False):
+        turn, self._turn_span = self._turn_span, None
+        if turn is not None:
+            if idle:
+                # keep silent turns out of the command latency histogram
+                turn.rename('turn.idle')
+            turn.__exit__(None, None, None)
+
+    def run(self):
+        """Process events until a handler returns False or stop() is called"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listener, name='skye-listener', daemon=True)
+        self._thread.start()
+        self._hand_over()
+        try:
+            while True:
+                try:
+                    # the timeout only lets Ctrl+C through on Windows; events wake this at once
+                    kind, payload = self._events.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+                if kind == QUIT:
+                    break
+                if kind == SAY:
+                    self._speak(payload)
+                    continue
+                if kind == CALL:
+                    self._call(payload)
+                    continue
+                text, opened = payload
+                if text and self._said_at > opened:
+                    self.dropped += 1
+                    text = ''
+                if text:
+                    self._received_at = time.perf_counter()
+                    try:
+                        if self.handle(text) is False:
+                            break
+                    except Exception as e:
+                        print('Run loop error', e)
+                        traceback.print_exc()
+                self._close_turn(idle=not text)
+                self._hand_over()
+        finally:
+            self._close_turn()
+            self._stop.set()
+            self._turn.set()
+
+    def stats(self) -> dict:
+        return {'gap': self.gap.summary(), 'turnaround': self.turnaround.summary(), 'dropped': self.dropped}
+
+
+def benchmark(scale: float = 0.05):
+    """Simulated session, old sleep-paced loop vs EventLoop; simulated waits are scaled by ``scale``"""
+    script = ['time', '', 'weather', 'joke', '', 'remind', 'news', 'play', '', 'exit']
+    follow_ups = {'weather': 1, 'remind': 2, 'play': 1}
+    pause, speech, capture = 1.0 * scale, 1.0 * scale, 1.5 * scale
+
+    def session(paced: bool):
+        lines = iter(script)
+
+        def listen():
+            time.sleep(capture)
+            return next(lines, 'exit')
+
+        def say(text):
+            time.sleep(speech)
+
+        def handle(text):
+            if text == 'exit':
+                say('Goodbye')
+                return False
+            for _ in range(follow_ups.get(text, 0)):
+                say('Which one?')
+                if paced:
+                    time.sleep(pause)
+                listen()
+            say('Done')
+            return True
+
+        start = time.perf_counter()
+        if not paced:
+            loop = EventLoop(listen, handle, say)
+            loop.run()
+            # the hand-over is real work, not a simulated wait, so it is not scaled
+            return time.perf_counter() - start, loop.gap.values()
+        gaps = []
+        while True:
+            text = listen()
+            if text and not handle(text):
+                break
+            replied = time.perf_counter()
+            time.sleep(pause)
+            gaps.append((time.perf_counter() - replied) / scale * 1000)
+        return time.perf_counter() - start, gaps
+
+    for label, paced in (('sleep-paced loop', True), ('event loop', False)):
+        total, gaps = session(paced)
+        gaps.sort()
+        print(f'{label:<17} session {total / scale:5.1f} s, reply -> microphone p50 '
+              f'{gaps[len(gaps) // 2]:7.2f} ms, max {gaps[-1]:7.2f} ms')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench':
+        benchmark()
+    else:
+        print('usage: python skye_events.py --bench')
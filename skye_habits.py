@@ -0,0 +1,180 @@
+"""Habit streaks for Skye Assistant.
+
+Each habit row in ``habits(name, streak, best_streak, total, last_done)``
+carries its own running counters, so a check-in is one UPDATE that
+extends or restarts the streak from ``last_done`` without looking at any
+history. A rollover once a day (at midnight on the assistant's TimerHeap,
+or lazily on the next call) zeroes broken streaks and rebuilds the one-row
+``habit_summary`` table; check-ins keep that row current incrementally, so
+"how are my habits" is a primary-key read.
+"""
+import re
+import threading
+from datetime import date, datetime, timedelta
+
+from skye_db import Database
+from skye_scheduler import TimerHeap
+
+_CHECK_IN_SQL = '''UPDATE habits SET
+    streak = CASE WHEN last_done = :yesterday THEN streak + 1 ELSE 1 END,
+    best_streak = MAX(best_streak, CASE WHEN last_done = :yesterday THEN streak + 1 ELSE 1 END),
+    total = total + 1,
+    last_done = :today
+WHERE name = :name AND (last_done IS NULL OR last_done < :today)
+RETURNING streak'''
+
+_SUMMARY_SQL = '''INSERT OR REPLACE INTO habit_summary (id, day, habits, done_today, active, best_name, best_streak)
+SELECT 1, :today, COUNT(*), COALESCE(SUM(last_done = :today), 0), COALESCE(SUM(streak > 0), 0),
+       (SELECT name FROM habits ORDER BY streak DESC, id LIMIT 1), COALESCE(MAX(streak), 0)
+FROM habits'''
+
+
+def _name(text: str) -> str:
+    return ' '.join((text or '').lower().split())
+
+
+class HabitTracker:
+    """Incremental habit check-ins with a daily rollover"""
+
+    def __init__(self, db: Database, timers: TimerHeap = None):
+        self.db = db
+        self.timers = timers
+        self._lock = threading.Lock()
+        self._day = None
+        self.rollover()
+        if timers is not None:
+            self._schedule_rollover()
+
+    def _schedule_rollover(self):
+        tomorrow = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+        self.timers.schedule(tomorrow.timestamp() + 1, self._on_midnight)
+
+    def _on_midnight(self):
+        self.rollover()
+        self._schedule_rollover()
+
+    def rollover(self):
+        """Zero streaks missed yesterday and rebuild the summary for today"""
+        today = date.today()
+        with self._lock, self.db.transaction() as conn:
+            conn.execute('UPDATE habits SET streak = 0 WHERE streak > 0 AND (last_done IS NULL OR last_done < ?)',
+                         ((today - timedelta(days=1)).isoformat(),))
+            conn.execute(_SUMMARY_SQL, {'today': today.isoformat()})
+            self._day = today
+
+    def _ensure_today(self):
+        if self._day != date.today():
+            self.rollover()
+
+    def add(self, name: str) -> bool:
+        """Start tracking a habit; False if it already exists"""
+        name = _name(name)
+        if not name:
+            raise ValueError('empty habit name')
+        self._ensure_today()
+        with self._lock, self.db.transaction() as conn:
+            if conn.execute('SELECT 1 FROM habits WHERE name=?', (name,)).fetchone():
+                return False
+            conn.execute('INSERT INTO habits (name, streak, best_streak, total, last_done) VALUES (?, 0, 0, 0, NULL)',
+                         (name,))
+            conn.execute('UPDATE habit_summary SET habits = habits + 1, '
+                         'best_name = COALESCE(best_name, ?) WHERE id = 1', (name,))
+        return True
+
+    def check_in(self, name: str):
+        """Record today's check-in; returns (streak, already_done) or None for an unknown habit"""
+        name = _name(name)
+        self._ensure_today()
+        today = self._day
+        params = {'name': name, 'today': today.isoformat(), 'yesterday': (today - timedelta(days=1)).isoformat()}
+        with self._lock, self.db.transaction() as conn:
+            row = conn.execute(_CHECK_IN_SQL, params).fetchone()
+            if row is None:
+                row = conn.execute('SELECT streak FROM habits WHERE name=?', (name,)).fetchone()
+                return (row[0], True) if row else None
+            streak = row[0]
+            conn.execute('''UPDATE habit_summary SET
+                done_today = done_today + 1,
+                active = active + (:streak = 1),
+                best_name = CASE WHEN :streak > best_streak THEN :name ELSE best_name END,
+                best_streak = MAX(best_streak, :streak)
+            WHERE id = 1''', {'streak': streak, 'name': name})
+        return streak, False
+
+    def remove(self, name: str) -> bool:
+        with self._lock:
+            removed = self.db.execute('DELETE FROM habits WHERE name=?', (_name(name),)).rowcount > 0
+        if removed:
+            self.rollover()
+        return removed
+
+    def habits(self) -> list:
+        """(name, streak, best_streak, last_done) for every habit"""
+        self._ensure_today()
+        return self.db.query('SELECT name, streak, best_streak, last_done FROM habits ORDER BY streak DESC, name')
+
+    def summary(self) -> dict:
+        self._ensure_today()
+        row = self.db.query_one(
+            'SELECT habits, done_today, active, best_name, best_streak FROM habit_summary WHERE id = 1')
+        keys = ('habits', 'done_today', 'active', 'best_name', 'best_streak')
+        return dict(zip(keys, row)) if row else dict.fromkeys(keys, 0)
+
+
+def _days(n: int) -> str:
+    return f'{n} day' if n == 1 else f'{n} days'
+
+
+def describe_summary(s: dict) -> str:
+    if not s['habits']:
+        return 'You are not tracking any habits yet. Say add habit followed by a name.'
+    text = f"You have checked in {s['done_today']} of {s['habits']} habits today"
+    if s['best_streak']:
+        text += f". Your best current streak is {s['best_name']} at {_days(s['best_streak'])}"
+    return text
+
+
+_HABIT_WORD_RE = re.compile(r'\bhabits?\b')
+_ADD_RE = re.compile(r'\b(?:add|new|start|track)(?:ing)?\s+(?:a\s+)?habit\s+(?:called\s+|named\s+)?(.+)$')
+_REMOVE_RE = re.compile(r'\b(?:remove|delete|stop tracking)\s+(?:the\s+)?habit\s+(.+)$')
+# check-ins only count at the start, so "remind me to check in for my flight" is not one
+_CHECK_IN_RE = re.compile(
+    r'^(?:i\s+(?:just\s+)?)?(?:check(?:ed)? in|checking in|did|have done|done with|completed|finished)\s+'
+    r'(?:my\s+|the\s+)?(?:habit\s+)?(.+?)(?:\s+today)?$'
+    r'|^mark\s+(?:my\s+|the\s+)?(?:habit\s+)?(.+?)\s+(?:as\s+)?done$')
+
+
+def _command(cmd: str) -> str:
+    return ' '.join((cmd or '').lower().split()).strip(' ,.!?')
+
+
+def is_habit_request(cmd: str) -> bool:
+    """True if ``cmd`` names habits or starts like a check-in ("i did yoga", "mark reading as done")"""
+    c = _command(cmd)
+    return bool(_HABIT_WORD_RE.search(c) or _CHECK_IN_RE.match(c))
+
+
+def handle_command(cmd: str, tracker: HabitTracker):
+    """Answer a habit voice command; None if ``cmd`` is not one"""
+    c = _command(cmd)
+    m = _ADD_RE.search(c)
+    if m:
+        name = m.group(1)
+        return f'Now tracking {name}' if tracker.add(name) else f'You already track {name}'
+    m = _REMOVE_RE.search(c)
+    if m:
+        return f'Stopped tracking {m.group(1)}' if tracker.remove(m.group(1)) else f'You do not track {m.group(1)}'
+    if 'habit' in c and any(w in c for w in ('how', 'summary', 'my habits', 'status')):
+        return describe_summary(tracker.summary())
+    m = _CHECK_IN_RE.match(c)
+    if m:
+        name = (m.group(1) or m.group(2)).strip()
+        result = tracker.check_in(name)
+        if result is None:
+            # only claim the command when it clearly was about habits
+            return f'You do not track a habit called {name}' if _HABIT_WORD_RE.search(c) else None
+        streak, already = result
+        if already:
+            return f'You already checked in {name} today. Streak: {_days(streak)}'
+        return f'Nice! {name} streak is now {_days(streak)}'
+    return None
@@ -0,0 +1,280 @@
+"""Audio health monitoring for Skye Assistant.
+
+AudioHealthMonitor keeps sliding windows of what the running assistant
+observes anyway: the level of every captured phrase, the outcome (or
+error) of every recognition attempt, how long the
+TTS engine takes to speak, and whether the mixer is initialised. A daemon
+thread evaluates the watched subsystems every few seconds; when one fails
+(a microphone that only delivers silence or errors, a TTS engine that keeps
+raising, a mixer that lost its device) its reinit callback is called, with
+an exponential backoff between attempts while it keeps failing.
+
+MetricsServer optionally exposes the numbers over HTTP (stdlib
+http.server, bound to localhost unless told otherwise, e.g. with
+SKYE_METRICS_HOST=0.0.0.0 so a fleet scraper can reach it):
+``GET /metrics`` returns JSON, ``GET /health`` returns 200 or 503.
+"""
+import json
+import math
+import threading
+import time
+from array import array
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEAD_MIC_LEVEL = 2.0        # RMS (16-bit) at or below which input counts as digital silence
+DEAD_MIC_SAMPLES = 5        # captures needed before calling a microphone dead
+MAX_CONSECUTIVE_ERRORS = 3
+RMS_STRIDE = 8              # every 8th sample is plenty for a level estimate
+
+
+def pcm_rms(raw: bytes, sample_width: int = 2) -> float:
+    """Approximate RMS level of little-endian 16-bit PCM audio"""
+    if not raw or sample_width != 2:
+        return 0.0
+    samples = array('h', raw[:len(raw) // 2 * 2])[::RMS_STRIDE]
+    return math.sqrt(sum(v * v for v in samples) / len(samples)) if samples else 0.0
+
+
+class SlidingWindow:
+    """(timestamp, value) samples from the last ``seconds``"""
+
+    def __init__(self, seconds: float = 300.0, maxlen: int = 2000):
+        self.seconds = seconds
+        self._items = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, value, now: float = None):
+        with self._lock:
+            self._items.append((time.time() if now is None else now, value))
+
+    def values(self, now: float = None, since: float = 0.0) -> list:
+        cutoff = (time.time() if now is None else now) - self.seconds
+        with self._lock:
+            while self._items and self._items[0][0] < cutoff:
+                self._items.popleft()
+            return [v for t, v in self._items if t >= since]
+
+    def summary(self, now: float = None) -> dict:
+        values = sorted(self.values(now))
+        if not values:
+            return {'count': 0}
+        n = len(values)
+        return {'count': n, 'min': round(values[0], 3), 'max': round(values[-1], 3),
+                'mean': round(sum(values) / n, 3), 'p50': round(values[n // 2], 3),
+                'p95': round(values[min(n - 1, int(n * 0.95))], 3)}
+
+
+class _Subsystem:
+    def __init__(self, name, check, reinit):
+        self.name = name
+        self.check = check
+        self.reinit = reinit
+        self.status = 'unknown'     # ok | failed | unknown
+        self.detail = ''
+        self.attempts = 0           # reinit attempts since the last healthy check
+        self.reinits = 0
+        self.next_attempt = 0.0
+        self.last_error = None
+
+
+class AudioHealthMonitor:
+    """Sliding-window audio metrics with automatic reinitialisation"""
+
+    def __init__(self, window: float = 300.0, interval: float = 15.0,
+                 backoff: float = 5.0, max_backoff: float = 300.0):
+        self.interval = interval
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.capture_level = SlidingWindow(window)
+        self.recognition = SlidingWindow(window)
+        self.tts_latency = SlidingWindow(window)
+        self.tts_failures = SlidingWindow(window)
+        self.mixer = SlidingWindow(window)
+        self.capture_errors = 0     # consecutive microphone errors
+        self.tts_errors = 0         # consecutive TTS errors
+        self.tts_ok = 0             # successful utterances since the last TTS reinit
+        self._mic_reset_at = 0.0    # only levels recorded after a microphone reinit count
+        self._subsystems = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---- observations from the assistant ----
+    def record_capture(self, level: float):
+        """RMS of a captured phrase.
+
+        A working microphone in a quiet room still shows some noise; a dead or
+        muted one delivers digital silence, which is what the check looks for.
+        """
+        self.capture_level.add(float(level))
+        self.capture_errors = 0
+
+    def record_recognition(self, outcome: str):
+        """One of 'ok', 'unrecognised', 'timeout', 'service_error' or 'error'"""
+        self.recognition.add(outcome)
+        if outcome == 'error':
+            self.capture_errors += 1
+
+    def record_tts(self, seconds: float, ok: bool = True):
+        if ok:
+            self.tts_latency.add(seconds)
+            self.tts_errors = 0
+            self.tts_ok += 1
+        else:
+            self.tts_failures.add(1)
+            self.tts_errors += 1
+
+    # ---- built-in checks: (True | False | None for "not enough evidence yet", detail) ----
+    def microphone_check(self):
+        if self.capture_errors >= MAX_CONSECUTIVE_ERRORS:
+            return False, f'{self.capture_errors} consecutive capture errors'
+        levels = self.capture_level.values(since=self._mic_reset_at)
+        if levels and max(levels) > DEAD_MIC_LEVEL:
+            return True, ''
+        if len(levels) >= DEAD_MIC_SAMPLES:
+            return False, 'no signal from the microphone'
+        return None, 'waiting for audio'
+
+    def tts_check(self):
+        if self.tts_errors >= MAX_CONSECUTIVE_ERRORS:
+            return False, f'{self.tts_errors} consecutive speech errors'
+        if self.tts_ok:
+            return True, ''
+        return None, 'waiting for speech'
+
+    def mixer_check(self, pygame):
+        ok = bool(pygame.mixer.get_init())
+        self.mixer.add(1.0 if ok else 0.0)
+        return ok, '' if ok else 'mixer not initialised'
+
+    # ---- subsystems ----
+    def watch(self, name: str, check, reinit=None):
+        """Evaluate ``check() -> (ok, detail)`` each interval; call ``reinit()`` on failure.
+
+        ``ok`` may be None when there is not enough evidence yet; the status
+        (and, after a reinit, the backoff) is then left as it is.
+        """
+        with self._lock:
+            self._subsystems[name] = _Subsystem(name, check, reinit)
+
+    def check_now(self, now: float = None):
+        """Run every check once, reinitialising failed subsystems whose backoff has elapsed"""
+        now = time.time() if now is None else now
+        with self._lock:
+            subsystems = list(self._subsystems.values())
+        for sub in subsystems:
+            try:
+                ok, detail = sub.check()
+            except Exception as e:
+                ok, detail = False, f'check raised {e}'
+            sub.detail = detail
+            if ok is None:
+                continue
+            if ok:
+                sub.status, sub.attempts, sub.next_attempt = 'ok', 0, 0.0
+                continue
+            if sub.status != 'failed':
+                print(f'Audio health: {sub.name} failed ({detail})')
+            sub.status = 'failed'
+            if sub.reinit is None or now < sub.next_attempt:
+                continue
+            sub.attempts += 1
+            sub.next_attempt = now + min(self.max_backoff, self.backoff * 2 ** (sub.attempts - 1))
+            try:
+                sub.reinit()
+                sub.reinits += 1
+                sub.last_error = None
+                # give the fresh subsystem a clean slate before it is judged again
+                if sub.name == 'microphone':
+                    self.capture_errors = 0
+                    self._mic_reset_at = time.time()
+                elif sub.name == 'tts':
+                    self.tts_errors = self.tts_ok = 0
+            except Exception as e:
+                sub.last_error = str(e)
+                print(f'Audio health: reinitialising {sub.name} failed: {e}')
+
+    def healthy(self) -> bool:
+        with self._lock:
+            return all(sub.status != 'failed' for sub in self._subsystems.values())
+
+    def snapshot(self) -> dict:
+        outcomes = self.recognition.values()
+        attempts = [o for o in outcomes if o != 'timeout']
+        with self._lock:
+            subsystems = {
+                sub.name: {'status': sub.status, 'detail': sub.detail, 'reinits': sub.reinits,
+                           'retry_in': round(max(0.0, sub.next_attempt - time.time()), 1) if sub.status == 'failed' else 0,
+                           'last_error': sub.last_error}
+                for sub in self._subsystems.values()}
+        mixer = self.mixer.values()
+        return {
+            'healthy': all(s['status'] != 'failed' for s in subsystems.values()),
+            'window_seconds': self.recognition.seconds,
+            'capture_level': self.capture_level.summary(),
+            'recognition': {
+                'attempts': len(outcomes),
+                'outcomes': {o: outcomes.count(o) for o in sorted(set(outcomes))},
+                'success_rate': round(attempts.count('ok') / len(attempts), 3) if attempts else None,
+            },
+            'tts_latency': self.tts_latency.summary(),
+            'tts_failures': len(self.tts_failures.values()),
+            'mixer_availability': round(sum(mixer) / len(mixer), 3) if mixer else None,
+            'subsystems': subsystems,
+        }
+
+    # ---- background thread ----
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='skye-audio-health', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check_now()
+            except Exception as e:
+                print('Audio health error', e)
+
+    def stop(self):
+        self._stop.set()
+
+
+class MetricsServer:
+    """Opt-in HTTP endpoint serving ``metrics()`` as JSON; localhost unless ``host`` says otherwise"""
+
+    def __init__(self, metrics, healthy=None, port: int = 8765, host: str = '127.0.0.1'):
+        source, is_healthy = metrics, healthy or (lambda: True)
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/metrics':
+                    status, body = 200, source()
+                elif path == '/health':
+                    ok = is_healthy()
+                    status, body = (200 if ok else 503), {'healthy': ok}
+                else:
+                    status, body = 404, {'error': 'not found'}
+                payload = json.dumps(body, default=str).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='skye-metrics', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,47 @@
+"""Shared HTTP session for Skye Assistant integrations.
+
+get_session() returns one requests.Session for the whole process, so the
+weather, news and Wolfram lookups reuse pooled keep-alive connections
+instead of opening a new TCP/TLS connection per request. Idempotent GETs
+are retried briefly on connection errors and 502/503/504 responses.
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from urllib3.util.retry import Retry
+except Exception:
+    Retry = None
+
+POOL_CONNECTIONS = 8     # distinct hosts kept in the pool
+POOL_MAXSIZE = 16        # connections kept per host
+USER_AGENT = 'SkyeAssistant/1.0'
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """The process-wide pooled session, created on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            retries = Retry(total=2, connect=2, read=1, backoff_factor=0.3,
+                            status_forcelist=(502, 503, 504), allowed_methods=frozenset({'GET'})) if Retry else 0
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retries)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers['User-Agent'] = USER_AGENT
+            _session = session
+        return _session
+
+
+def close_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,162 @@
+"""Streaming, cached chat completions for Skye Assistant.
+
+ChatClient wraps ``openai.ChatCompletion.create`` (openai 0.28 API) with:
+
+- a streamed path that hands each finished sentence to a callback (e.g. the
+  TTS engine) while the rest of the completion is still arriving,
+- a persistent response cache, with TTL, keyed by the normalised prompt
+  and a digest of the conversation summary sent with it (the recent turns
+  change every turn, so they are left out of the key),
+- request coalescing so concurrent identical prompts share one upstream call,
+- retries with backoff for transient failures (rate limits, 5xx, timeouts)
+  that happen before the first token arrives.
+
+Point ``OPENAI_API_BASE`` at any OpenAI-compatible server to use a local model
+or a fake server.
+"""
+import os
+import re
+import time
+import hashlib
+
+try:
+    import openai
+except Exception:
+    openai = None
+
+from skye_cache import ResponseCache, get_singleflight
+
+
+DEFAULT_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+_PROMPT_NOISE_RE = re.compile(r"[^a-z0-9' ]+")
+
+
+def normalise_prompt(prompt: str) -> str:
+    """Lower-case and strip punctuation/extra whitespace so trivial variants share a cache entry"""
+    return ' '.join(_PROMPT_NOISE_RE.sub(' ', (prompt or '').lower()).split())
+
+
+def _retryable():
+    e = openai.error
+    return (e.APIError, e.Timeout, e.TryAgain, e.APIConnectionError, e.RateLimitError,
+            e.ServiceUnavailableError)
+
+
+class SentenceBuffer:
+    """Accumulate streamed tokens and emit complete sentences"""
+
+    def __init__(self, on_sentence):
+        self.on_sentence = on_sentence
+        self._buf = ''
+
+    def feed(self, text: str):
+        self._buf += text
+        parts = _SENTENCE_END_RE.split(self._buf)
+        for sentence in parts[:-1]:
+            if sentence.strip():
+                self.on_sentence(sentence.strip())
+        self._buf = parts[-1]
+
+    def flush(self):
+        if self._buf.strip():
+            self.on_sentence(self._buf.strip())
+        self._buf = ''
+
+
+class ChatClient:
+    """OpenAI chat client with streaming, a TTL response cache and coalescing"""
+
+    def __init__(self, api_key: str = '', model: str = DEFAULT_MODEL, max_tokens: int = 150,
+                 cache_ttl: float = 6 * 3600, cache: ResponseCache = None,
+                 retries: int = 2, backoff: float = 0.5):
+        if openai is None:
+            raise RuntimeError('openai package not available')
+        if api_key:
+            openai.api_key = api_key
+        api_base = os.getenv('OPENAI_API_BASE')
+        if api_base:
+            openai.api_base = api_base
+        self.model = model
+        self.max_tokens = max_tokens
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache if cache is not None else ResponseCache('llm', ttl=cache_ttl)
+        self._flight = get_singleflight('openai')
+
+    def _cache_key(self, prompt: str, history=None) -> str:
+        # the system messages carry the running summary of the conversation
+        summary = '\n'.join(m['content'] for m in history or () if m.get('role') == 'system')
+        raw = f'{self.model}|{self.max_tokens}|{normalise_prompt(prompt)}|{summary}'
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _stream(self, messages, on_sentence=None) -> str:
+        """Run one streamed completion, emitting sentences as they complete.
+
+        Transient errors are retried with exponential backoff, but only until
+        the first token arrives; after that a retry would repeat spoken text.
+        """
+        buf = SentenceBuffer(on_sentence) if on_sentence else None
+        chunks = []
+        attempt = 0
+        while True:
+            try:
+                resp = openai.ChatCompletion.create(model=self.model, messages=messages,
+                                                    max_tokens=self.max_tokens, stream=True)
+                for chunk in resp:
+                    choices = chunk.get('choices') or [{}]
+                    text = choices[0].get('delta', {}).get('content')
+                    if not text:
+                        continue
+                    chunks.append(text)
+                    if buf:
+                        buf.feed(text)
+                break
+            except _retryable():
+                if chunks or attempt >= self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+                attempt += 1
+        if buf:
+            buf.flush()
+        return ''.join(chunks).strip()
+
+    def ask(self, prompt: str, on_sentence=None, history=None) -> str:
+        """Return the reply to ``prompt``, streaming sentences to ``on_sentence``.
+
+        ``history`` (e.g. ConversationMemory.messages()) is always sent; the
+        cache and request coalescing key on the prompt plus its summary.
+        Cached replies and replies obtained by waiting on a concurrent
+        identical request are still delivered sentence by sentence.
+        """
+        history = list(history or [])
+        messages = history + [{'role': 'user', 'content': prompt}]
+        key = self._cache_key(prompt, history)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._replay(cached, on_sentence)
+            return cached
+
+        streamed = []
+
+        def leader_call():
+            reply = self._stream(messages, on_sentence)
+            streamed.append(True)
+            if reply:
+                self.cache.put(key, reply)
+            return reply
+
+        reply = self._flight.do(key, leader_call)
+        if not streamed:
+            # we waited on another caller's request; speak its result
+            self._replay(reply, on_sentence)
+        return reply
+
+    @staticmethod
+    def _replay(text: str, on_sentence):
+        if not on_sentence:
+            return
+        buf = SentenceBuffer(on_sentence)
+        buf.feed(text)
+        buf.flush()
@@ -0,0 +1,101 @@
+"""YouTube handoff for Skye Assistant.
+
+MediaResolver turns a spoken song name into a YouTube watch URL and opens
+it in the browser. Resolutions are stored in a persistent ResponseCache
+keyed by the normalised song name, so asking for the same song again opens
+it immediately without touching the network. New songs are resolved on a
+worker thread through the shared pooled HTTP session while the assistant
+is still speaking its confirmation; identical in-flight lookups share one
+request. When no video can be resolved, the URL-encoded YouTube search page
+is opened instead.
+"""
+import re
+import webbrowser
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from skye_cache import ResponseCache, get_singleflight
+from skye_http import get_session
+
+YOUTUBE_SEARCH_URL = 'https://www.youtube.com/results'
+YOUTUBE_WATCH_URL = 'https://www.youtube.com/watch'
+_VIDEO_ID_RE = re.compile(r'"videoId":"([\w-]{11})"|watch\?v=([\w-]{11})')
+
+
+def search_url(query: str) -> str:
+    """URL of the YouTube search results page for ``query``"""
+    return f'{YOUTUBE_SEARCH_URL}?{urlencode({"search_query": query.strip()})}'
+
+
+def watch_url(video_id: str) -> str:
+    return f'{YOUTUBE_WATCH_URL}?{urlencode({"v": video_id})}'
+
+
+def _cache_key(query: str) -> str:
+    # symbols are kept: "c++ tutorial" and "c tutorial" are different videos
+    return ' '.join(query.lower().split())
+
+
+class MediaResolver:
+    """Cached song -> YouTube URL resolution and browser handoff"""
+
+    def __init__(self, cache: ResponseCache = None, ttl: float = 30 * 86400,
+                 negative_ttl: float = 3600, timeout: float = 6.0, opener=webbrowser.open):
+        self.cache = cache or ResponseCache('youtube', ttl=ttl)
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.opener = opener
+        self._flight = get_singleflight('youtube')
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='skye-media')
+
+    def _fetch(self, query: str):
+        """First video id on the search results page, or None"""
+        resp = get_session().get(YOUTUBE_SEARCH_URL, params={'search_query': query}, timeout=self.timeout)
+        resp.raise_for_status()
+        m = _VIDEO_ID_RE.search(resp.text)
+        return (m.group(1) or m.group(2)) if m else None
+
+    def _resolve(self, key: str, query: str) -> str:
+        try:
+            video_id = self._flight.do(key, self._fetch, query)
+        except Exception as e:
+            # network trouble: open the search page, but do not remember it
+            print('YouTube lookup error', e)
+            return search_url(query)
+        if video_id:
+            url = watch_url(video_id)
+            self.cache.put(key, {'url': url})
+        else:
+            url = search_url(query)
+            self.cache.put(key, {'url': url}, ttl=self.negative_ttl)
+        return url
+
+    def cached(self, query: str):
+        """The remembered URL for ``query``, or None"""
+        entry = self.cache.get(_cache_key(query))
+        return entry['url'] if entry else None
+
+    def resolve(self, query: str) -> Future:
+        """Future resolving to a watch URL (or the search page URL)"""
+        key = _cache_key(query)
+        entry = self.cache.get(key)
+        if entry is not None:
+            done = Future()
+            done.set_result(entry['url'])
+            return done
+        return self._pool.submit(self._resolve, key, query)
+
+    def play(self, query: str) -> Future:
+        """Open ``query`` on YouTube as soon as it is resolved; returns at once"""
+        future = self.resolve(query)
+        future.add_done_callback(self._open)
+        return future
+
+    def _open(self, future: Future):
+        try:
+            self.opener(future.result())
+        except Exception as e:
+            print('Browser open error', e)
+
+    def close(self):
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,127 @@
+"""Conversation memory for Skye Assistant.
+
+Every turn is appended to the ``conversation_history`` table through a
+WriteBehindQueue, while a bounded in-memory window supplies LLM context. When
+the window grows past its turn or token budget, the oldest turns are folded
+into a running summary, so the context sent per request stays within a fixed
+token budget no matter how long the session runs.
+"""
+import threading
+import time
+import uuid
+from collections import deque
+
+from skye_db import WriteBehindQueue, Database
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token, as for English text)"""
+    return (len(text or '') + 3) // 4
+
+
+def _clip(text: str, max_chars: int) -> str:
+    text = ' '.join((text or '').split())
+    return text if len(text) <= max_chars else text[:max_chars - 3].rstrip() + '...'
+
+
+class ConversationMemory:
+    """Bounded conversation window with summarised history and batched persistence"""
+
+    def __init__(self, writer: WriteBehindQueue, db: Database = None, window_turns: int = 6,
+                 token_budget: int = 600, summary_tokens: int = 150):
+        self.writer = writer
+        self.window_turns = window_turns
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.session_id = uuid.uuid4().hex[:12]
+        self.turns = deque()
+        self.summary = ''
+        self.compacted_turns = 0
+        self._lock = threading.Lock()
+        self._window_tokens = 0
+        if db is not None:
+            self._init_tables(db)
+            self._load_recent(db)
+
+    @staticmethod
+    def _init_tables(db: Database):
+        with db.transaction() as conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS conversation_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_input TEXT,
+                assistant_response TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )''')
+            conn.execute('''CREATE TABLE IF NOT EXISTS conversation_summaries (
+                session_id TEXT PRIMARY KEY,
+                summary TEXT,
+                turns INTEGER,
+                updated_at REAL
+            )''')
+
+    def _load_recent(self, db: Database):
+        """Seed the window with the most recent persisted turns"""
+        rows = db.query(
+            'SELECT user_input, assistant_response FROM conversation_history ORDER BY id DESC LIMIT ?',
+            (self.window_turns,))
+        with self._lock:
+            for user, assistant in reversed(rows):
+                self._append(user or '', assistant or '')
+            self._compact()
+
+    def _append(self, user: str, assistant: str):
+        turn = (user, assistant, estimate_tokens(user) + estimate_tokens(assistant))
+        self.turns.append(turn)
+        self._window_tokens += turn[2]
+
+    def add_turn(self, user: str, assistant: str):
+        """Record a completed exchange"""
+        if not user and not assistant:
+            return
+        self.writer.submit(
+            'INSERT INTO conversation_history (user_input, assistant_response) VALUES (?, ?)',
+            (user, assistant))
+        with self._lock:
+            self._append(user, assistant)
+            if self._compact():
+                self.writer.submit(
+                    'INSERT OR REPLACE INTO conversation_summaries (session_id, summary, turns, updated_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    (self.session_id, self.summary, self.compacted_turns, time.time()))
+
+    def _compact(self) -> bool:
+        """Fold the oldest turns into the summary until the window fits its budget"""
+        budget = self.token_budget - estimate_tokens(self.summary)
+        compacted = False
+        while self.turns and (len(self.turns) > self.window_turns or self._window_tokens > budget):
+            user, assistant, tokens = self.turns.popleft()
+            self._window_tokens -= tokens
+            self._fold(user, assistant)
+            self.compacted_turns += 1
+            compacted = True
+            budget = self.token_budget - estimate_tokens(self.summary)
+        return compacted
+
+    def _fold(self, user: str, assistant: str):
+        """Add a one-line digest of a turn and keep only the newest digests that fit"""
+        digest = f'User: {_clip(user, 80)} / Skye: {_clip(assistant, 100)}'
+        lines = (self.summary.split('\n') if self.summary else []) + [digest]
+        max_chars = self.summary_tokens * 4
+        while len(lines) > 1 and sum(len(l) + 1 for l in lines) > max_chars:
+            lines.pop(0)
+        self.summary = '\n'.join(lines)[:max_chars]
+
+    def messages(self) -> list:
+        """Chat messages (summary first) for the next LLM request"""
+        with self._lock:
+            msgs = []
+            if self.summary:
+                msgs.append({'role': 'system', 'content': 'Earlier in this conversation:\n' + self.summary})
+            for user, assistant, _ in self.turns:
+                msgs.append({'role': 'user', 'content': user})
+                msgs.append({'role': 'assistant', 'content': assistant})
+            return msgs
+
+    def context_tokens(self) -> int:
+        with self._lock:
+            return self._window_tokens + estimate_tokens(self.summary)
@@ -0,0 +1,258 @@
+"""Local music library for Skye Assistant.
+
+Audio files under the music folders are indexed in ``music_tracks`` (path,
+mtime, size, title, artist, album) with an FTS5 name index, so "play
+<song>" is an index lookup rather than a directory listing, even for very
+large libraries. A background scanner walks the folders with os.scandir and
+compares each file's (mtime, size) to the stored row: only new or changed
+files are re-parsed and written, and rows for deleted files are removed.
+
+Titles come from tags when the optional ``mutagen`` package is installed,
+otherwise from "Artist - Title" file names and Artist/Album folders.
+
+Run ``python skye_music.py --bench [N]`` for a lookup benchmark on a
+synthetic library of N tracks.
+"""
+import os
+import re
+import sys
+import threading
+import time
+from collections import namedtuple
+
+try:
+    import mutagen
+except Exception:
+    mutagen = None
+
+from skye_db import Database
+from skye_scheduler import TimerHeap
+
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.ogg', '.flac')
+WRITE_BATCH = 500
+
+Track = namedtuple('Track', 'id path title artist album')
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+_STOPWORDS = frozenset('the a an by song track music play some me please'.split())
+_TRACK_NO_RE = re.compile(r'^\s*(?:cd\s*\d+\s*)?\d{1,3}\s*(?:[-._)]\s*|\s+)')
+
+
+def parse_filename(path: str, root: str = ''):
+    """(title, artist, album) guessed from "Artist - Title.mp3" and the folder layout"""
+    stem = os.path.splitext(os.path.basename(path))[0].replace('_', ' ')
+    stem = _TRACK_NO_RE.sub('', stem, count=1) or stem
+    artist = album = None
+    if ' - ' in stem:
+        artist, stem = (part.strip() for part in stem.split(' - ', 1))
+    rel_dirs = os.path.relpath(os.path.dirname(path), root).split(os.sep) if root else []
+    rel_dirs = [d for d in rel_dirs if d not in ('.', '')]
+    if len(rel_dirs) >= 2:
+        artist, album = artist or rel_dirs[-2], rel_dirs[-1]
+    elif len(rel_dirs) == 1:
+        album = rel_dirs[0]
+    return ' '.join(stem.split()), artist, album
+
+
+def read_tags(path: str, root: str = ''):
+    """(title, artist, album) from tags, falling back to the file name"""
+    title, artist, album = parse_filename(path, root)
+    if mutagen is not None:
+        try:
+            tags = mutagen.File(path, easy=True) or {}
+            title = (tags.get('title') or [title])[0]
+            artist = (tags.get('artist') or [artist])[0]
+            album = (tags.get('album') or [album])[0]
+        except Exception:
+            pass
+    return title, artist, album
+
+
+def _fts_query(text: str) -> str:
+    words = [w for w in _WORD_RE.findall((text or '').lower()) if w not in _STOPWORDS]
+    if not words:
+        return ''
+    # the last word may still be half-recognised, so match it as a prefix
+    return ' '.join(f'"{w}"' for w in words[:-1]) + f' "{words[-1]}"*'
+
+
+class MusicLibrary:
+    """SQLite-backed index of local audio files with incremental rescans"""
+
+    def __init__(self, db: Database, roots, extensions=AUDIO_EXTENSIONS):
+        self.db = db
+        self.roots = [os.path.abspath(os.path.expanduser(r)) for r in ([roots] if isinstance(roots, str) else roots)]
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.has_fts = db.query_one(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='music_fts'") is not None
+        self.last_scan = {}
+        self._scan_lock = threading.Lock()
+        self._thread = None
+
+    # ---- scanning ----
+    def _walk(self, root: str):
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('.'):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.lower().endswith(self.extensions):
+                            yield entry
+            except OSError:
+                continue
+
+    def scan(self) -> dict:
+        """Index new and changed files, drop deleted ones; returns scan stats"""
+        with self._scan_lock:
+            start = time.perf_counter()
+            known = {path: (mtime, size) for path, mtime, size in
+                     self.db.query('SELECT path, mtime, size FROM music_tracks')}
+            seen, changed = set(), []
+            available = [r for r in self.roots if os.path.isdir(r)]
+            for root in available:
+                for entry in self._walk(root):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    seen.add(entry.path)
+                    if known.get(entry.path) != (st.st_mtime, st.st_size):
+                        changed.append((entry.path, st.st_mtime, st.st_size, root))
+            # keep rows under a root that is currently missing (e.g. an unplugged drive)
+            missing_roots = tuple(r + os.sep for r in self.roots if r not in available)
+            removed = [p for p in known if p not in seen and not (missing_roots and p.startswith(missing_roots))]
+            now = time.time()
+            for i in range(0, len(changed), WRITE_BATCH):
+                rows = []
+                for path, mtime, size, root in changed[i:i + WRITE_BATCH]:
+                    title, artist, album = read_tags(path, root)
+                    rows.append((path, mtime, size, title, artist, album, now))
+                with self.db.transaction() as conn:
+                    conn.executemany(
+                        'INSERT INTO music_tracks (path, mtime, size, title, artist, album, scanned_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(path) DO UPDATE SET '
+                        'mtime=excluded.mtime, size=excluded.size, title=excluded.title, '
+                        'artist=excluded.artist, album=excluded.album, scanned_at=excluded.scanned_at', rows)
+            if removed:
+                with self.db.transaction() as conn:
+                    conn.executemany('DELETE FROM music_tracks WHERE path=?', [(p,) for p in removed])
+            self.last_scan = {
+                'files': len(seen), 'indexed': len(changed), 'removed': len(removed),
+                'seconds': round(time.perf_counter() - start, 3), 'finished_at': now,
+            }
+            return self.last_scan
+
+    def scan_in_background(self):
+        """Start a scan on a daemon thread unless one is already running"""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._thread = threading.Thread(target=self._scan_safely, name='skye-music-scan', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _scan_safely(self):
+        try:
+            stats = self.scan()
+            if stats['indexed'] or stats['removed']:
+                print(f"Music library: {stats['files']} files, {stats['indexed']} indexed, "
+                      f"{stats['removed']} removed in {stats['seconds']}s")
+        except Exception as e:
+            print('Music scan error', e)
+        finally:
+            # each rescan runs on a fresh thread; give its connection back
+            self.db.release()
+
+    def schedule_rescans(self, timers: TimerHeap, interval: float = 1800):
+        """Rescan now and then every ``interval`` seconds on the given timer heap"""
+        def tick():
+            self.scan_in_background()
+            timers.schedule(time.time() + interval, tick)
+        tick()
+
+    # ---- lookups ----
+    def find(self, query: str, limit: int = 5) -> list:
+        """Best matches for a spoken song/artist/album name"""
+        fts = _fts_query(query)
+        if not fts:
+            return []
+        if self.has_fts:
+            rows = self.db.query(
+                'SELECT t.id, t.path, t.title, t.artist, t.album FROM music_fts f '
+                'JOIN music_tracks t ON t.id = f.rowid WHERE music_fts MATCH ? '
+                'ORDER BY bm25(music_fts, 10.0, 4.0, 1.0) LIMIT ?', (fts, limit))
+        else:
+            words = [w for w in _WORD_RE.findall(query.lower()) if w not in _STOPWORDS]
+            cond = ' AND '.join("(COALESCE(title,'') || ' ' || COALESCE(artist,'')) LIKE ?" for _ in words)
+            rows = self.db.query(
+                f'SELECT id, path, title, artist, album FROM music_tracks WHERE {cond} LIMIT ?',
+                [f'%{w}%' for w in words] + [limit])
+        return [Track(*row) for row in rows]
+
+    def by_artist(self, artist: str, limit: int = 200) -> list:
+        rows = self.db.query(
+            'SELECT id, path, title, artist, album FROM music_tracks WHERE artist = ? COLLATE NOCASE '
+            'ORDER BY album, path LIMIT ?', (artist, limit))
+        return [Track(*row) for row in rows]
+
+    def random_tracks(self, count: int = 1) -> list:
+        """Random tracks without a full-table ORDER BY random()"""
+        tracks = []
+        for _ in range(count):
+            row = self.db.query_one(
+                'SELECT id, path, title, artist, album FROM music_tracks '
+                'WHERE id >= (SELECT abs(random()) % MAX(id) + 1 FROM music_tracks) ORDER BY id LIMIT 1')
+            if row:
+                tracks.append(Track(*row))
+        return tracks
+
+    def __len__(self):
+        return self.db.query_one('SELECT COUNT(*) FROM music_tracks')[0]
+
+
+def describe_track(track: Track) -> str:
+    return f'{track.title} by {track.artist}' if track.artist else track.title
+
+
+def benchmark(n: int = 50_000):
+    import random
+    import tempfile
+    words = ['love', 'night', 'summer', 'dream', 'fire', 'heart', 'river', 'light', 'blue', 'road',
+             'rain', 'gold', 'city', 'wild', 'stars', 'home', 'dance', 'ocean', 'shadow', 'song']
+    db = Database(os.path.join(tempfile.mkdtemp(), 'music_bench.db'))
+    rows = []
+    for i in range(n):
+        title = ' '.join(random.sample(words, 3)) + f' {i}'
+        artist = f'artist {i % 997}'
+        rows.append((f'/music/{artist}/album {i % 50}/{title}.mp3', 0.0, 0, title, artist, f'album {i % 50}', 0.0))
+    t0 = time.perf_counter()
+    with db.transaction() as conn:
+        conn.executemany('INSERT INTO music_tracks (path, mtime, size, title, artist, album, scanned_at) '
+                         'VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+    print(f'{n} tracks indexed in {time.perf_counter() - t0:.2f}s')
+    lib = MusicLibrary(db, [])
+    queries = [rows[random.randrange(n)][3] for _ in range(200)] + ['summer night', 'dance', 'artist 42', 'ocean sha']
+    t0 = time.perf_counter()
+    for q in queries:
+        lib.find(q)
+    elapsed = time.perf_counter() - t0
+    print(f'find():          {elapsed / len(queries) * 1000:.3f} ms per lookup')
+    t0 = time.perf_counter()
+    for _ in range(200):
+        lib.random_tracks()
+    print(f'random_tracks(): {(time.perf_counter() - t0) / 200 * 1000:.3f} ms')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench':
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 50_000)
+    elif len(sys.argv) > 1 and sys.argv[1] == 'scan':
+        from skye_db import get_database
+        library = MusicLibrary(get_database(), sys.argv[2:] or [os.path.join(os.path.expanduser('~'), 'Music')])
+        print(library.scan())
+    else:
+        print('usage: python skye_music.py --bench [N] | scan [DIR ...]')
@@ -0,0 +1,194 @@
+"""Notes and shopping list for Skye Assistant.
+
+Notes live in ``notes(title, content, category)`` and are searched through
+the porter-stemmed ``notes_fts`` FTS5 index that skye_db migration 3 keeps
+in sync with triggers, so "find my note about ..." is an index lookup
+ranked by bm25 rather than a scan of every note. Builds of SQLite without
+FTS5 fall back to a LIKE scan.
+
+The shopping list uses ``shopping_items(item, quantity, is_purchased)``;
+open items are served by a partial index on ``item``.
+"""
+import os
+import re
+from datetime import datetime
+
+from skye_db import Database
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+_STOPWORDS = frozenset('a an the my of to for and or in on at is it about with that this'.split())
+
+
+def _terms(text: str) -> list:
+    words = _WORD_RE.findall((text or '').lower())
+    return [w for w in words if w not in _STOPWORDS] or words
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every (stemmed) word must match"""
+    return ' '.join(f'"{w}"' for w in _terms(text))
+
+
+class NoteStore:
+    """Note CRUD and full-text search"""
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.has_fts = db.query_one(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='notes_fts'") is not None
+
+    def add(self, content: str, title: str = None, category: str = None) -> int:
+        """Save a note and return its id; the title defaults to its first few words"""
+        content = (content or '').strip()
+        if not content:
+            raise ValueError('empty note')
+        title = title or ' '.join(content.split()[:6])
+        cur = self.db.execute(
+            'INSERT INTO notes (title, content, category, created_at) VALUES (?, ?, ?, ?)',
+            (title, content, category, datetime.now().isoformat(timespec='seconds')))
+        return cur.lastrowid
+
+    def search(self, text: str, limit: int = 5) -> list:
+        """Best-matching notes as (id, title, content) tuples"""
+        query = fts_query(text)
+        if not query:
+            return []
+        if self.has_fts:
+            return self.db.query(
+                'SELECT n.id, n.title, n.content FROM notes_fts f JOIN notes n ON n.id = f.rowid '
+                'WHERE notes_fts MATCH ? ORDER BY f.rank LIMIT ?', (query, limit))
+        words = _terms(text)
+        cond = ' AND '.join("(COALESCE(title,'') || ' ' || COALESCE(content,'')) LIKE ?" for _ in words)
+        return self.db.query(
+            f'SELECT id, title, content FROM notes WHERE {cond} ORDER BY id DESC LIMIT ?',
+            [f'%{w}%' for w in words] + [limit])
+
+    def recent(self, limit: int = 5) -> list:
+        return self.db.query('SELECT id, title, content FROM notes ORDER BY id DESC LIMIT ?', (limit,))
+
+    def delete(self, note_id: int) -> bool:
+        return self.db.execute('DELETE FROM notes WHERE id=?', (note_id,)).rowcount > 0
+
+    def count(self) -> int:
+        return self.db.query_one('SELECT COUNT(*) FROM notes')[0]
+
+    def import_text_file(self, path: str) -> int:
+        """One-time import of a flat notes file (one note per line); the file is renamed afterwards"""
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f if line.strip()]
+        now = datetime.now().isoformat(timespec='seconds')
+        if lines:
+            self.db.executemany(
+                'INSERT INTO notes (title, content, created_at) VALUES (?, ?, ?)',
+                [(' '.join(line.split()[:6]), line, now) for line in lines])
+        os.replace(path, path + '.imported')
+        return len(lines)
+
+
+class ShoppingList:
+    """Open shopping items; adding an item already on the list bumps its quantity"""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    @staticmethod
+    def _normalise(item: str) -> str:
+        return ' '.join((item or '').lower().split())
+
+    def add(self, item: str, quantity: int = 1) -> int:
+        """Add ``quantity`` of ``item``; returns the new open quantity"""
+        item = self._normalise(item)
+        if not item:
+            raise ValueError('empty item')
+        with self.db.transaction() as conn:
+            cur = conn.execute(
+                'UPDATE shopping_items SET quantity = quantity + ? WHERE item=? AND is_purchased=0',
+                (quantity, item))
+            if cur.rowcount == 0:
+                conn.execute(
+                    'INSERT INTO shopping_items (item, quantity, is_purchased, created_at) VALUES (?, ?, 0, ?)',
+                    (item, quantity, datetime.now().isoformat(timespec='seconds')))
+            row = conn.execute(
+                'SELECT SUM(quantity) FROM shopping_items WHERE item=? AND is_purchased=0', (item,)).fetchone()
+        return row[0] or 0
+
+    def mark_purchased(self, item: str) -> bool:
+        cur = self.db.execute(
+            'UPDATE shopping_items SET is_purchased=1 WHERE item=? AND is_purchased=0', (self._normalise(item),))
+        return cur.rowcount > 0
+
+    def remove(self, item: str) -> bool:
+        cur = self.db.execute(
+            'DELETE FROM shopping_items WHERE item=? AND is_purchased=0', (self._normalise(item),))
+        return cur.rowcount > 0
+
+    def items(self) -> list:
+        """Open items as (item, quantity) in the order they were added"""
+        return self.db.query(
+            'SELECT item, SUM(quantity) FROM shopping_items WHERE is_purchased=0 GROUP BY item ORDER BY MIN(id)')
+
+    def clear(self) -> int:
+        """Mark every open item as purchased"""
+        return self.db.execute('UPDATE shopping_items SET is_purchased=1 WHERE is_purchased=0').rowcount
+
+
+def describe_items(items) -> str:
+    return ', '.join(item if qty == 1 else f'{qty} {item}' for item, qty in items)
+
+
+# "add 2 eggs to my shopping list", "put milk on the list"
+_SHOP_ADD_RE = re.compile(r'(?:add|put)\s+(?:(\d+)\s+)?(.+?)\s+(?:to|on)\s+(?:my\s+|the\s+)?(?:shopping\s+)?list\b')
+_SHOP_REMOVE_RE = re.compile(r'(?:remove|delete|take)\s+(.+?)\s+(?:from|off)\s+(?:my\s+|the\s+)?(?:shopping\s+)?list\b')
+# "i bought milk", "got the eggs"; only at the start, so "i forgot what i got her" is not a purchase
+_SHOP_BOUGHT_RE = re.compile(r'^(?:i\s+)?(?:just\s+)?(?:bought|got|purchased)\s+(?:the\s+)?(.+)$')
+_NOTE_FIND_RE = re.compile(r'(?:find|search|look up|show)\s+(?:my\s+)?notes?\s+(?:about|on|for|with)\s+(.+)$')
+_NOTE_ADD_RE = re.compile(r'(?:take|make|add|save|write)\s+(?:a\s+)?note(?:\s+that|\s*:)?\s+(.+)$|^note\s+(?:that\s+)?(.+)$')
+
+
+_REQUEST_RE = re.compile(r'\b(?:notes?|list)\b|' + _SHOP_BOUGHT_RE.pattern)
+
+
+def is_notes_request(cmd: str) -> bool:
+    """True if ``cmd`` may be a notes / shopping-list command worth handing to handle_command"""
+    return bool(_REQUEST_RE.search(' '.join((cmd or '').lower().split())))
+
+
+def handle_command(cmd: str, notes: NoteStore, shopping: ShoppingList):
+    """Answer a notes / shopping-list voice command; None if ``cmd`` is not one"""
+    c = ' '.join((cmd or '').lower().split())
+    if 'list' in c:
+        m = _SHOP_ADD_RE.search(c)
+        if m:
+            qty = int(m.group(1) or 1)
+            total = shopping.add(m.group(2), qty)
+            return f'Added {m.group(2)} to your shopping list' + (f', {total} in total' if total > qty else '')
+        m = _SHOP_REMOVE_RE.search(c)
+        if m:
+            if shopping.remove(m.group(1)):
+                return f'Removed {m.group(1)} from your shopping list'
+            return f'{m.group(1)} is not on your shopping list'
+        if 'shopping' in c and any(w in c for w in ('clear', 'empty', 'done with')):
+            n = shopping.clear()
+            return f'Cleared {n} items from your shopping list' if n else 'Your shopping list is already empty'
+        if 'shopping' in c:
+            items = shopping.items()
+            return f'On your shopping list: {describe_items(items)}' if items else 'Your shopping list is empty'
+    m = _SHOP_BOUGHT_RE.search(c)
+    if m and shopping.mark_purchased(m.group(1)):
+        return f'Checked {m.group(1)} off your shopping list'
+    m = _NOTE_FIND_RE.search(c)
+    if m:
+        found = notes.search(m.group(1), limit=3)
+        if not found:
+            return f'I could not find a note about {m.group(1)}'
+        return 'Your notes: ' + '; '.join(content for _, _, content in found)
+    if re.search(r'\b(?:my|recent|read)\s+notes\b', c):
+        found = notes.recent(3)
+        return 'Your latest notes: ' + '; '.join(content for _, _, content in found) if found else 'You have no notes'
+    m = _NOTE_ADD_RE.search(c)
+    if m:
+        notes.add((m.group(1) or m.group(2)).strip())
+        return 'Noted'
+    return None
@@ -0,0 +1,393 @@
+"""Playback engine for local music in Skye Assistant.
+
+Player owns ``pygame.mixer.music`` from a single worker thread. Control
+calls (play, next, previous, pause, shuffle, repeat...) only put a command
+on a queue and return at once, so the voice loop never waits for the mixer
+to load a file. As soon as a track starts, the following track is handed to
+``pygame.mixer.music.queue()``, which the mixer starts the moment the
+current one ends, so transitions have no gap. The mixer's end-of-track
+event then advances the queue and preloads the next track.
+
+Where the pygame event system is unavailable (no video subsystem), the
+player falls back to polling ``get_busy()`` and loads each track when the
+previous one ends.
+
+The queue itself (PlaybackQueue) is plain Python and knows nothing about
+pygame.
+"""
+import os
+import queue
+import random
+import re
+import threading
+
+try:
+    import pygame
+except Exception:
+    pygame = None
+
+REPEAT_OFF, REPEAT_ONE, REPEAT_ALL = 'off', 'one', 'all'
+RESTART_THRESHOLD_MS = 3000     # "previous" restarts the track after this much playback
+
+
+class PlaybackQueue:
+    """Ordered tracks with a cursor, shuffle order and repeat mode"""
+
+    def __init__(self):
+        self.tracks = []
+        self.order = []
+        self.pos = -1
+        self.shuffle = False
+        self.repeat = REPEAT_OFF
+
+    def replace(self, tracks, start: int = 0):
+        self.tracks = list(tracks)
+        self.order = list(range(len(self.tracks)))
+        self.pos = min(start, len(self.tracks) - 1) if self.tracks else -1
+        if self.shuffle:
+            self._reshuffle()
+
+    def extend(self, tracks):
+        first = len(self.tracks)
+        self.tracks.extend(tracks)
+        new = list(range(first, len(self.tracks)))
+        if self.shuffle:
+            random.shuffle(new)
+        self.order.extend(new)
+        if self.pos < 0 and self.tracks:
+            self.pos = 0
+
+    def _reshuffle(self):
+        """Shuffle everything after the current track, keeping the current one in place"""
+        current = self.order[self.pos] if 0 <= self.pos < len(self.order) else None
+        rest = [i for i in range(len(self.tracks)) if i != current]
+        random.shuffle(rest)
+        self.order = ([current] if current is not None else []) + rest
+        self.pos = 0 if current is not None else -1
+
+    def set_shuffle(self, on: bool):
+        if on == self.shuffle:
+            return
+        current = self.order[self.pos] if 0 <= self.pos < len(self.order) else None
+        self.shuffle = on
+        if on:
+            self._reshuffle()
+        else:
+            self.order = list(range(len(self.tracks)))
+            self.pos = current if current is not None else -1
+
+    def current(self):
+        return self.tracks[self.order[self.pos]] if 0 <= self.pos < len(self.order) else None
+
+    def peek_next_pos(self, manual: bool = False):
+        """Position that follows the cursor, or None at the end of the queue"""
+        if not self.order:
+            return None
+        if self.repeat == REPEAT_ONE and not manual:
+            return self.pos
+        if self.pos + 1 < len(self.order):
+            return self.pos + 1
+        return 0 if self.repeat == REPEAT_ALL else None
+
+    def peek_prev_pos(self):
+        if not self.order:
+            return None
+        if self.pos > 0:
+            return self.pos - 1
+        return len(self.order) - 1 if self.repeat == REPEAT_ALL else 0
+
+
+def _path(track) -> str:
+    return track if isinstance(track, str) else track.path
+
+
+class Player:
+    """Non-blocking, gapless music player on pygame.mixer.music"""
+
+    def __init__(self, poll_interval: float = 0.25, on_error=None):
+        self.available = pygame is not None
+        self.poll_interval = poll_interval
+        self.on_error = on_error
+        self.queue = PlaybackQueue()
+        self.state = 'stopped'          # stopped | playing | paused
+        self._preloaded = None          # queue position handed to mixer.music.queue()
+        self._commands = queue.Queue()
+        self._lock = threading.Lock()
+        self._end_event = None
+        self._thread = None
+        if self.available:
+            self._thread = threading.Thread(target=self._loop, name='skye-player', daemon=True)
+            self._thread.start()
+
+    # ---- public, non-blocking controls ----
+    def play(self, tracks, start: int = 0):
+        """Replace the queue with ``tracks`` (Track tuples or paths) and start playing"""
+        self._send('play', list(tracks), start)
+
+    def enqueue(self, tracks):
+        self._send('enqueue', list(tracks))
+
+    def next(self):
+        self._send('next')
+
+    def previous(self):
+        self._send('previous')
+
+    def pause(self):
+        self._send('pause')
+
+    def resume(self):
+        self._send('resume')
+
+    def stop(self):
+        self._send('stop')
+
+    def set_shuffle(self, on: bool):
+        self._send('shuffle', bool(on))
+
+    def set_repeat(self, mode: str):
+        if mode not in (REPEAT_OFF, REPEAT_ONE, REPEAT_ALL):
+            raise ValueError(f'invalid repeat mode: {mode!r}')
+        self._send('repeat', mode)
+
+    def reinit_mixer(self, after=None):
+        """Restart the mixer on the worker thread; ``after()`` runs there once it is back.
+
+        The current track (if any) starts again from the beginning.
+        """
+        if pygame is None:
+            return
+        self._commands.put(('reinit', after))
+        if self._thread is None or not self._thread.is_alive():
+            # the worker gave up at start-up; a fresh one initialises the mixer again
+            self.available = True
+            self._thread = threading.Thread(target=self._loop, name='skye-player', daemon=True)
+            self._thread.start()
+
+    def now_playing(self):
+        with self._lock:
+            return self.queue.current() if self.state != 'stopped' else None
+
+    def status(self) -> dict:
+        with self._lock:
+            return {'state': self.state, 'position': self.queue.pos, 'length': len(self.queue.tracks),
+                    'shuffle': self.queue.shuffle, 'repeat': self.queue.repeat,
+                    'gapless': self._end_event is not None}
+
+    def close(self, timeout: float = 1.0):
+        if self._thread is not None:
+            self._send('quit')
+            self._thread.join(timeout)
+
+    def _send(self, *command):
+        if self.available:
+            self._commands.put(command)
+
+    # ---- worker thread (sole owner of pygame.mixer.music) ----
+    def _init_mixer(self):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        try:
+            if not pygame.display.get_init():
+                pygame.display.init()
+            self._end_event = pygame.USEREVENT + 7
+            pygame.mixer.music.set_endevent(self._end_event)
+            pygame.event.get(self._end_event)
+        except Exception:
+            # no event system: fall back to get_busy() polling without preloading
+            self._end_event = None
+
+    def _loop(self):
+        try:
+            self._init_mixer()
+        except Exception as e:
+            self._report(f'mixer init failed: {e}')
+            self.available = False
+            return
+        while True:
+            try:
+                command = self._commands.get(timeout=self.poll_interval)
+            except queue.Empty:
+                command = None
+            try:
+                if command is not None:
+                    if command[0] == 'quit':
+                        pygame.mixer.music.stop()
+                        return
+                    self._handle(*command)
+                self._check_track_end()
+            except Exception as e:
+                self._report(e)
+
+    def _handle(self, name, *args):
+        with self._lock:
+            q = self.queue
+            if name == 'play':
+                tracks, start = args
+                q.replace(tracks, start)
+                self._start(q.pos)
+            elif name == 'enqueue':
+                was_empty = q.current() is None
+                q.extend(args[0])
+                if was_empty or self.state == 'stopped':
+                    self._start(q.pos)
+                else:
+                    self._preloaded = None
+                    self._preload()
+            elif name == 'next':
+                self._start(q.peek_next_pos(manual=True))
+            elif name == 'previous':
+                if self.state != 'stopped' and pygame.mixer.music.get_pos() > RESTART_THRESHOLD_MS:
+                    self._start(q.pos)
+                else:
+                    self._start(q.peek_prev_pos())
+            elif name == 'pause' and self.state == 'playing':
+                pygame.mixer.music.pause()
+                self.state = 'paused'
+            elif name == 'resume' and self.state == 'paused':
+                pygame.mixer.music.unpause()
+                self.state = 'playing'
+            elif name == 'stop':
+                pygame.mixer.music.stop()
+                self.state = 'stopped'
+                self._preloaded = None
+            elif name == 'reinit':
+                self._restart_mixer(args[0])
+            elif name in ('shuffle', 'repeat'):
+                if name == 'shuffle':
+                    q.set_shuffle(args[0])
+                else:
+                    q.repeat = args[0]
+                # the order changed: replace whatever the mixer has queued
+                self._preloaded = None
+                self._preload()
+
+    def _restart_mixer(self, after):
+        resume = self.queue.pos if self.state != 'stopped' else None
+        paused = self.state == 'paused'
+        pygame.mixer.quit()
+        self.state = 'stopped'
+        self._preloaded = None
+        # a fresh mixer forgets the end event, so set it up again
+        self._init_mixer()
+        if after is not None:
+            try:
+                after()
+            except Exception as e:
+                self._report(f'after mixer restart: {e}')
+        if resume is not None:
+            self._start(resume)
+            if paused and self.state == 'playing':
+                pygame.mixer.music.pause()
+                self.state = 'paused'
+
+    def _start(self, pos):
+        """Load and play the track at queue position ``pos`` (None stops playback)"""
+        q = self.queue
+        # give up after one pass over the queue (repeat all would wrap around forever)
+        attempts = len(q.order)
+        while pos is not None and attempts > 0:
+            attempts -= 1
+            q.pos = pos
+            track = q.current()
+            try:
+                pygame.mixer.music.load(_path(track))
+                pygame.mixer.music.play()
+                self.state = 'playing'
+                self._preloaded = None
+                self._preload()
+                return
+            except Exception as e:
+                self._report(f'cannot play {_path(track)}: {e}')
+                nxt = q.peek_next_pos(manual=True)
+                pos = None if nxt == pos else nxt
+        pygame.mixer.music.stop()
+        self.state = 'stopped'
+
+    def _preload(self):
+        """Hand the following track to the mixer so it starts without a gap"""
+        if self._end_event is None or self.state == 'stopped':
+            return
+        nxt = self.queue.peek_next_pos()
+        if nxt is None or nxt == self._preloaded:
+            return
+        try:
+            pygame.mixer.music.queue(_path(self.queue.tracks[self.queue.order[nxt]]))
+            self._preloaded = nxt
+        except Exception as e:
+            self._report(f'preload failed: {e}')
+            self._preloaded = None
+
+    def _check_track_end(self):
+        with self._lock:
+            if self.state != 'playing':
+                if self._end_event is not None:
+                    pygame.event.get(self._end_event)
+                return
+            if self._end_event is not None:
+                if not pygame.event.get(self._end_event):
+                    return
+                if self._preloaded is not None and pygame.mixer.music.get_busy():
+                    # the mixer already moved on to the preloaded track
+                    self.queue.pos = self._preloaded
+                    self._preloaded = None
+                    self._preload()
+                else:
+                    self._start(self.queue.peek_next_pos())
+            elif not pygame.mixer.music.get_busy():
+                self._start(self.queue.peek_next_pos())
+
+    def _report(self, error):
+        if self.on_error:
+            self.on_error(error)
+        else:
+            print('Player error', error)
+
+
+def _describe(track) -> str:
+    if track is None:
+        return 'Nothing is playing'
+    if isinstance(track, str):
+        return os.path.splitext(os.path.basename(track))[0]
+    return f'{track.title} by {track.artist}' if getattr(track, 'artist', None) else track.title
+
+
+# whole commands only, so "play the song skip to my lou" is not a skip
+_NEXT_RE = re.compile(r'^(?:play\s+)?(?:the\s+)?(?:next|skip)(?:\s+(?:this|the))?(?:\s+(?:song|track|one))?(?:\s+please)?$')
+_PREV_RE = re.compile(r'^(?:play\s+)?(?:the\s+)?(?:previous|last|go back)(?:\s+(?:song|track|one))?(?:\s+please)?$|^back$')
+_CONTROL_WORDS = frozenset('next skip previous back pause resume unpause shuffle'.split())
+_CONTROL_PREFIXES = ('pause', 'resume', 'unpause', 'shuffle', 'repeat one', 'repeat all', 'repeat off')
+
+
+def handle_command(cmd: str, player: Player):
+    """Answer a playback control command; None if ``cmd`` is not one"""
+    c = ' '.join((cmd or '').lower().split()).rstrip('.!?')
+    about_music = any(w in c for w in ('song', 'track', 'music', 'playback', 'playing'))
+    if not player.available or not (about_music or c in _CONTROL_WORDS or c.startswith(_CONTROL_PREFIXES)):
+        return None
+    if _PREV_RE.search(c):
+        player.previous()
+        return 'Previous track'
+    if _NEXT_RE.search(c):
+        player.next()
+        return 'Skipping'
+    if 'pause' in c:
+        player.pause()
+        return 'Paused'
+    if 'resume' in c or 'continue' in c or 'unpause' in c:
+        player.resume()
+        return 'Resuming'
+    if 'stop' in c and about_music:
+        player.stop()
+        return 'Music stopped'
+    if 'shuffle' in c:
+        on = not any(w in c for w in ('off', 'disable', 'stop'))
+        player.set_shuffle(on)
+        return f"Shuffle {'on' if on else 'off'}"
+    if 'repeat' in c:
+        mode = REPEAT_OFF if 'off' in c else REPEAT_ONE if any(w in c for w in ('one', 'this')) else REPEAT_ALL
+        player.set_repeat(mode)
+        return f'Repeat {mode}'
+    if any(p in c for p in ("what's playing", 'what is playing', 'which song', 'what song')):
+        return _describe(player.now_playing())
+    return None
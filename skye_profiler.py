@@ -0,0 +1,205 @@
+"""Opt-in sampling profiler for long-running Skye Assistant sessions.
+
+SamplingProfiler wakes up every ``interval`` seconds on its own daemon
+thread, reads every other thread's current frame with
+sys._current_frames() and counts the stack it finds. The main loop, the
+reminder timer heap ('skye-reminders'), the player, health monitor and
+any thread doing speech synthesis are all sampled. Nothing is installed in
+the profiled threads (no sys.setprofile hooks), so their cost is zero
+between samples and the profiler can be switched on and off at runtime in
+a process that has been up for days.
+
+Stacks are written in the collapsed format read by flamegraph.pl,
+speedscope and inferno: one ``thread;outer;...;inner count`` line per
+distinct stack.
+
+Start it with ``get_profiler().start()`` or the voice/typed command "start
+profiling", or at launch by setting SKYE_PROFILE=1. Stop it with
+``stop()`` or "stop profiling", which writes the file.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+DEFAULT_INTERVAL = 0.02         # 50 samples a second per thread
+MAX_DEPTH = 64
+
+
+class SamplingProfiler:
+    """Statistical stack sampler writing collapsed stacks"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, out_dir: str = '.', threads=None):
+        self.interval = interval
+        self.out_dir = out_dir
+        self.threads = set(threads) if threads else None    # thread names to sample; None = all
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.sample_seconds = 0.0   # time spent inside the sampler itself
+        self._labels = {}
+        self._names = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float = None) -> bool:
+        """Begin sampling (for ``duration`` seconds if given); False if already running"""
+        if self.running:
+            return False
+        with self._lock:
+            self.stacks.clear()
+            self.samples = 0
+            self.sample_seconds = 0.0
+        self.started_at = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(duration,), name='skye-profiler', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, path: str = None):
+        """Stop sampling and write the collapsed stacks; returns the file path (or None)"""
+        if not self.running:
+            return None
+        self._stop.set()
+        self._thread.join(1.0)
+        return self.dump(path)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (
+                f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'.replace(';', ':'))
+        return label
+
+    def sample(self):
+        """Record the current stack of every sampled thread once"""
+        start = time.perf_counter()
+        own = threading.get_ident()
+        frames = sys._current_frames()
+        names = self._names
+        if not names.keys() >= frames.keys():
+            # a thread started since the last sample
+            names = self._names = {t.ident: t.name for t in threading.enumerate()}
+        taken = []
+        for ident, frame in frames.items():
+            name = names.get(ident, f'thread-{ident}')
+            if ident == own or (self.threads is not None and name not in self.threads):
+                continue
+            stack = []
+            labels = self._labels
+            while frame is not None and len(stack) < MAX_DEPTH:
+                code = frame.f_code
+                stack.append(labels.get(code) or self._label(code))
+                frame = frame.f_back
+            stack.append(name)
+            taken.append(tuple(reversed(stack)))
+        del frames
+        with self._lock:
+            self.stacks.update(taken)
+            self.samples += 1
+            self.sample_seconds += time.perf_counter() - start
+
+    def _run(self, duration):
+        deadline = time.monotonic() + duration if duration else None
+        while not self._stop.wait(self.interval):
+            self.sample()
+            if deadline is not None and time.monotonic() >= deadline:
+                self.dump()
+                break
+
+    def collapsed(self) -> str:
+        with self._lock:
+            items = sorted(self.stacks.items())
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in items)
+
+    def dump(self, path: str = None) -> str:
+        """Write what has been collected so far; safe to call while running"""
+        if path is None:
+            stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at or time.time()))
+            path = os.path.join(self.out_dir, f'skye_profile_{stamp}.collapsed')
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.collapsed())
+        os.replace(tmp, path)
+        return path
+
+    def stats(self) -> dict:
+        with self._lock:
+            elapsed = time.time() - self.started_at if self.started_at else 0.0
+            return {'running': self.running, 'samples': self.samples, 'stacks': len(self.stacks),
+                    'seconds': round(elapsed, 1),
+                    'overhead': round(self.sample_seconds / elapsed, 5) if elapsed else 0.0}
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> SamplingProfiler:
+    """Process-wide profiler; started at creation when SKYE_PROFILE is set"""
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = SamplingProfiler(out_dir=os.getenv('SKYE_PROFILE_DIR', '.'))
+            if os.getenv('SKYE_PROFILE', '').strip().lower() in ('1', 'true', 'on', 'yes'):
+                _profiler.start()
+        return _profiler
+
+
+def handle_command(cmd: str, profiler: SamplingProfiler = None):
+    """Answer "start/stop profiling" and "profiler status"; None otherwise"""
+    c = ' '.join((cmd or '').lower().split())
+    if 'profil' not in c:
+        return None
+    profiler = profiler or get_profiler()
+    if any(w in c for w in ('stop', 'end', 'finish')):
+        path = profiler.stop()
+        if path is None:
+            return 'The profiler is not running'
+        return f'Profiling stopped, {profiler.samples} samples written to {os.path.basename(path)}'
+    if any(w in c for w in ('start', 'begin', 'enable')):
+        if not profiler.start():
+            return 'The profiler is already running'
+        return 'Profiling started'
+    if 'status' in c:
+        s = profiler.stats()
+        if not s['running']:
+            return 'The profiler is not running'
+        return f"Profiling for {s['seconds']:.0f} seconds, {s['samples']} samples, {s['overhead'] * 100:.2f}% overhead"
+    return None
+
+
+def benchmark(threads: int = 8, depth: int = 30, seconds: float = 2.0):
+    stop = threading.Event()
+
+    def nest(n):
+        if n:
+            return nest(n - 1)
+        stop.wait()
+
+    workers = [threading.Thread(target=nest, args=(depth,), daemon=True) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    profiler = SamplingProfiler()
+    profiler.start()
+    time.sleep(seconds)
+    profiler._stop.set()
+    profiler._thread.join()
+    stop.set()
+    s = profiler.stats()
+    print(f'{s["samples"]} samples of {threads + 1} threads x {depth} frames, '
+          f'{profiler.sample_seconds / max(1, s["samples"]) * 1e6:.0f} us per sample, '
+          f'{s["overhead"] * 100:.2f}% of one core at {1 / profiler.interval:.0f} Hz')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench':
+        benchmark()
+    else:
+        print('usage: python skye_profiler.py --bench')
@@ -0,0 +1,110 @@
+"""Reminder store shared by both Skye Assistant implementations.
+
+Reminders live in the ``reminders`` table; pending rows are served through
+the partial index on ``due_at`` (see skye_db migration 1), and listings use
+keyset pagination, so "next 5 reminders" costs the same after years of use
+as on day one.
+"""
+import os
+import re
+from datetime import datetime, timedelta
+
+from skye_db import Database
+
+_LEGACY_LINE_RE = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?): (.*)$')
+
+
+class ReminderStore:
+    """Indexed reminder queries on top of the assistant database"""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def add(self, text: str, due: datetime = None) -> int:
+        """Insert a reminder and return its id; ``due`` may be None for undated reminders"""
+        now = datetime.now()
+        due_at = int(due.timestamp()) if due else None
+        cur = self.db.execute(
+            'INSERT INTO reminders (reminder, reminder_time, created_at, due_at) VALUES (?, ?, ?, ?)',
+            (text, due.isoformat() if due else None, now.isoformat(), due_at))
+        return cur.lastrowid
+
+    def upcoming(self, limit: int = 5, after=None, now: datetime = None) -> list:
+        """Pending dated reminders in due order.
+
+        ``after`` is the (due_at, id) of the last row of the previous page;
+        returns a list of (id, text, due_datetime) tuples.
+        """
+        if after is None:
+            start = int((now or datetime.now()).timestamp())
+            rows = self.db.query(
+                'SELECT id, reminder, due_at FROM reminders '
+                'WHERE is_completed=0 AND due_at >= ? ORDER BY due_at, id LIMIT ?',
+                (start, limit))
+        else:
+            due_at, rid = after
+            rows = self.db.query(
+                'SELECT id, reminder, due_at FROM reminders '
+                'WHERE is_completed=0 AND (due_at, id) > (?, ?) ORDER BY due_at, id LIMIT ?',
+                (due_at, rid, limit))
+        return [(rid, text, datetime.fromtimestamp(due)) for rid, text, due in rows]
+
+    def between(self, start: datetime, end: datetime, limit: int = 20) -> list:
+        """Pending reminders due in [start, end)"""
+        rows = self.db.query(
+            'SELECT id, reminder, due_at FROM reminders '
+            'WHERE is_completed=0 AND due_at >= ? AND due_at < ? ORDER BY due_at, id LIMIT ?',
+            (int(start.timestamp()), int(end.timestamp()), limit))
+        return [(rid, text, datetime.fromtimestamp(due)) for rid, text, due in rows]
+
+    def for_day(self, day: datetime = None, limit: int = 20) -> list:
+        start = (day or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.between(start, start + timedelta(days=1), limit)
+
+    def pending(self) -> list:
+        """(id, text, due_at) of every pending dated reminder, for loading a timer heap"""
+        # index range scan over idx_reminders_pending_due
+        return self.db.query('SELECT id, reminder, due_at FROM reminders WHERE is_completed=0 AND due_at IS NOT NULL')
+
+    def undated(self, limit: int = 5) -> list:
+        """Pending reminders without a due time (e.g. imported from the old text file)"""
+        rows = self.db.query(
+            'SELECT id, reminder FROM reminders WHERE is_completed=0 AND due_at IS NULL ORDER BY id DESC LIMIT ?',
+            (limit,))
+        return [(rid, text, None) for rid, text in rows]
+
+    def complete(self, rid: int):
+        self.db.execute('UPDATE reminders SET is_completed=1 WHERE id=?', (rid,))
+
+    def import_text_file(self, path: str) -> int:
+        """One-time import of a legacy ``skye_reminders.txt``; the file is renamed afterwards"""
+        if not os.path.exists(path):
+            return 0
+        rows = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                m = _LEGACY_LINE_RE.match(line)
+                if m:
+                    rows.append((m.group(2).strip(), m.group(1).replace(' ', 'T')))
+                elif line.strip():
+                    rows.append((line.strip(), None))
+        if rows:
+            self.db.executemany(
+                'INSERT INTO reminders (reminder, reminder_time, created_at, due_at) VALUES (?, NULL, ?, NULL)',
+                rows)
+        os.replace(path, path + '.imported')
+        return len(rows)
+
+
+def describe(reminders) -> str:
+    """Speakable list of (id, text, due) rows"""
+    parts = []
+    for _, text, due in reminders:
+        if due is None:
+            parts.append(text)
+        elif due.date() == datetime.now().date():
+            parts.append(f"{text} at {due.strftime('%I:%M %p')}")
+        else:
+            parts.append(f"{text} on {due.strftime('%A %B %d at %I:%M %p')}")
+    return '; '.join(parts)
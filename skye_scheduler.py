@@ -0,0 +1,150 @@
+"""Timer heap for Skye Assistant.
+
+TimerHeap keeps scheduled jobs in a min-heap ordered by due time (epoch
+seconds) and runs them from one worker thread. The worker sleeps on a
+condition variable until the earliest due time and is woken immediately when
+an earlier job is added, so jobs fire on time without periodic polling.
+
+Run ``python skye_scheduler.py --bench [N]`` for a push/pop benchmark.
+"""
+import heapq
+import itertools
+import sys
+import threading
+import time
+
+
+class TimerHeap:
+    """Min-heap of (due, seq, callback, args) driven by a single worker thread"""
+
+    def __init__(self, name: str = 'skye-scheduler', start: bool = True):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stop = False
+        self._cancelled = set()
+        self.fired = 0
+        self.thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        if start:
+            self.thread.start()
+
+    def schedule(self, due: float, callback, *args) -> int:
+        """Run ``callback(*args)`` at epoch time ``due``; returns a job id"""
+        with self._cond:
+            job_id = next(self._seq)
+            heapq.heappush(self._heap, (due, job_id, callback, args))
+            # only wake the worker when the new job is now the earliest one
+            if self._heap[0][1] == job_id:
+                self._cond.notify()
+            return job_id
+
+    def load(self, jobs) -> list:
+        """Bulk-load an iterable of (due, callback, args) in O(n); returns the job ids"""
+        ids = []
+        with self._cond:
+            for due, callback, args in jobs:
+                job_id = next(self._seq)
+                self._heap.append((due, job_id, callback, tuple(args)))
+                ids.append(job_id)
+            heapq.heapify(self._heap)
+            self._cond.notify()
+        return ids
+
+    def cancel(self, job_id: int):
+        """Lazily cancel a job; it is skipped when it reaches the top"""
+        with self._cond:
+            self._cancelled.add(job_id)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._heap)
+
+    def next_due(self):
+        with self._cond:
+            return self._heap[0][0] if self._heap else None
+
+    def _pop_due(self):
+        """Block until a job is due (or stop); returns it or None"""
+        with self._cond:
+            while not self._stop:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, job_id, callback, args = self._heap[0]
+                delay = due - time.time()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+                if job_id in self._cancelled:
+                    self._cancelled.discard(job_id)
+                    continue
+                return callback, args
+            return None
+
+    def _loop(self):
+        while True:
+            job = self._pop_due()
+            if job is None:
+                return
+            callback, args = job
+            try:
+                callback(*args)
+            except Exception as e:
+                print('Scheduler job error', e)
+            self.fired += 1
+
+    def stop(self, timeout: float = 1.0):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self.thread.is_alive():
+            self.thread.join(timeout=timeout)
+
+
+def benchmark(n: int = 100_000):
+    """Time bulk load, incremental pushes and draining of ``n`` jobs"""
+    import random
+    now = time.time()
+    dues = [now + random.uniform(3600, 86400) for _ in range(n)]
+    noop = lambda: None
+
+    heap = TimerHeap(start=False)
+    t0 = time.perf_counter()
+    heap.load((d, noop, ()) for d in dues)
+    t_load = time.perf_counter() - t0
+
+    heap2 = TimerHeap(start=False)
+    t0 = time.perf_counter()
+    for d in dues:
+        heap2.schedule(d, noop)
+    t_push = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    while heap2._heap:
+        heapq.heappop(heap2._heap)
+    t_pop = time.perf_counter() - t0
+
+    # end-to-end wakeup latency for a job due shortly
+    live = TimerHeap()
+    live.load((d, noop, ()) for d in dues)
+    fired = threading.Event()
+    target = time.time() + 0.05
+    lateness = []
+    live.schedule(target, lambda: (lateness.append(time.time() - target), fired.set()))
+    fired.wait(2)
+    live.stop()
+
+    print(f'{n} pending jobs')
+    print(f'  bulk load:      {t_load * 1000:8.1f} ms')
+    print(f'  push each:      {t_push / n * 1e6:8.2f} us')
+    print(f'  pop each:       {t_pop / n * 1e6:8.2f} us')
+    if lateness:
+        print(f'  wakeup latency: {lateness[0] * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench':
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 100_000)
+    else:
+        print('usage: python skye_scheduler.py --bench [N]')
@@ -0,0 +1,347 @@
+"""Natural-language reminder time parser for Skye Assistant.
+
+parse_when() turns spoken phrases such as "in 2 hours", "at 7 pm",
+"tomorrow at half past 8", "next friday evening" or "in an hour and a half"
+into a timezone-aware datetime. The grammar is a handful of regular
+expressions compiled once at import time, applied to a normalised string
+(number words replaced by digits), so a parse takes microseconds.
+
+EXAMPLES is a table of phrases and the datetimes they must produce at a
+fixed reference clock. Run ``python skye_timeparse.py --bench`` to check it
+and time the parser.
+"""
+import re
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+_NUMBER_WORDS = {
+    'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+    'thirteen': 13, 'fourteen': 14, 'fifteen': 15, 'sixteen': 16, 'seventeen': 17,
+    'eighteen': 18, 'nineteen': 19, 'twenty': 20, 'thirty': 30, 'forty': 40,
+    'forty five': 45, 'forty-five': 45, 'fifty': 50, 'sixty': 60, 'ninety': 90,
+    'a couple of': 2, 'a few': 3, 'couple of': 2,
+}
+_WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+_UNIT_SECONDS = {'second': 1, 'sec': 1, 'minute': 60, 'min': 60, 'hour': 3600, 'hr': 3600,
+                 'day': 86400, 'week': 604800}
+_PERIOD_DEFAULTS = {'morning': 9, 'afternoon': 15, 'evening': 19, 'tonight': 20, 'night': 20}
+
+# ---- grammar (compiled once) ----
+_NUMBER_WORD_RE = re.compile(
+    r'\b(' + '|'.join(sorted((re.escape(w) for w in _NUMBER_WORDS), key=len, reverse=True)) + r')\b')
+_COMPOUND_RE = re.compile(r'\b([2-9]0)[ -]([1-9])\b')
+_DURATION_RE = re.compile(
+    r'(?P<n>\d+(?:\.\d+)?|an?|half an?)\s*'
+    r'(?P<unit>seconds?|secs?|minutes?|mins?|hours?|hrs?|days?|weeks?)'
+    r'(?P<half>\s+and\s+a\s+half)?')
+_RELATIVE_RE = re.compile(r'\b(?:in|after|within)\b|\bfrom now\b|\blater\b')
+_CLOCK_RE = re.compile(
+    r'(?:\bat\s+)?\b(?P<h>\d{1,2})(?:[:.](?P<m>\d{2}))?\s*(?P<ampm>a\.?\s?m\.?|p\.?\s?m\.?)?(?=\W|$)'
+    r'(?P<oclock>\s*o\'?\s?clock)?')
+_PAST_TO_RE = re.compile(r'\b(?P<amount>half|quarter|\d{1,2})(?:\s+minutes?)?\s+(?P<dir>past|after|to|before)\s+(?P<h>\d{1,2})\b')
+_NOON_RE = re.compile(r'\b(?P<word>noon|midday|midnight)\b')
+_DAY_RE = re.compile(
+    r'\b(?P<rel>today|tonight|tomorrow|day after tomorrow|next week)\b|'
+    r'\b(?:(?P<mod>next|this|on|coming)\s+)?(?P<wd>' + '|'.join(_WEEKDAYS) + r')\b')
+_PERIOD_RE = re.compile(r'\b(?P<p>morning|afternoon|evening|tonight|night)\b')
+# a lone number, but not an ordinal such as "the 5th"
+_BARE_NUMBER_RE = re.compile(r'^\D*?(\d+)(?!st|nd|rd|th)\D*$')
+_TIME_PHRASE_START_RE = re.compile(
+    r'\s(?=(?:at|in|on|by|after|next|this|today|tonight|tomorrow|' + '|'.join(_WEEKDAYS) + r')\b)')
+
+
+def _normalise(text: str) -> str:
+    t = ' ' + (text or '').lower().replace('-', ' ') + ' '
+    t = _NUMBER_WORD_RE.sub(lambda m: str(_NUMBER_WORDS[m.group(1)]), t)
+    # "twenty five" -> 20 5 -> 25
+    t = _COMPOUND_RE.sub(lambda m: str(int(m.group(1)) + int(m.group(2))), t)
+    return ' '.join(t.split())
+
+
+def _duration(text: str):
+    total = 0.0
+    found = False
+    for m in _DURATION_RE.finditer(text):
+        n = m.group('n')
+        if n.startswith('half'):
+            value = 0.5
+        elif n in ('a', 'an'):
+            value = 1.0
+        else:
+            value = float(n)
+        if m.group('half'):
+            value += 0.5
+        unit = m.group('unit').rstrip('s')
+        total += value * _UNIT_SECONDS[unit]
+        found = True
+    if not found and 'half an hour' in text:
+        return timedelta(minutes=30)
+    return timedelta(seconds=total) if found else None
+
+
+def _clock(text: str):
+    """Return (hour, minute, explicit_meridiem, minutes_given), None if no clock
+    time was named, or False if one was but it cannot exist ("half past 99")"""
+    m = _NOON_RE.search(text)
+    if m:
+        return (12, 0, True, False) if m.group('word') != 'midnight' else (0, 0, True, False)
+    m = _PAST_TO_RE.search(text)
+    if m:
+        amount = {'half': 30, 'quarter': 15}.get(m.group('amount'))
+        minutes = amount if amount is not None else int(m.group('amount'))
+        hour = int(m.group('h'))
+        if hour > 23 or minutes > 59:
+            return False
+        if m.group('dir') in ('to', 'before'):
+            hour, minutes = (hour - 1) % 24, 60 - minutes
+        meridiem = _meridiem(text[m.end():m.end() + 6])
+        if meridiem == 'pm' and hour < 12:
+            hour += 12
+        # "quarter to 8" names the minutes but not the half of the day
+        return hour, minutes, meridiem is not None, False
+    for m in _CLOCK_RE.finditer(text):
+        ampm = m.group('ampm')
+        # a plain number only counts as a clock time after "at" or with am/pm/o'clock/:mm
+        if not (ampm or m.group('m') or m.group('oclock') or m.group(0).startswith('at')):
+            continue
+        hour, minute = int(m.group('h')), int(m.group('m') or 0)
+        if hour > 23 or minute > 59:
+            continue
+        meridiem = _meridiem(ampm or '')
+        if meridiem == 'pm' and hour < 12:
+            hour += 12
+        elif meridiem == 'am' and hour == 12:
+            hour = 0
+        return hour, minute, meridiem is not None or hour > 12, m.group('m') is not None
+    return None
+
+
+def _meridiem(text: str):
+    t = text.replace('.', '').replace(' ', '')
+    if t.startswith('pm'):
+        return 'pm'
+    if t.startswith('am'):
+        return 'am'
+    return None
+
+
+def parse_when(text: str, now: datetime = None, tz=None, bare_minutes: bool = True):
+    """Parse a spoken reminder time into an aware datetime, or None if nothing matched.
+
+    ``tz`` defaults to the local zone; with ``bare_minutes`` a lone number
+    ("15") means minutes from now, as the old prompt expected.
+    """
+    if now is None:
+        now = datetime.now(tz).astimezone(tz)
+    elif now.tzinfo is None:
+        now = now.astimezone(tz)
+    t = _normalise(text)
+    if not t:
+        return None
+
+    # relative durations: "in 2 hours", "10 minutes from now", "in an hour and a half"
+    try:
+        delta = _duration(t)
+        if delta is not None and (_RELATIVE_RE.search(t) or not _DAY_RE.search(t)):
+            return now + delta
+    except OverflowError:
+        # "in 99999999 days" is past datetime.max
+        return None
+
+    day = _DAY_RE.search(t)
+    period = _PERIOD_RE.search(t)
+    clock = _clock(t)
+    if clock is False:
+        return None
+
+    if day is None and clock is None:
+        if period is not None:
+            hour = _PERIOD_DEFAULTS[period.group('p')]
+            candidate = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+            return candidate if candidate > now else candidate + timedelta(days=1)
+        # old behaviour: a bare number means minutes
+        m = _BARE_NUMBER_RE.match(t) if bare_minutes else None
+        try:
+            return now + timedelta(minutes=int(m.group(1))) if m else None
+        except OverflowError:
+            return None
+
+    base = now.replace(second=0, microsecond=0)
+    offset = None
+    if day is not None:
+        rel = day.group('rel')
+        if rel in ('today', 'tonight'):
+            offset = 0
+        elif rel == 'tomorrow':
+            offset = 1
+        elif rel == 'day after tomorrow':
+            offset = 2
+        elif rel == 'next week':
+            offset = 7
+        else:
+            offset = (_WEEKDAYS.index(day.group('wd')) - now.weekday()) % 7
+            if offset == 0 and day.group('mod') != 'this':
+                offset = 7
+
+    morning = period is not None and period.group('p') == 'morning'
+    if clock is not None:
+        hour, minute, explicit, minutes_given = clock
+        # "at 7 in the morning" and "at 0:30" already say which half of the day
+        fixed_half = morning or (minutes_given and hour < 12)
+        if not explicit and hour < 12:
+            if period is not None and period.group('p') != 'morning':
+                hour += 12
+            elif period is None and 1 <= hour <= 6:
+                # nobody sets a reminder "at 6" meaning 6 in the morning
+                hour += 12
+    else:
+        hour = _PERIOD_DEFAULTS[period.group('p')] if period is not None else (
+            20 if day is not None and day.group('rel') == 'tonight' else 9)
+        minute, explicit, fixed_half = 0, True, True
+
+    candidate = base.replace(hour=hour, minute=minute) + timedelta(days=offset or 0)
+    if offset is None:
+        if candidate <= now and not explicit and not fixed_half and hour < 12:
+            # "at 7" said in the afternoon means 7 pm
+            candidate += timedelta(hours=12)
+        if candidate <= now:
+            candidate += timedelta(days=1)
+    elif offset == 0 and day.group('wd') and candidate <= now:
+        # "this wednesday" said on Wednesday after the time has passed
+        candidate += timedelta(days=7)
+    return candidate
+
+
+def split_when(text: str, now: datetime = None, tz=None):
+    """Split "call mom tomorrow at 6" into ("call mom", datetime); the datetime is None if no time was given"""
+    text = (text or '').strip()
+    for m in _TIME_PHRASE_START_RE.finditer(text.lower()):
+        when = parse_when(text[m.end():], now, tz, bare_minutes=False)
+        if when is not None:
+            return text[:m.start()].strip(), when
+    return text, None
+
+
+# ---- reference corpus ----
+# Expected results with the clock at REFERENCE_NOW (a Wednesday afternoon);
+# checked by the benchmark and by tests/test_timeparse.py.
+REFERENCE_NOW = datetime(2026, 1, 7, 15, 0, tzinfo=timezone.utc)
+EXAMPLES = [
+    # relative durations
+    ('in 10 minutes', '2026-01-07 15:10'),
+    ('in two hours', '2026-01-07 17:00'),
+    ('in an hour and a half', '2026-01-07 16:30'),
+    ('half an hour from now', '2026-01-07 15:30'),
+    ('in 30 seconds', '2026-01-07 15:00:30'),
+    ('in 3 days', '2026-01-10 15:00'),
+    ('in a week', '2026-01-14 15:00'),
+    ('in twenty five minutes', '2026-01-07 15:25'),
+    ('in a couple of hours', '2026-01-07 17:00'),
+    ('in a few minutes', '2026-01-07 15:03'),
+    ('after 45 minutes', '2026-01-07 15:45'),
+    ('2 hours later', '2026-01-07 17:00'),
+    ('in 1.5 hours', '2026-01-07 16:30'),
+    ('in 2 hours and 30 minutes', '2026-01-07 17:30'),
+    # clock times
+    ('at 7 pm', '2026-01-07 19:00'),
+    ('at 7 p.m.', '2026-01-07 19:00'),
+    ('at 7am', '2026-01-08 07:00'),
+    ('at 7', '2026-01-07 19:00'),
+    ('at 7:30', '2026-01-08 07:30'),
+    ('at 9:30', '2026-01-08 09:30'),
+    ('at 19:00', '2026-01-07 19:00'),
+    ('at 0:30', '2026-01-08 00:30'),
+    ('at 12 am', '2026-01-08 00:00'),
+    ('at 12 pm', '2026-01-08 12:00'),
+    ('at 6', '2026-01-07 18:00'),
+    ('at 4', '2026-01-07 16:00'),
+    ("at 5 o'clock", '2026-01-07 17:00'),
+    ('at 16:45', '2026-01-07 16:45'),
+    ('at 11:59 pm', '2026-01-07 23:59'),
+    ('at noon', '2026-01-08 12:00'),
+    ('at midday', '2026-01-08 12:00'),
+    ('at midnight', '2026-01-08 00:00'),
+    ('quarter to 8', '2026-01-07 19:45'),
+    ('quarter past 4', '2026-01-07 16:15'),
+    ('10 past 6', '2026-01-07 18:10'),
+    ('20 to 9 pm', '2026-01-07 20:40'),
+    ('half past 8 am', '2026-01-08 08:30'),
+    ('half past seven in the evening', '2026-01-07 19:30'),
+    ('at 7 in the morning', '2026-01-08 07:00'),
+    ('at 10:15 in the evening', '2026-01-07 22:15'),
+    # days and parts of the day
+    ('tomorrow', '2026-01-08 09:00'),
+    ('tomorrow at 8 am', '2026-01-08 08:00'),
+    ('tomorrow morning', '2026-01-08 09:00'),
+    ('tomorrow at 7:30', '2026-01-08 07:30'),
+    ('tomorrow evening', '2026-01-08 19:00'),
+    ('day after tomorrow at 6', '2026-01-09 18:00'),
+    ('tonight', '2026-01-07 20:00'),
+    ('tonight at 11', '2026-01-07 23:00'),
+    ('at 9 tonight', '2026-01-07 21:00'),
+    ('this evening', '2026-01-07 19:00'),
+    ('in the morning', '2026-01-08 09:00'),
+    ('today at 5 pm', '2026-01-07 17:00'),
+    # weekdays and weeks
+    ('next friday', '2026-01-09 09:00'),
+    ('friday afternoon', '2026-01-09 15:00'),
+    ('this friday at noon', '2026-01-09 12:00'),
+    ('on monday at 9:15 pm', '2026-01-12 21:15'),
+    ('on thursday morning', '2026-01-08 09:00'),
+    ('coming sunday', '2026-01-11 09:00'),
+    ('wednesday', '2026-01-14 09:00'),
+    ('next wednesday', '2026-01-14 09:00'),
+    ('this wednesday', '2026-01-14 09:00'),
+    ('this wednesday evening', '2026-01-07 19:00'),
+    ('next week', '2026-01-14 09:00'),
+    ('next week at 6 pm', '2026-01-14 18:00'),
+    # bare numbers mean minutes; ordinals and words mean nothing
+    ('15', '2026-01-07 15:15'),
+    ('5', '2026-01-07 15:05'),
+    ('on the 5th', None),
+    ('the 3rd', None),
+    ('soon', None),
+    ('', None),
+    # times that cannot exist are rejected, not wrapped or raised
+    ('10 past 30', None),
+    ('half past 99', None),
+    ('70 past 5', None),
+    ('99 to 3', None),
+    ('quarter to 25', None),
+    ('in 99999999 days', None),
+    ('99999999999999', None),
+]
+
+
+def check_examples(now: datetime = REFERENCE_NOW, examples=EXAMPLES) -> list:
+    """(phrase, expected, got) for every example that does not parse as expected"""
+    failures = []
+    for phrase, expected in examples:
+        got = parse_when(phrase, now)
+        shown = None if got is None else got.strftime('%Y-%m-%d %H:%M:%S' if got.second else '%Y-%m-%d %H:%M')
+        if shown != expected:
+            failures.append((phrase, expected, shown))
+    return failures
+
+
+def benchmark(rounds: int = 20000):
+    now = REFERENCE_NOW
+    for phrase, expected, got in check_examples(now):
+        print(f'  MISMATCH {phrase!r:40} -> {got} (expected {expected})')
+    phrases = [phrase for phrase, _ in EXAMPLES]
+    n = rounds * len(phrases)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for phrase in phrases:
+            parse_when(phrase, now)
+    elapsed = time.perf_counter() - start
+    print(f'{n} parses in {elapsed:.2f}s: {n / elapsed:,.0f} parses/s, {elapsed / n * 1e6:.1f} us each')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench':
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 20000)
+    else:
+        print(parse_when(' '.join(sys.argv[1:])))
@@ -0,0 +1,303 @@
+"""Span tracing for the Skye Assistant command pipeline.
+
+Wrap a stage in ``with span('listen.capture'):`` and, when tracing is on,
+its wall time is recorded with its parent span, so every turn (listen ->
+process_command -> handler -> speak) becomes a small tree. Finished turns
+are appended to a JSONL file, one span per line, and every span name feeds
+an in-process log-bucket histogram whose p50/p95/p99 table is printed on
+exit. The self time column (a span minus its children) points at the stage
+that actually dominates.
+
+Tracing is off unless SKYE_TRACE is set (to a file path, or to 1 for
+skye_trace.jsonl) or get_tracer().enable() is called. While it is off,
+span() returns a shared no-op context manager, which costs well under a
+microsecond (``python skye_trace.py --bench``).
+"""
+import json
+import math
+import os
+import sys
+import threading
+import time
+from functools import wraps
+from itertools import count
+
+DEFAULT_TRACE_PATH = 'skye_trace.jsonl'
+_BUCKETS_PER_DOUBLING = 4       # bucket bounds grow by 2**0.25 (about 19%)
+_MIN_MS = 0.01
+
+
+class LogHistogram:
+    """Latency histogram with logarithmic buckets; constant memory"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.self_total = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float, self_ms: float = None):
+        index = 0 if ms <= _MIN_MS else int(math.log2(ms / _MIN_MS) * _BUCKETS_PER_DOUBLING) + 1
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += ms
+        self.self_total += ms if self_ms is None else self_ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile (ms)"""
+        if not self.count:
+            return 0.0
+        rank, seen = p / 100 * self.count, 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.max, _MIN_MS * 2 ** (index / _BUCKETS_PER_DOUBLING))
+        return self.max
+
+    def summary(self) -> dict:
+        return {'count': self.count, 'mean_ms': round(self.total / self.count, 3) if self.count else 0.0,
+                'self_mean_ms': round(self.self_total / self.count, 3) if self.count else 0.0,
+                'p50_ms': round(self.percentile(50), 3), 'p95_ms': round(self.percentile(95), 3),
+                'p99_ms': round(self.percentile(99), 3), 'max_ms': round(self.max, 3)}
+
+
+class _NullSpan:
+    """What span() hands out while tracing is off"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+    def rename(self, name: str):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ('tracer', 'name', 'attrs', 'span_id', 'parent', 'trace_id', 'wall', 'start', 'child_time')
+
+    def __init__(self, tracer, name: str, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Attach attributes (e.g. the matched handler) to the running span"""
+        self.attrs.update(attrs)
+
+    def rename(self, name: str):
+        """Re-label a running span, e.g. a turn that turned out to be idle"""
+        self.name = name
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        self.parent = stack[-1] if stack else None
+        self.span_id = next(self.tracer._ids)
+        self.trace_id = self.parent.trace_id if self.parent else self.span_id
+        self.child_time = 0.0
+        self.wall = time.time()
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        stack = self.tracer._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if self.parent is not None:
+            self.parent.child_time += elapsed
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer._finish(self, elapsed)
+        return False
+
+
+class _Attached:
+    """Makes a span that is open on another thread the parent of spans opened on this one"""
+    __slots__ = ('tracer', 'parent')
+
+    def __init__(self, tracer, parent: Span):
+        self.tracer = tracer
+        self.parent = parent
+
+    def __enter__(self):
+        self.tracer._stack().append(self.parent)
+        return self.parent
+
+    def __exit__(self, *exc):
+        stack = self.tracer._stack()
+        if stack and stack[-1] is self.parent:
+            stack.pop()
+        return False
+
+
+class Tracer:
+    """Collects spans into histograms and a JSONL trace file"""
+
+    def __init__(self, path: str = None):
+        self.enabled = False
+        self.path = None
+        self._local = threading.local()
+        self._ids = count(1)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._histograms = {}
+        if path:
+            self.enable(path)
+
+    def enable(self, path: str = DEFAULT_TRACE_PATH):
+        """Start recording; ``path`` may be None for histograms only"""
+        self.path = path
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self.flush()
+
+    def span(self, name: str, **attrs):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, attrs)
+
+    def attach(self, parent):
+        """``with tracer.attach(turn):`` nests this thread's spans under ``turn``,
+        a span still open on another thread (e.g. the main loop's turn while the
+        listener thread captures)"""
+        if not self.enabled or not isinstance(parent, Span):
+            return NULL_SPAN
+        return _Attached(self, parent)
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _finish(self, span: Span, elapsed: float):
+        ms = elapsed * 1000
+        self_ms = max(0.0, ms - span.child_time * 1000)
+        record = {'trace': span.trace_id, 'span': span.span_id,
+                  'parent': span.parent.span_id if span.parent else None, 'name': span.name,
+                  'start': round(span.wall, 6), 'ms': round(ms, 3), 'self_ms': round(self_ms, 3),
+                  'thread': threading.current_thread().name}
+        if span.attrs:
+            record['attrs'] = span.attrs
+        with self._lock:
+            hist = self._histograms.get(span.name)
+            if hist is None:
+                hist = self._histograms[span.name] = LogHistogram()
+            hist.add(ms, self_ms)
+            if self.path:
+                self._pending.append(record)
+        if span.parent is None:
+            # one file write per finished turn, not per span
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending or not self.path:
+            return
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(r, default=str) + '\n' for r in pending))
+        except OSError as e:
+            print('Trace write error', e)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {name: hist.summary() for name, hist in self._histograms.items()}
+
+    def format_summary(self) -> str:
+        rows = sorted(self.summary().items(), key=lambda item: -item[1]['p95_ms'])
+        if not rows:
+            return 'No spans recorded'
+        width = max(12, max(len(name) for name, _ in rows))
+        lines = [f"{'span':<{width}} {'count':>7} {'mean':>9} {'self':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"]
+        for name, s in rows:
+            lines.append(f"{name:<{width}} {s['count']:>7} {s['mean_ms']:>9.1f} {s['self_mean_ms']:>9.1f} "
+                         f"{s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}")
+        return '\n'.join(lines) + '\n(milliseconds)'
+
+
+def _path_from_env():
+    value = os.getenv('SKYE_TRACE', '').strip()
+    if value.lower() in ('', '0', 'false', 'off', 'no'):
+        return None
+    return DEFAULT_TRACE_PATH if value.lower() in ('1', 'true', 'on', 'yes') else value
+
+
+_tracer = Tracer(_path_from_env())
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer, enabled from SKYE_TRACE"""
+    return _tracer
+
+
+def span(name: str, **attrs):
+    """``with span('stage'):`` on the process-wide tracer"""
+    return _tracer.span(name, **attrs) if _tracer.enabled else NULL_SPAN
+
+
+def traced(name: str = None):
+    """Decorator form of span(), named after the function by default"""
+    def wrap(fn):
+        label = name or fn.__qualname__
+
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            if not _tracer.enabled:
+                return fn(*args, **kwargs)
+            with _tracer.span(label):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def benchmark(n: int = 200_000):
+    tracer = Tracer()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        pass
+    base = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(n):
+        with span('bench'):
+            pass
+    disabled = time.perf_counter() - t0 - base
+    tracer.enable(None)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        with tracer.span('bench'):
+            pass
+    enabled = time.perf_counter() - t0 - base
+    print(f'disabled span: {disabled / n * 1e9:8.0f} ns')
+    print(f'enabled span:  {enabled / n * 1e9:8.0f} ns (histogram only)')
+    print(tracer.format_summary())
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench':
+        benchmark()
+    elif len(sys.argv) > 1:
+        # summarise an existing trace file
+        offline = Tracer()
+        with open(sys.argv[1], encoding='utf-8') as f:
+            for line in f:
+                r = json.loads(line)
+                offline._histograms.setdefault(r['name'], LogHistogram()).add(r['ms'], r.get('self_ms'))
+        print(offline.format_summary())
+    else:
+        print('usage: python skye_trace.py --bench | TRACE.jsonl')
@@ -0,0 +1,98 @@
+"""Math and knowledge answers for Skye Assistant: local first, Wolfram|Alpha second.
+
+MathAnswerer answers plain arithmetic, list statistics and unit columns
+locally (skye_calc / skye_bulk) without any network call. Anything else
+goes to the Wolfram|Alpha Short Answers API on a small worker pool through
+the shared pooled HTTP session; the caller waits only up to a deadline and
+gets the pending Future back if the answer is late. Answers (including "no
+short answer") are stored in a persistent ResponseCache keyed by the
+normalised query, and identical in-flight queries share one request.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from skye_bulk import bulk_calculate
+from skye_cache import ResponseCache, get_singleflight
+from skye_calc import CalcError, evaluate, format_result, is_local_expression
+from skye_http import get_session
+
+WOLFRAM_RESULT_URL = 'https://api.wolframalpha.com/v1/result'
+
+
+def cache_key(query: str) -> str:
+    """Lower-cased, whitespace-collapsed query; operators stay ("x^2=4" is not "x+2=4")"""
+    return ' '.join((query or '').lower().split())
+
+
+class WolframClient:
+    """Cached, coalesced, non-blocking Short Answers API client"""
+
+    def __init__(self, app_id: str, cache: ResponseCache = None, ttl: float = 7 * 86400,
+                 negative_ttl: float = 3600, timeout: float = 8.0, max_workers: int = 2):
+        self.app_id = app_id
+        self.cache = cache or ResponseCache('wolfram', ttl=ttl)
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self._flight = get_singleflight('wolfram')
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='skye-wolfram')
+
+    def _fetch(self, query: str):
+        resp = get_session().get(WOLFRAM_RESULT_URL, timeout=self.timeout,
+                                 params={'appid': self.app_id, 'i': query, 'units': 'metric'})
+        if resp.status_code == 501:
+            return None  # Wolfram understood nothing it can say in one line
+        resp.raise_for_status()
+        return resp.text.strip() or None
+
+    def _lookup(self, key: str, query: str):
+        answer = self._flight.do(key, self._fetch, query)
+        self.cache.put(key, {'answer': answer}, ttl=None if answer else self.negative_ttl)
+        return answer
+
+    def submit(self, query: str) -> Future:
+        """Future resolving to the answer text (None when Wolfram has no short answer)"""
+        key = cache_key(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            done = Future()
+            done.set_result(cached['answer'])
+            return done
+        return self._pool.submit(self._lookup, key, query)
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+
+class MathAnswerer:
+    """Local evaluation for parseable math, Wolfram|Alpha (if configured) for the rest"""
+
+    def __init__(self, wolfram: WolframClient = None, deadline: float = 4.0):
+        self.wolfram = wolfram
+        self.deadline = deadline
+
+    @staticmethod
+    def local(text: str):
+        """Answer without the network, or None"""
+        reply = bulk_calculate(text)
+        if reply:
+            return reply
+        if is_local_expression(text):
+            try:
+                return f'The result is {format_result(evaluate(text))}'
+            except CalcError as e:
+                return f'Calculation error: {e}'
+        return None
+
+    def answer(self, text: str, deadline: float = None):
+        """Returns (reply, pending); ``pending`` is a Future when Wolfram missed the deadline"""
+        reply = self.local(text)
+        if reply or self.wolfram is None:
+            return reply, None
+        future = self.wolfram.submit(text)
+        try:
+            result = future.result(timeout=self.deadline if deadline is None else deadline)
+        except FutureTimeout:
+            return None, future
+        except Exception as e:
+            print('Wolfram error', e)
+            return None, None
+        return result, None
@@ -0,0 +1,44 @@
+import pytest
+
+from skye_bulk import Progression, bulk_calculate, is_bulk_request, parse_values
+
+
+@pytest.mark.parametrize('text,count,last', [
+    ('0 to 1 by 0.1', 11, 1.0),
+    ('0 to 0.3 by 0.1', 4, 0.3),
+    ('1 to 2 by 0.25', 5, 2.0),
+    ('0 to 1 by 0.3', 4, 0.9),
+    ('1 to 100', 100, 100),
+    ('10 to 1 by 3', 4, 1),
+    ('1 to 1 million', 1000000, 1000000),
+])
+def test_range_counts(text, count, last):
+    p = parse_values(text)
+    assert isinstance(p, Progression)
+    assert p.count == count
+    assert p.last == pytest.approx(last)
+
+
+@pytest.mark.parametrize('text,expected', [
+    ('sum of 0 to 1 by 0.1', 'The sum is 5.5'),
+    ('average of 3, 9, 12', 'The average is 8'),
+    ('sum of 1 to 1 million', 'The sum is 500000500000'),
+    ('convert 3 and 10 km to m', 'In m: 3000, 10000'),
+])
+def test_answers(text, expected):
+    assert bulk_calculate(text) == expected
+
+
+@pytest.mark.parametrize('text', [
+    'what is the sum of all fears',
+    'count of monte cristo',
+    'the average of my day',
+    'a cup of tea',
+])
+def test_wordy_questions_fall_through(text):
+    assert bulk_calculate(text) is None
+    assert not is_bulk_request(text)
+
+
+def test_bad_numbers_still_report_an_error():
+    assert bulk_calculate('sum of 3, 4 and x').startswith('Calculation error')
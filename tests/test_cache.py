@@ -0,0 +1,36 @@
+import pytest
+
+from skye_cache import WikiSummaryCache, normalise_query
+
+
+@pytest.mark.parametrize('query,key', [
+    ('What is Albert Einstein?', 'albert einstein'),
+    ('tell me about the  Eiffel Tower', 'eiffel tower'),
+    ('who was Ada Lovelace', 'ada lovelace'),
+    ('what is c++', 'c++'),
+    ('What is C#?', 'c#'),
+    ('what is C', 'c'),
+    ('define AT&T', 'at&t'),
+    ('look up node.js.', 'node.js'),
+    ('what is 3.14', '3.14'),
+])
+def test_normalise_query(query, key):
+    assert normalise_query(query) == key
+
+
+def test_languages_do_not_share_an_entry(tmp_path):
+    cache = WikiSummaryCache(path=str(tmp_path / 'cache.db'))
+    cache.put('c++', 2, WikiSummaryCache.STATUS_OK, 'C++ is a language built on C.')
+    cache.put('c#', 2, WikiSummaryCache.STATUS_OK, 'C# is a Microsoft language.')
+    assert cache.get('c', 2) is None
+    assert cache.get('what is c++', 2) == (WikiSummaryCache.STATUS_OK, 'C++ is a language built on C.')
+    assert cache.get('What is C#?', 2) == (WikiSummaryCache.STATUS_OK, 'C# is a Microsoft language.')
+    cache.close()
+
+
+def test_reordered_words_still_share_an_entry(tmp_path):
+    cache = WikiSummaryCache(path=str(tmp_path / 'cache.db'))
+    cache.put('albert einstein', 2, WikiSummaryCache.STATUS_OK, 'Physicist.')
+    assert cache.get('einstein albert', 2) == (WikiSummaryCache.STATUS_OK, 'Physicist.')
+    assert cache.stats.fuzzy_hits == 1
+    cache.close()
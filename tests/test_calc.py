@@ -0,0 +1,91 @@
+import math
+import time
+
+import pytest
+
+from skye_calc import CalcError, evaluate, format_result, is_local_expression, spoken_to_expr
+
+
+@pytest.mark.parametrize('text,expected', [
+    ('2 + 3 * 4', 14),
+    ('2 plus 3 times 4', 14),
+    ('10 minus 4 divided by 2', 8),
+    ('12 multiplied by 3', 36),
+    ('9 over 3', 3),
+    ('square root of 16 plus 2 to the power of 3', 12),
+    ('cube root of 27', pytest.approx(3)),
+    ('5 squared', 25),
+    ('2 cubed', 8),
+    ('15 percent of 80', 12),
+    ('50 percent', 0.5),
+    ('17 mod 5', 2),
+    ('10 x 12', 120),
+    ('1,000 plus 1', 1001),
+    ('-2^2', -4),
+    ('2^3^2', 512),
+    ('5!', 120),
+    ('5 factorial', 120),
+    ('factorial of 5', 120),
+    ('factorial(5)', 120),
+    ('what is 3 factorial plus 1', 7),
+    ('sin(pi / 6)', pytest.approx(0.5)),
+    ('log(100, 10)', pytest.approx(2)),
+    ('abs(-3.5) * floor(2.7)', 7),
+])
+def test_values(text, expected):
+    assert evaluate(text) == expected
+
+
+@pytest.mark.parametrize('text,message', [
+    ('1 / 0', 'division by zero'),
+    ('0^-1', 'division by zero'),
+    ('5 mod 0', 'division by zero'),
+    ('7 // 0', 'division by zero'),
+    ('2^100000', 'exponent is too large'),
+    ('10^400 * 10^700', 'result is too large'),
+    ('factorial(1000)', 'factorial is too large'),
+    ('1000 factorial', 'factorial is too large'),
+    ('2.5!', 'factorial needs a whole number'),
+    ('square root of -1', 'sqrt is undefined there'),
+    ('(-8)^0.5', 'result is not a real number'),
+    ('2 +', 'incomplete expression'),
+    ('(1 + 2', "expected ')'"),
+    ('what is', 'empty expression'),
+    ('2 $ 3', "unexpected character '$'"),
+])
+def test_errors_are_spoken_friendly(text, message):
+    with pytest.raises(CalcError) as info:
+        evaluate(text)
+    assert str(info.value) == message
+
+
+@pytest.mark.parametrize('text', ['9^9^9', '9 to the power of 9 to the power of 9', '10^10^10^10', '99999!'])
+def test_huge_expressions_are_rejected_quickly(text):
+    start = time.perf_counter()
+    with pytest.raises(CalcError):
+        evaluate(text)
+    assert time.perf_counter() - start < 0.1
+
+
+def test_variables():
+    assert evaluate('3*x^2 - 2*x + 1', x=2) == 9
+
+
+def test_spoken_rewrite():
+    assert spoken_to_expr('2 to the power of 10') == '2 ^ 10'
+    assert spoken_to_expr('10 x 3') == '10*3'
+
+
+@pytest.mark.parametrize('text,expected', [
+    ('what is 2 plus 2', True),
+    ('calculate 15 percent of 80', True),
+    ('what is the capital of france', False),
+    ('how much is a ticket to paris', False),
+])
+def test_is_local_expression(text, expected):
+    assert is_local_expression(text) is expected
+
+
+@pytest.mark.parametrize('value,text', [(4.0, '4'), (1 / 3, '0.3333333333'), (12, '12'), (math.pi, '3.141592654')])
+def test_format_result(value, text):
+    assert format_result(value) == text
@@ -0,0 +1,97 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from skye_db import Database, merge_legacy, schema_version, MIGRATIONS
+
+
+def _legacy_file(path):
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE habits (id INTEGER PRIMARY KEY, name TEXT, streak INTEGER DEFAULT 0, last_done TEXT);
+        INSERT INTO habits (name, streak, last_done) VALUES ('read', 4, '2025-01-01 10:00:00');
+        CREATE TABLE reminders (id INTEGER PRIMARY KEY, reminder TEXT, reminder_time TEXT,
+                                created_at TEXT, is_completed INTEGER DEFAULT 0);
+        INSERT INTO reminders (reminder, reminder_time) VALUES ('dentist', '2025-03-04T09:30:00');
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def test_merged_rows_are_normalised(tmp_path):
+    legacy = tmp_path / 'alexa_full.db'
+    _legacy_file(legacy)
+    db = Database(str(tmp_path / 'main.db'))
+    assert schema_version(db.connection()) == MIGRATIONS[-1][0]
+
+    assert merge_legacy(db, [str(legacy)]) == {str(legacy): 2}
+    assert db.query('SELECT name, streak, best_streak, last_done FROM habits') == [('read', 4, 4, '2025-01-01')]
+    due_at, = db.query_one("SELECT due_at FROM reminders WHERE reminder='dentist'")
+    assert isinstance(due_at, int)
+
+    # a second merge of the same file is a no-op
+    assert merge_legacy(db, [str(legacy)]) == {}
+    db.close()
+
+
+def test_thread_connections_are_closed_when_threads_exit(tmp_path):
+    db = Database(str(tmp_path / 'main.db'))
+    threads = [threading.Thread(target=db.query, args=('SELECT COUNT(*) FROM reminders',)) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # only the opening thread's connection is left
+    assert len(db._conns) == 1
+
+    db.release()
+    assert db._conns == []
+    assert db.query_one('SELECT 1') == (1,)
+    db.close()
+
+
+def test_concurrent_readers_and_writers_never_lock(tmp_path):
+    """Web-like writers, a scheduler-like updater and readers hammer one file at once"""
+    db = Database(str(tmp_path / 'stress.db'))
+    stop = time.monotonic() + 1.0
+    counts = {'writes': 0, 'reads': 0}
+    failures = []
+    lock = threading.Lock()
+
+    def run(fn, key):
+        while time.monotonic() < stop:
+            try:
+                fn()
+            except Exception as e:
+                failures.append(e)
+                return
+            with lock:
+                counts[key] += 1
+
+    def web_write():
+        db.execute('INSERT INTO reminders (reminder, reminder_time, due_at) VALUES (?, ?, ?)',
+                   ('stress reminder', datetime.now().isoformat(), int(time.time())))
+
+    def scheduler_update():
+        with db.transaction() as conn:
+            conn.execute('UPDATE reminders SET is_completed=1 WHERE id IN '
+                         '(SELECT id FROM reminders WHERE is_completed=0 AND due_at <= ? LIMIT 10)',
+                         (int(time.time()),))
+
+    def web_read():
+        db.query('SELECT id, reminder FROM reminders WHERE is_completed=0 ORDER BY due_at LIMIT 5')
+
+    jobs = [(web_write, 'writes')] * 8 + [(scheduler_update, 'writes')] + [(web_read, 'reads')] * 8
+    threads = [threading.Thread(target=run, args=job) for job in jobs]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert failures == []
+    assert counts['writes'] > 0 and counts['reads'] > 0
+    inserted, = db.query_one("SELECT COUNT(*) FROM reminders WHERE reminder = 'stress reminder'")
+    assert inserted > 0
+    assert len(db._conns) == 1
+    db.close()
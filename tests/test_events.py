@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from skye_events import EventLoop
+from skye_trace import get_tracer, span, traced
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    tracer = get_tracer()
+    path = tmp_path / 'trace.jsonl'
+    tracer.enable(str(path))
+    yield path
+    tracer.disable()
+    tracer.enabled, tracer.path = False, None
+
+
+def test_turn_span_holds_listen_and_handling(trace_file):
+    lines = iter(['', 'hello', 'exit'])
+
+    @traced('listen')
+    def listen():
+        with span('listen.capture'):
+            return next(lines)
+
+    def handle(text):
+        with span('process_command'):
+            return text != 'exit'
+
+    EventLoop(listen, handle, lambda text: None).run()
+    spans = [json.loads(line) for line in trace_file.read_text().splitlines()]
+    by_id = {s['span']: s for s in spans}
+    turns = [s for s in spans if s['name'] in ('turn', 'turn.idle')]
+    assert [t['name'] for t in sorted(turns, key=lambda t: t['span'])][:3] == ['turn.idle', 'turn', 'turn']
+    assert [s['name'] for s in spans].count('listen') == 3
+    for s in spans:
+        if s['name'] == 'capture':
+            assert s['thread'] == 'skye-listener'
+            assert by_id[s['parent']]['name'].startswith('turn')
+        if s['name'] == 'listen':
+            # one listen span per capture, not one nested in another
+            assert by_id[s['parent']]['name'] == 'capture'
+        if s['name'] in ('listen.capture', 'process_command'):
+            # every stage of a turn is part of the turn's trace
+            assert s['trace'] == by_id[s['trace']]['span']
+            assert by_id[s['trace']]['name'].startswith('turn')
+
+
+def test_announcement_drops_overheard_capture():
+    said, handled = [], []
+    loop = None
+    lines = iter(['overheard', 'exit'])
+
+    def listen():
+        text = next(lines)
+        if text == 'overheard':
+            loop.announce('Reminder: stretch')
+        return text
+
+    def handle(text):
+        handled.append(text)
+        return text != 'exit'
+
+    loop = EventLoop(listen, handle, said.append)
+    loop.run()
+    assert said == ['Reminder: stretch']
+    assert handled == ['exit']
+    assert loop.dropped == 1
@@ -0,0 +1,47 @@
+import pytest
+
+from skye_db import Database
+from skye_habits import HabitTracker, handle_command, is_habit_request
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    db = Database(str(tmp_path / 'habits.db'))
+    yield HabitTracker(db)
+    db.close()
+
+
+def test_check_in_extends_streak_once_a_day(tracker):
+    assert handle_command('add habit yoga', tracker) == 'Now tracking yoga'
+    assert handle_command('add habit yoga', tracker) == 'You already track yoga'
+    assert handle_command('i did yoga', tracker) == 'Nice! yoga streak is now 1 day'
+    assert handle_command('check in yoga today', tracker) == 'You already checked in yoga today. Streak: 1 day'
+    assert tracker.summary()['done_today'] == 1
+    assert handle_command('remove habit yoga', tracker) == 'Stopped tracking yoga'
+
+
+def test_mark_as_done(tracker):
+    tracker.add('reading')
+    assert handle_command('mark reading as done', tracker) == 'Nice! reading streak is now 1 day'
+
+
+def test_unknown_names_are_claimed_only_for_habit_commands(tracker):
+    assert handle_command('i did my taxes', tracker) is None
+    assert handle_command('check in for my flight', tracker) is None
+    assert handle_command('check in habit flossing', tracker) == 'You do not track a habit called flossing'
+
+
+@pytest.mark.parametrize('cmd,expected', [
+    ('i did yoga', True),
+    ('i just finished my run', True),
+    ('check in meditation', True),
+    ('mark reading as done', True),
+    ('how are my habits', True),
+    ('add habit stretching', True),
+    ('remind me to check in for my flight', False),
+    ('remind me when the download is completed', False),
+    ('mark the calendar for friday', False),
+    ('what did i do yesterday', False),
+])
+def test_is_habit_request(cmd, expected):
+    assert is_habit_request(cmd) is expected
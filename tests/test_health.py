@@ -0,0 +1,49 @@
+import json
+import urllib.request
+
+import pytest
+
+from skye_health import DEAD_MIC_SAMPLES, MAX_CONSECUTIVE_ERRORS, AudioHealthMonitor, MetricsServer
+
+
+def test_microphone_health_comes_from_listen_outcomes():
+    health = AudioHealthMonitor()
+    assert health.microphone_check()[0] is None
+    for _ in range(MAX_CONSECUTIVE_ERRORS):
+        health.record_recognition('error')
+    assert health.microphone_check() == (False, f'{MAX_CONSECUTIVE_ERRORS} consecutive capture errors')
+    # a captured phrase with signal in it clears the errors
+    health.record_capture(350.0)
+    assert health.microphone_check() == (True, '')
+
+
+def test_silent_captures_mean_a_dead_microphone():
+    health = AudioHealthMonitor()
+    for _ in range(DEAD_MIC_SAMPLES):
+        health.record_capture(0.0)
+    assert health.microphone_check() == (False, 'no signal from the microphone')
+
+
+def test_reinit_runs_and_is_reported():
+    health = AudioHealthMonitor(backoff=60)
+    calls = []
+    health.watch('microphone', lambda: (False, 'broken'), lambda: calls.append(1))
+    health.check_now(now=0)
+    health.check_now(now=1)     # still inside the backoff
+    assert calls == [1]
+    assert not health.healthy()
+    assert health.snapshot()['subsystems']['microphone']['reinits'] == 1
+
+
+def test_metrics_server_binds_the_given_host():
+    server = MetricsServer(lambda: {'turns': 3}, lambda: False, port=0, host='127.0.0.1')
+    try:
+        assert server.httpd.server_address[0] == '127.0.0.1'
+        base = f'http://127.0.0.1:{server.port}'
+        with urllib.request.urlopen(base + '/metrics') as resp:
+            assert json.loads(resp.read()) == {'turns': 3}
+        with pytest.raises(urllib.error.HTTPError) as info:
+            urllib.request.urlopen(base + '/health')
+        assert info.value.code == 503
+    finally:
+        server.close()
@@ -0,0 +1,159 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+openai = pytest.importorskip('openai')
+
+from skye_cache import ResponseCache  # noqa: E402
+from skye_llm import ChatClient  # noqa: E402
+
+
+class FakeOpenAI:
+    """OpenAI-compatible /v1/chat/completions endpoint playing a script of responses.
+
+    Each script entry is either an HTTP error status (int) or a list of
+    content tokens to stream as server-sent events.
+    """
+
+    def __init__(self):
+        self.script = []
+        self.requests = []
+        self.hold = None            # threading.Event the stream waits on before its last token
+        self.received = threading.Event()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # chunked responses, as the real API sends, so each event is read as it arrives
+            protocol_version = 'HTTP/1.1'
+
+            def _chunk(self, data: bytes):
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+                self.wfile.flush()
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                fake.requests.append(body)
+                fake.received.set()
+                step = fake.script.pop(0) if fake.script else ['OK.']
+                if isinstance(step, int):
+                    payload = json.dumps({'error': {'message': 'try later', 'type': 'server_error'}}).encode()
+                    self.send_response(step)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for i, token in enumerate(step):
+                    if fake.hold is not None and i == len(step) - 1:
+                        fake.hold.wait(5)
+                    chunk = {'id': 'x', 'object': 'chat.completion.chunk', 'model': body['model'],
+                             'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}]}
+                    self._chunk(f'data: {json.dumps(chunk)}\n\n'.encode())
+                self._chunk(b'data: [DONE]\n\n')
+                self._chunk(b'')
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/v1'
+        threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    fake = FakeOpenAI()
+    yield fake
+    fake.close()
+
+
+@pytest.fixture
+def client(server, tmp_path, monkeypatch):
+    monkeypatch.setenv('OPENAI_API_BASE', server.url)
+    api_base = openai.api_base
+    yield ChatClient('test-key', cache=ResponseCache('llm', path=str(tmp_path / 'cache.db')), backoff=0)
+    openai.api_base = api_base
+
+
+def test_sentences_are_spoken_while_streaming(server, client):
+    server.script = [['Hello', ' there.', ' How are', ' you?']]
+    server.hold = threading.Event()
+    spoken = []
+
+    def on_sentence(sentence):
+        spoken.append(sentence)
+        # the first sentence arrives before the server sends its last token
+        server.hold.set()
+
+    start = time.perf_counter()
+    assert client.ask('hi', on_sentence=on_sentence) == 'Hello there. How are you?'
+    assert time.perf_counter() - start < 4
+    assert spoken == ['Hello there.', 'How are you?']
+    assert server.requests[0]['stream'] is True
+
+
+def test_transient_errors_are_retried(server, client):
+    server.script = [503, 429, ['Recovered.']]
+    assert client.ask('flaky question') == 'Recovered.'
+    assert len(server.requests) == 3
+
+
+def test_retries_give_up(server, client):
+    server.script = [500, 500, 500, 500]
+    with pytest.raises(openai.error.OpenAIError):
+        client.ask('broken question')
+    assert len(server.requests) == client.retries + 1
+
+
+def test_cache_hit_skips_the_server(server, client):
+    server.script = [['Python is a language.', ' It is popular.']]
+    assert client.ask('What is Python?') == 'Python is a language. It is popular.'
+    spoken = []
+    assert client.ask('what is python', on_sentence=spoken.append) == 'Python is a language. It is popular.'
+    assert len(server.requests) == 1
+    assert spoken == ['Python is a language.', 'It is popular.']
+
+
+def test_history_is_sent_and_the_cache_keys_on_its_summary(server, client):
+    summary = {'role': 'system', 'content': 'Earlier in this conversation:\nuser: who wrote hamlet'}
+    history = [summary, {'role': 'user', 'content': 'who wrote hamlet'},
+               {'role': 'assistant', 'content': 'Shakespeare.'}]
+    server.script = [['Around 1600.'], ['Which book do you mean?']]
+    assert client.ask('when was it written', history=history) == 'Around 1600.'
+    assert server.requests[0]['messages'][:3] == history
+    # later turns do not change the key; the summary does
+    later = history + [{'role': 'user', 'content': 'thanks'}, {'role': 'assistant', 'content': 'You are welcome.'}]
+    assert client.ask('When was it written?', history=later) == 'Around 1600.'
+    assert len(server.requests) == 1
+    other = [{'role': 'system', 'content': 'Earlier in this conversation:\nuser: where is the station'}]
+    assert client.ask('when was it written', history=other) == 'Which book do you mean?'
+    assert len(server.requests) == 2
+
+
+def test_concurrent_identical_prompts_share_one_request(server, client):
+    server.script = [['Shared', ' answer.']]
+    server.hold = threading.Event()
+    replies = []
+    first = threading.Thread(target=lambda: replies.append(client.ask('same question')))
+    first.start()
+    assert server.received.wait(5)
+    second = threading.Thread(target=lambda: replies.append(client.ask('same question')))
+    second.start()
+    time.sleep(0.1)
+    server.hold.set()
+    first.join(5)
+    second.join(5)
+    assert replies == ['Shared answer.', 'Shared answer.']
+    assert len(server.requests) == 1
@@ -0,0 +1,17 @@
+import pytest
+
+from skye_notes import is_notes_request
+
+
+@pytest.mark.parametrize('cmd,expected', [
+    ('add milk to my shopping list', True),
+    ('find my notes about taxes', True),
+    ('i bought milk', True),
+    ('got the eggs', True),
+    ('i forgot my keys', False),
+    ('what have you got for me', False),
+    ('play my road trip playlist', False),
+    ('what is the average of 3 and 4', False),
+])
+def test_is_notes_request(cmd, expected):
+    assert is_notes_request(cmd) is expected
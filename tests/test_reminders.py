@@ -0,0 +1,14 @@
+from datetime import datetime, timedelta
+
+from skye_db import Database
+from skye_reminders import ReminderStore
+
+
+def test_pending_lists_only_open_dated_reminders(tmp_path):
+    store = ReminderStore(Database(str(tmp_path / 'r.db')))
+    due = datetime.now() + timedelta(hours=1)
+    dated = store.add('call mum', due)
+    store.add('someday')
+    done = store.add('water plants', due)
+    store.complete(done)
+    assert store.pending() == [(dated, 'call mum', int(due.timestamp()))]
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from skye_timeparse import EXAMPLES, REFERENCE_NOW, check_examples, parse_when, split_when
+
+WEDNESDAY_MORNING = datetime(2026, 1, 7, 8, 0, tzinfo=timezone.utc)
+
+
+def _fmt(dt):
+    return None if dt is None else dt.strftime('%Y-%m-%d %H:%M:%S' if dt.second else '%Y-%m-%d %H:%M')
+
+
+@pytest.mark.parametrize('phrase,expected', EXAMPLES)
+def test_reference_corpus(phrase, expected):
+    assert _fmt(parse_when(phrase, REFERENCE_NOW)) == expected
+
+
+@pytest.mark.parametrize('phrase,expected', [
+    ('at 7', '2026-01-07 19:00'),
+    ('at 9', '2026-01-07 09:00'),
+    ('at 7:30', '2026-01-08 07:30'),
+    ('at 9:30', '2026-01-07 09:30'),
+    ('at 7 in the morning', '2026-01-08 07:00'),
+    ('at 10 in the morning', '2026-01-07 10:00'),
+    ('this wednesday', '2026-01-07 09:00'),
+    ('this wednesday at 7', '2026-01-14 07:00'),
+    ('this morning', '2026-01-07 09:00'),
+    ('this afternoon', '2026-01-07 15:00'),
+    ('tonight', '2026-01-07 20:00'),
+    ('next week', '2026-01-14 09:00'),
+])
+def test_morning_clock(phrase, expected):
+    assert _fmt(parse_when(phrase, WEDNESDAY_MORNING)) == expected
+
+
+def test_bare_number_is_optional():
+    assert parse_when('15', REFERENCE_NOW, bare_minutes=False) is None
+
+
+def test_naive_now_is_made_aware():
+    got = parse_when('in 10 minutes', datetime(2026, 1, 7, 15, 0))
+    assert got.tzinfo is not None
+
+
+@pytest.mark.parametrize('text,task,expected', [
+    ('call mom tomorrow at 6', 'call mom', '2026-01-08 18:00'),
+    ('take out the bins in 2 hours', 'take out the bins', '2026-01-07 17:00'),
+    ('pay rent on monday morning', 'pay rent', '2026-01-12 09:00'),
+    ('study for exam next week', 'study for exam', '2026-01-14 09:00'),
+    ('water the plants at 7 in the morning', 'water the plants', '2026-01-08 07:00'),
+    ('buy 2 apples', 'buy 2 apples', None),
+    ('read chapter 5th', 'read chapter 5th', None),
+])
+def test_split_when(text, task, expected):
+    got_task, when = split_when(text, REFERENCE_NOW)
+    assert (got_task, _fmt(when)) == (task, expected)
+
+
+def test_check_examples_reports_mismatches():
+    assert check_examples() == []
+    assert check_examples(examples=[('at 7', '2026-01-07 07:00')]) == [('at 7', '2026-01-07 07:00', '2026-01-07 19:00')]
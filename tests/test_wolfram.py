@@ -0,0 +1,14 @@
+import pytest
+
+pytest.importorskip('requests')
+
+from skye_wolfram import cache_key  # noqa: E402
+
+
+def test_cache_key_keeps_operators():
+    keys = {cache_key(q) for q in ('solve x^2=4', 'solve x+2=4', 'solve x*2=4', 'solve x-2=4')}
+    assert len(keys) == 4
+
+
+def test_cache_key_ignores_case_and_spacing():
+    assert cache_key('  Integral of  X^2 ') == cache_key('integral of x^2') == 'integral of x^2'